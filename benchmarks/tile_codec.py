@@ -0,0 +1,51 @@
+"""
+compare tile_from_tenhou / tile_to_tenhou_range with the category based codec they replaced.
+
+    python -m benchmarks.tile_codec
+"""
+import timeit
+
+from mahjong.record.utils.constant import TENHOU_TILE_CATEGORY, SUIT_ORDER
+from mahjong.record.utils.value.tile import tile_from_tenhou, tile_to_tenhou_indexes, TENHOU_TILE_COUNT
+from mahjong.tile.definition import Tile, AkaTile
+
+
+def category_tile_from_tenhou(index):
+    if index == TENHOU_TILE_CATEGORY.index((SUIT_ORDER.index('m'), 4, 0)):
+        return AkaTile(0, 'm')
+    elif index == TENHOU_TILE_CATEGORY.index((SUIT_ORDER.index('p'), 4, 0)):
+        return AkaTile(0, 'p')
+    elif index == TENHOU_TILE_CATEGORY.index((SUIT_ORDER.index('s'), 4, 0)):
+        return AkaTile(0, 's')
+    else:
+        color, number, _ = TENHOU_TILE_CATEGORY.category(index)
+        return Tile(number + 1, SUIT_ORDER[color])
+
+
+def category_tile_to_tenhou_indexes(tile):
+    color = SUIT_ORDER.index(tile.color)
+    number = tile.number - 1
+    start_tile, end_tile = (TENHOU_TILE_CATEGORY.index(t) for t in [(color, number, 0), (color, number, 3)])
+    return set(range(start_tile, end_tile + 1))
+
+
+def bench(name, function, arguments, number=200):
+    seconds = min(timeit.repeat(lambda: [function(x) for x in arguments], number=number, repeat=5))
+    per_call = seconds / number / len(arguments) * 1e9
+    print("{:<36}{:>10.0f} ns/call".format(name, per_call))
+    return per_call
+
+
+def main():
+    indexes = list(range(TENHOU_TILE_COUNT))
+    plain_tiles = sorted(set(tile_from_tenhou(index, aka=False) for index in indexes))
+    old = bench("category tile_from_tenhou", category_tile_from_tenhou, indexes)
+    new = bench("table tile_from_tenhou", tile_from_tenhou, indexes)
+    print("speedup x{:.1f}".format(old / new))
+    old = bench("category tile -> tenhou indexes", category_tile_to_tenhou_indexes, plain_tiles)
+    new = bench("table tile_to_tenhou_indexes", tile_to_tenhou_indexes, plain_tiles)
+    print("speedup x{:.1f}".format(old / new))
+
+
+if __name__ == '__main__':
+    main()
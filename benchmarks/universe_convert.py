@@ -0,0 +1,65 @@
+"""
+time converting the tests/*.xml fixtures to command and state tables, with View.scope / View.type
+served from the per-member cache and with the cache removed (resolved on every access as before).
+
+    python -m benchmarks.universe_convert
+"""
+import glob
+import os
+import sys
+import timeit
+from contextlib import contextmanager
+
+from loguru import logger
+
+from mahjong.record.reader import from_file
+from mahjong.record.universe.command import GameCommand
+from mahjong.record.universe.executor import GameExecutor
+from mahjong.record.universe.format import View
+from mahjong.record.universe.tenhou import to_commands
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tests", "*.xml")
+
+
+@contextmanager
+def uncached_views():
+    # aliases share their member, keep each once.
+    members = list(dict.fromkeys(member for view in View.registered_view().values()
+                                 for member in view.__members__.values()))
+    saved = [(member, member._scope_, member._type_) for member in members]
+    for member in members:
+        del member._scope_, member._type_
+    try:
+        yield
+    finally:
+        for member, scope, view_type in saved:
+            member._scope_ = scope
+            member._type_ = view_type
+
+
+def convert(records):
+    for record in records:
+        commands = to_commands(record)
+        GameCommand.to_dataframe(commands)
+        GameExecutor().execute_as_dataframe(commands)
+
+
+def bench(name, records, number=3):
+    seconds = min(timeit.repeat(lambda: convert(records), number=number, repeat=3)) / number
+    print("{:<24}{:>10.1f} ms/run".format(name, seconds * 1e3))
+    return seconds
+
+
+def main():
+    logger.remove()
+    logger.add(sys.stderr, level="ERROR")
+    records = [from_file(path) for path in sorted(glob.glob(FIXTURES))]
+    print("{} records".format(len(records)))
+    with uncached_views():
+        old = bench("resolved on access", records)
+    new = bench("cached per member", records)
+    print("speedup x{:.1f}".format(old / new))
+
+
+if __name__ == '__main__':
+    main()
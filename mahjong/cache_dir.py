@@ -0,0 +1,13 @@
+import os
+
+CACHE_DIR_ENV = "AUTO_WHITE_REIMU_CACHE"
+
+
+def user_cache_dir() -> str:
+    """
+    per-user cache directory: $AUTO_WHITE_REIMU_CACHE if set, otherwise auto_white_reimu in the XDG cache directory.
+    """
+    if CACHE_DIR_ENV in os.environ:
+        return os.environ[CACHE_DIR_ENV]
+    base = os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache"))
+    return os.path.join(base, "auto_white_reimu")
@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+from collections.abc import Mapping
+from functools import total_ordering
+from itertools import groupby
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from .set import TileSet
+from ..tile.definition import Tile, AkaTile
+
+SUIT_COLORS = "mps"
+SUIT_LENGTH = Tile.SUIT_MAX - Tile.SUIT_MIN + 1
+HONOR_LENGTH = 7
+TILE_SLOTS = SUIT_LENGTH * len(SUIT_COLORS) + HONOR_LENGTH
+
+SLOT_TILES = [Tile(number, color) for color in SUIT_COLORS for number in range(Tile.SUIT_MIN, Tile.SUIT_MAX + 1)] + \
+             [Tile(number, 'z') for number in range(1, HONOR_LENGTH + 1)]
+
+# tile_hash_num of a tile (aka five shares the hash of its plain five) -> slot in [0, TILE_SLOTS)
+_HASH_SLOT = [None] * (max(hash(tile) for tile in SLOT_TILES) + 1)
+for _slot, _tile in enumerate(SLOT_TILES):
+    _HASH_SLOT[hash(_tile)] = _slot
+
+_AKA_SLOTS = [_HASH_SLOT[hash(Tile(5, color))] for color in SUIT_COLORS]
+_AKA_TILES = [AkaTile(0, color) for color in SUIT_COLORS]
+_SLOT_AKA_INDEX = {slot: i for i, slot in enumerate(_AKA_SLOTS)}
+
+
+def tile_slot(tile: Tile) -> int:
+    return _HASH_SLOT[hash(tile)]
+
+
+def slot_tile(slot: int) -> Tile:
+    return SLOT_TILES[slot]
+
+
+def tile_counts(tiles) -> List[int]:
+    if isinstance(tiles, ArrayTileSet):
+        return list(tiles.counts)
+    counts = [0] * TILE_SLOTS
+    for tile, count in tiles.items():
+        counts[_HASH_SLOT[hash(tile)]] += count
+    return counts
+
+
+@total_ordering
+class ArrayTileSet(Mapping):
+    """
+    A TileSet with fixed layout: 34 counts ordered as 1m..9m,1p..9p,1s..9s,1z..7z plus aka five counts of m,p,s.
+    aka fives are counted in their plain five slot as well, the same as TileSet treats them.
+    """
+    __slots__ = ("_counts", "_aka")
+
+    def __init__(self, tiles=None):
+        self._counts = [0] * TILE_SLOTS
+        self._aka = [0] * len(SUIT_COLORS)
+        if tiles is not None:
+            self.update(tiles)
+
+    @classmethod
+    def from_counts(cls, counts: Iterable[int], aka: Optional[Iterable[int]] = None) -> ArrayTileSet:
+        tile_set = cls.__new__(cls)
+        tile_set._counts = list(counts)
+        tile_set._aka = list(aka) if aka is not None else [0] * len(SUIT_COLORS)
+        assert len(tile_set._counts) == TILE_SLOTS
+        return tile_set
+
+    @property
+    def counts(self) -> List[int]:
+        return self._counts
+
+    @property
+    def aka_counts(self) -> List[int]:
+        return self._aka
+
+    def _add(self, tile: Tile, count: int):
+        slot = _HASH_SLOT[hash(tile)]
+        self._counts[slot] += count
+        if slot in _SLOT_AKA_INDEX:
+            aka_index = _SLOT_AKA_INDEX[slot]
+            if isinstance(tile, AkaTile):
+                self._aka[aka_index] = max(self._aka[aka_index] + count, 0)
+            self._aka[aka_index] = min(self._aka[aka_index], max(self._counts[slot], 0))
+
+    def _merge(self, tiles, sign: int):
+        if isinstance(tiles, ArrayTileSet):
+            counts = self._counts
+            for slot, count in enumerate(tiles._counts):
+                if count:
+                    counts[slot] += sign * count
+            for aka_index, slot in enumerate(_AKA_SLOTS):
+                aka = max(self._aka[aka_index] + sign * tiles._aka[aka_index], 0)
+                self._aka[aka_index] = min(aka, max(counts[slot], 0))
+        elif isinstance(tiles, Mapping):
+            for tile, count in tiles.items():
+                self._add(tile, sign * count)
+        else:
+            for tile in tiles:
+                self._add(tile, sign)
+
+    def update(self, tiles):
+        self._merge(tiles, 1)
+
+    def subtract(self, tiles):
+        self._merge(tiles, -1)
+
+    def _keep_positive(self) -> ArrayTileSet:
+        counts = self._counts
+        for slot, count in enumerate(counts):
+            if count < 0:
+                counts[slot] = 0
+        return self
+
+    def copy(self) -> ArrayTileSet:
+        return ArrayTileSet.from_counts(self._counts, self._aka)
+
+    def re_sort(self):
+        pass
+
+    def clear(self):
+        self._counts = [0] * TILE_SLOTS
+        self._aka = [0] * len(SUIT_COLORS)
+
+    def __getitem__(self, tile: Tile) -> int:
+        return self._counts[_HASH_SLOT[hash(tile)]]
+
+    def __setitem__(self, tile: Tile, count: int):
+        slot = _HASH_SLOT[hash(tile)]
+        self._counts[slot] = count
+        if slot in _SLOT_AKA_INDEX:
+            aka_index = _SLOT_AKA_INDEX[slot]
+            self._aka[aka_index] = min(self._aka[aka_index], max(count, 0))
+
+    def __delitem__(self, tile: Tile):
+        self[tile] = 0
+
+    def __contains__(self, tile) -> bool:
+        return isinstance(tile, Tile) and self._counts[_HASH_SLOT[hash(tile)]] != 0
+
+    def _slot_key(self, slot: int) -> Tile:
+        if slot in _SLOT_AKA_INDEX and self._aka[_SLOT_AKA_INDEX[slot]] > 0:
+            return _AKA_TILES[_SLOT_AKA_INDEX[slot]]
+        return SLOT_TILES[slot]
+
+    def __iter__(self) -> Iterator[Tile]:
+        return iter(self.keys())
+
+    def keys(self) -> List[Tile]:
+        return [self._slot_key(slot) for slot, count in enumerate(self._counts) if count]
+
+    def values(self) -> List[int]:
+        return [count for count in self._counts if count]
+
+    def items(self) -> List[Tuple[Tile, int]]:
+        return [(self._slot_key(slot), count) for slot, count in enumerate(self._counts) if count]
+
+    def contains(self, tiles) -> bool:
+        counts = self._counts
+        if isinstance(tiles, ArrayTileSet):
+            for count, need in zip(counts, tiles._counts):
+                if count < need:
+                    return False
+            return True
+        for tile, count in tiles.items():
+            if counts[_HASH_SLOT[hash(tile)]] < count:
+                return False
+        return True
+
+    def tiles(self) -> Iterator[Tile]:
+        for slot, count in enumerate(self._counts):
+            if count > 0:
+                if slot in _SLOT_AKA_INDEX:
+                    aka = self._aka[_SLOT_AKA_INDEX[slot]]
+                    yield from [_AKA_TILES[_SLOT_AKA_INDEX[slot]]] * aka
+                    count -= aka
+                yield from [SLOT_TILES[slot]] * count
+
+    def exclude(self, other) -> Optional[ArrayTileSet]:
+        if self.contains(other):
+            return self - other
+        else:
+            return None
+
+    def to_tile_set(self) -> TileSet:
+        tile_set = TileSet(self.tiles())
+        tile_set.re_sort()
+        return tile_set
+
+    def _gen_str_iter(self) -> Iterator[str]:
+        for color, group in groupby(self.tiles(), key=lambda tile: tile.color):
+            for tile in group:
+                yield str(tile.number)
+            yield color
+
+    def __str__(self):
+        return ''.join(self._gen_str_iter())
+
+    def __repr__(self):
+        return "%s" % self
+
+    def __len__(self):
+        return sum(self._counts)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, ArrayTileSet):
+            return self._counts == other._counts
+        if isinstance(other, Mapping):
+            return dict(self.items()) == {tile: count for tile, count in other.items() if count}
+        return NotImplemented
+
+    def __lt__(self, other) -> bool:
+        return list(self.items()) < list(other.items())
+
+    def __add__(self, other) -> ArrayTileSet:
+        target = self.copy()
+        target.update(other)
+        return target._keep_positive()
+
+    def __sub__(self, other) -> ArrayTileSet:
+        target = self.copy()
+        target.subtract(other)
+        return target._keep_positive()
+
+    def __neg__(self) -> ArrayTileSet:
+        return ArrayTileSet.from_counts(-count if count < 0 else 0 for count in self._counts)
+
+    def __pos__(self) -> ArrayTileSet:
+        return self.copy()._keep_positive()
+
+    def __and__(self, other) -> ArrayTileSet:
+        other = other if isinstance(other, ArrayTileSet) else ArrayTileSet(other)
+        return ArrayTileSet.from_counts(
+            (min(a, b) for a, b in zip(self._counts, other._counts)),
+            (min(a, b) for a, b in zip(self._aka, other._aka)),
+        )._keep_positive()
+
+    def __or__(self, other) -> ArrayTileSet:
+        other = other if isinstance(other, ArrayTileSet) else ArrayTileSet(other)
+        return ArrayTileSet.from_counts(
+            (max(a, b) for a, b in zip(self._counts, other._counts)),
+            (max(a, b) for a, b in zip(self._aka, other._aka)),
+        )._keep_positive()
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from typing import List, Sequence, Tuple
+
+from .array_set import ArrayTileSet, tile_counts, tile_slot, slot_tile, SUIT_COLORS, SUIT_LENGTH, TILE_SLOTS
+from .pattern.win import WinPattern, UniquePairs
+from ..tile.definition import Tile, AkaTile
+
+
+class SuitTransform:
+    """
+    Map of tiles that keeps waiting results: permute the three suits, and optionally reflect numbers 1<->9 in a suit.
+    order[i] is the original suit placed at suit i, reflected[i] tells if it is reflected.
+    """
+
+    def __init__(self, order: Sequence[int] = (0, 1, 2), reflected: Sequence[bool] = (False, False, False)):
+        self.order = tuple(order)
+        self.reflected = tuple(reflected)
+        self._slots = list(range(TILE_SLOTS))
+        for target, (source, reflect) in enumerate(zip(self.order, self.reflected)):
+            for offset in range(SUIT_LENGTH):
+                target_offset = SUIT_LENGTH - 1 - offset if reflect else offset
+                self._slots[source * SUIT_LENGTH + offset] = target * SUIT_LENGTH + target_offset
+        self._inverse_slots = [0] * TILE_SLOTS
+        for source, target in enumerate(self._slots):
+            self._inverse_slots[target] = source
+
+    def is_identity(self) -> bool:
+        return self._slots == list(range(TILE_SLOTS))
+
+    def apply_slot(self, slot: int) -> int:
+        return self._slots[slot]
+
+    def inverse_slot(self, slot: int) -> int:
+        return self._inverse_slots[slot]
+
+    @staticmethod
+    def _map_tile(tile: Tile, slots: List[int]) -> Tile:
+        mapped = slot_tile(slots[tile_slot(tile)])
+        if isinstance(tile, AkaTile):
+            return AkaTile(0, mapped.color)
+        return mapped
+
+    def apply(self, tile: Tile) -> Tile:
+        return self._map_tile(tile, self._slots)
+
+    def inverse(self, tile: Tile) -> Tile:
+        return self._map_tile(tile, self._inverse_slots)
+
+    def apply_hand(self, hand) -> ArrayTileSet:
+        if not isinstance(hand, ArrayTileSet):
+            hand = ArrayTileSet(hand)
+        mapped = [0] * TILE_SLOTS
+        for slot, count in enumerate(hand.counts):
+            mapped[self._slots[slot]] = count
+        return ArrayTileSet.from_counts(mapped, [hand.aka_counts[source] for source in self.order])
+
+    def apply_pattern(self, win_pattern: WinPattern) -> WinPattern:
+        if isinstance(win_pattern, UniquePairs) and win_pattern.used:
+            return UniquePairs(win_pattern.pairs, set(self.apply(tile) for tile in win_pattern.used))
+        return win_pattern
+
+    def __eq__(self, other):
+        return isinstance(other, SuitTransform) and self._slots == other._slots
+
+    def __hash__(self):
+        return hash(tuple(self._slots))
+
+    def __repr__(self):
+        return "<SuitTransform %s>" % ','.join(
+            ("~" if reflect else "") + SUIT_COLORS[source] for source, reflect in zip(self.order, self.reflected)
+        )
+
+
+def canonicalize(hand, reflect: bool = True) -> Tuple[ArrayTileSet, SuitTransform]:
+    """
+    normal form of hand: suits sorted by their counts (each suit reflected first if it gets smaller).
+    hands in the same form have the same waiting step, and their useful tiles map to each other by the transform.
+    """
+    counts = tile_counts(hand)
+    blocks = []
+    for source in range(len(SUIT_COLORS)):
+        block = tuple(counts[source * SUIT_LENGTH:(source + 1) * SUIT_LENGTH])
+        reflected = reflect and block[::-1] < block
+        blocks.append((block[::-1] if reflected else block, source, reflected))
+    blocks.sort()
+    transform = SuitTransform([source for _, source, _ in blocks], [reflected for _, _, reflected in blocks])
+    return transform.apply_hand(hand), transform
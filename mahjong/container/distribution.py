@@ -5,6 +5,9 @@ from abc import abstractmethod
 from collections import Iterator, Counter
 from numbers import Number
 
+import numpy as np
+
+from .array_set import TILE_SLOTS
 from .set import TileSet
 from ..tile.definition import Tile
 from .utils import tile_set_from_string
@@ -24,10 +27,10 @@ class TileDistribution:
     def pick(self, tile: Tile) -> TileDistribution:
         pass
 
-    def sample(self, count: int) -> Iterator[Tile]:
+    def sample(self, count: int, rng: random.Random = random) -> Iterator[Tile]:
         current = self
         for i in range(count):
-            next_item, *_ = random.choices(TileDistribution.ALL_TILES, current.weights())
+            next_item, *_ = rng.choices(TileDistribution.ALL_TILES, current.weights())
             # print(next_item)
             yield next_item
             current = current.pick(next_item)
@@ -42,3 +45,48 @@ class StaticWall(TileDistribution):
 
     def pick(self, tile: Tile) -> TileDistribution:
         return StaticWall(self._tiles - Counter([tile]))
+
+    def sample(self, count: int, rng: random.Random = random) -> Iterator[Tile]:
+        # partial Fisher-Yates shuffle, same distribution as picking tiles one by one.
+        tiles = list(self._tiles.tiles())
+        if count > len(tiles):
+            raise ValueError("can not draw %d tiles from a wall of %d" % (count, len(tiles)))
+        for i in range(count):
+            j = i + int(rng.random() * (len(tiles) - i))
+            tiles[i], tiles[j] = tiles[j], tiles[i]
+            yield tiles[i]
+
+
+def wall_slots(counts) -> np.ndarray:
+    """
+    tile counts in ArrayTileSet slot order -> flat array of slots, one for each tile in the wall.
+    """
+    return np.repeat(np.arange(TILE_SLOTS), np.asarray(counts))
+
+
+def sample_wall_draws(counts, count: int, experiments: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    draw count tiles without replacement from the wall of counts, independently for each experiment.
+    returns (experiments, count) slots in draw order, by sorting random keys of every tile in the wall.
+    """
+    slots = wall_slots(counts)
+    if count > len(slots):
+        raise ValueError("can not draw %d tiles from a wall of %d" % (count, len(slots)))
+    if count == 0:
+        return np.zeros((experiments, 0), dtype=slots.dtype)
+    keys = rng.random((experiments, len(slots)))
+    picked = np.argpartition(keys, count - 1, axis=1)[:, :count]
+    order = np.argsort(np.take_along_axis(keys, picked, axis=1), axis=1)
+    return slots[np.take_along_axis(picked, order, axis=1)]
+
+
+def draw_counts(draws: np.ndarray, taken=None) -> np.ndarray:
+    """
+    (experiments, count) drawn slots -> (experiments, 34) tile counts.
+    with taken, only the first taken[i] draws of experiment i are counted.
+    """
+    experiments, count = np.shape(draws)
+    offsets = np.arange(experiments)[:, None] * TILE_SLOTS
+    weights = None if taken is None else (np.arange(count) < np.asarray(taken)[:, None]).ravel()
+    counts = np.bincount((draws + offsets).ravel(), weights=weights, minlength=experiments * TILE_SLOTS)
+    return counts.astype(np.int64).reshape((experiments, TILE_SLOTS))
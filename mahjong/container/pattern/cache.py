@@ -0,0 +1,137 @@
+from collections import OrderedDict, namedtuple
+from typing import Callable, Hashable, Iterator, Optional, Set, Tuple, TypeVar
+
+from .reasoning import Waiting
+from ..array_set import tile_counts, tile_slot
+from ..canonical import canonicalize, SuitTransform
+from ...tile.definition import Tile
+
+DEFAULT_CACHE_SIZE = 1 << 16
+
+_COUNT_BITS = 4
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+T = TypeVar("T")
+
+_MISSING = object()
+
+_IDENTITY = SuitTransform()
+
+
+def hand_key(hand) -> int:
+    """
+    tile counts packed into an int, 4 bits per kind in slot order. aka fives count as their plain fives.
+    """
+    key = 0
+    for count in reversed(tile_counts(hand)):
+        key = (key << _COUNT_BITS) | count
+    return key
+
+
+class LRUCache:
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive, got %d" % maxsize)
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+
+    def get(self, key: Hashable, default=None):
+        value = self._data.get(key, _MISSING)
+        if value is _MISSING:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self._data.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, value):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], T]) -> T:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def info(self) -> CacheInfo:
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._data))
+
+    def clear(self):
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+
+class CachedWaiting(Waiting):
+    """
+    Memoize results of another Waiting by hand_key and WinPattern.pattern_key.
+    with canonical, hands are brought to canonicalize normal form first, so suit-permuted
+    and reflected shapes share one entry. patterns without pattern_key are passed through.
+    """
+
+    def __init__(self, waiting: Waiting, cache: Optional[LRUCache] = None, canonical: bool = True):
+        super().__init__(waiting.win_pattern)
+        self.waiting = waiting
+        self.cache = cache if cache is not None else LRUCache()
+        self.canonical = canonical
+        self._cacheable = waiting.win_pattern.pattern_key() is not None
+
+    def _resolve(self, name: str, hand, ignore_4counts) -> Tuple[Tuple, Waiting, object, SuitTransform]:
+        if self.canonical:
+            hand, transform = canonicalize(hand)
+            pattern = transform.apply_pattern(self.win_pattern)
+        else:
+            transform = _IDENTITY
+            pattern = self.win_pattern
+        waiting = self.waiting if pattern is self.win_pattern else type(self.waiting)(pattern)
+        key = type(self.waiting), pattern.pattern_key(), bool(ignore_4counts), name, hand_key(hand)
+        return key, waiting, hand, transform
+
+    def waiting_and_useful_tiles(self, hand, ignore_4counts=True) -> Tuple[int, Set[Tile]]:
+        if not self._cacheable:
+            return self.waiting.waiting_and_useful_tiles(hand, ignore_4counts)
+        key, waiting, resolved_hand, transform = self._resolve("waiting_and_useful_tiles", hand, ignore_4counts)
+
+        def compute():
+            step, useful = waiting.waiting_and_useful_tiles(resolved_hand, ignore_4counts)
+            return step, frozenset(useful)
+
+        step, useful = self.cache.get_or_compute(key, compute)
+        return step, set(transform.inverse(tile) for tile in useful)
+
+    def before_waiting_step(self, hand, ignore_4counts=True) -> int:
+        step, _ = self.waiting_and_useful_tiles(hand, ignore_4counts)
+        return step
+
+    def useful_tiles(self, hand, ignore_4counts=True) -> Set[Tile]:
+        _, useful = self.waiting_and_useful_tiles(hand, ignore_4counts)
+        return useful
+
+    def batch_waiting_and_useful_tiles(self, hand, ignore_4counts=True) -> Iterator[Tuple[Tile, int, Set[Tile]]]:
+        if not self._cacheable:
+            yield from self.waiting.batch_waiting_and_useful_tiles(hand, ignore_4counts)
+            return
+        key, waiting, resolved_hand, transform = self._resolve("batch_waiting_and_useful_tiles", hand,
+                                                               ignore_4counts)
+        batch = self.cache.get_or_compute(
+            key,
+            lambda: [(tile_slot(tile), step, frozenset(useful)) for tile, step, useful in
+                     waiting.batch_waiting_and_useful_tiles(resolved_hand, ignore_4counts)]
+        )
+        # discards are kept as slots, yield the tile objects of this hand (such as aka fives) instead.
+        hand_tiles = {tile_slot(tile): tile for tile, count in hand.items() if count > 0}
+        for slot, step, useful in batch:
+            yield hand_tiles[transform.inverse_slot(slot)], step, set(transform.inverse(tile) for tile in useful)
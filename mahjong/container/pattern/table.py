@@ -0,0 +1,316 @@
+from __future__ import annotations
+
+from abc import ABCMeta, abstractmethod
+from functools import lru_cache
+from typing import Callable, Iterable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .reasoning import Waiting, HeuristicPatternMatchWaiting
+from .table_cache import load_table
+from .win import WinPattern, NormalTypeWin, UniquePairs
+from ..array_set import tile_counts, tile_slot, slot_tile, TILE_SLOTS, SUIT_LENGTH, HONOR_LENGTH
+from ...tile.definition import Tile
+
+MAX_TILE_COUNT = 4
+TABLE_BASE = MAX_TILE_COUNT + 1
+MAX_MELDS = 4
+MAX_PAIRS = 1
+
+_IMPOSSIBLE = -100
+
+# (first slot, block length, has sequences) for m, p, s and z.
+BLOCKS = [
+    (0, SUIT_LENGTH, True),
+    (SUIT_LENGTH, SUIT_LENGTH, True),
+    (SUIT_LENGTH * 2, SUIT_LENGTH, True),
+    (SUIT_LENGTH * 3, HONOR_LENGTH, False),
+]
+
+_ROW_LENGTH = (MAX_MELDS + 1) * (MAX_PAIRS + 1)
+
+_SLOT_BLOCK_INDEX = np.array([block_index for block_index, (_, length, _) in enumerate(BLOCKS) for _ in range(length)])
+
+_SLOT_WEIGHT = np.array([TABLE_BASE ** (length - 1 - offset) for start, length, _ in BLOCKS
+                         for offset in range(length)])
+
+
+def build_block_table(length: int, sequences: bool) -> np.ndarray:
+    """
+    table[pattern, m, p] is the max count of tiles in a block used by exactly m melds and p pairs placed in it,
+    where each kind is used at most 4 times by these melds and pairs (borrowed tiles included).
+    pattern encodes the counts of each kind in base 5, first kind as the most significant digit.
+    """
+    meld_axis, pair_axis = MAX_MELDS + 1, MAX_PAIRS + 1
+    unit_counts = np.arange(TABLE_BASE, dtype=np.int8)
+    # states of (sequences started at previous kind, sequences started at the kind before) -> table of suffix
+    final = np.full((1, meld_axis, pair_axis), _IMPOSSIBLE, dtype=np.int8)
+    final[0, 0, 0] = 0
+    states = {(0, 0): final}
+    for digit in reversed(range(length)):
+        max_start = MAX_TILE_COUNT if sequences and digit <= length - 3 else 0
+        current_states = {}
+        for started_1 in range(MAX_TILE_COUNT + 1 if sequences and digit >= 1 else 1):
+            for started_2 in range(MAX_TILE_COUNT + 1 - started_1 if sequences and digit >= 2 else 1):
+                best = None
+                for start, triplet, pair in ((n, t, q) for n in range(max_start + 1)
+                                             for t in range(2) for q in range(pair_axis)):
+                    units = started_1 + started_2 + start + triplet * 3 + pair * 2
+                    follow = states.get((start, started_1))
+                    if units > MAX_TILE_COUNT or follow is None:
+                        continue
+                    melds = start + triplet
+                    shifted = np.full_like(follow, _IMPOSSIBLE)
+                    shifted[:, melds:, pair:] = follow[:, :meld_axis - melds, :pair_axis - pair]
+                    candidate = np.minimum(unit_counts, units)[:, None, None, None] + shifted[None]
+                    best = candidate if best is None else np.maximum(best, candidate, out=best)
+                if best is not None:
+                    current_states[(started_1, started_2)] = best.reshape((-1, meld_axis, pair_axis))
+        states = current_states
+    table = states[(0, 0)]
+    assert table.min() >= 0
+    return table.astype(np.uint8)
+
+
+@lru_cache(maxsize=None)
+def suit_table() -> np.ndarray:
+    return load_table("suit", lambda: build_block_table(SUIT_LENGTH, True))
+
+
+@lru_cache(maxsize=None)
+def honor_table() -> np.ndarray:
+    return load_table("honor", lambda: build_block_table(HONOR_LENGTH, False))
+
+
+def block_tables() -> List[np.ndarray]:
+    return [suit_table() if sequences else honor_table() for _, _, sequences in BLOCKS]
+
+
+@lru_cache(maxsize=None)
+def _block_row_tables() -> List[np.ndarray]:
+    return [table.reshape((-1, _ROW_LENGTH)) for table in block_tables()]
+
+
+def block_patterns(counts: np.ndarray) -> np.ndarray:
+    """
+    counts: (..., 34) tile counts -> (..., 4) pattern index of each block.
+    """
+    clipped = np.clip(counts, 0, MAX_TILE_COUNT) * _SLOT_WEIGHT
+    return np.stack([clipped[..., start:start + length].sum(axis=-1) for start, length, _ in BLOCKS], axis=-1)
+
+
+def block_rows(patterns: np.ndarray) -> np.ndarray:
+    """
+    patterns: (..., 4) pattern index of each block -> (..., 4, 10) max used tiles of (melds, pairs) in each block.
+    """
+    return np.stack([
+        table[patterns[..., block_index]]
+        for block_index, table in enumerate(_block_row_tables())
+    ], axis=-2)
+
+
+def _compositions(total: int, parts: int, limit: int) -> Iterator[Tuple[int, ...]]:
+    if parts == 1:
+        if total <= limit:
+            yield total,
+        return
+    for head in range(min(total, limit) + 1):
+        for tail in _compositions(total - head, parts - 1, limit):
+            yield (head,) + tail
+
+
+@lru_cache(maxsize=None)
+def block_splits(melds: int, pairs: int) -> np.ndarray:
+    """
+    all ways to place melds and pairs into blocks, as (4, K) indices of block rows.
+    """
+    return np.array([
+        [meld * (MAX_PAIRS + 1) + pair for meld, pair in zip(meld_split, pair_split)]
+        for meld_split in _compositions(melds, len(BLOCKS), MAX_MELDS)
+        for pair_split in _compositions(pairs, len(BLOCKS), MAX_PAIRS)
+    ]).T
+
+
+def best_used(rows: np.ndarray, melds: int, pairs: int) -> np.ndarray:
+    """
+    rows: (..., 4, 10) block rows -> (...) max used tiles of all blocks by exactly melds and pairs.
+    """
+    splits = block_splits(melds, pairs)
+    return rows[..., np.arange(len(BLOCKS))[:, None], splits].sum(axis=-2, dtype=np.int64).max(axis=-1)
+
+
+class _TableEvaluator(metaclass=ABCMeta):
+    @abstractmethod
+    def steps(self, counts: np.ndarray) -> np.ndarray:
+        pass
+
+    def steps_with_rows(self, counts: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """
+        steps when block_rows of counts are known already.
+        """
+        return self.steps(counts)
+
+    def step(self, counts) -> int:
+        return int(self.steps(np.asarray(counts)))
+
+    def useful_slots(self, counts, step) -> Iterator[int]:
+        counts = np.asarray(counts)
+        drawn = counts + np.eye(TILE_SLOTS, dtype=counts.dtype)
+        steps = self.steps(drawn)
+        return (int(slot) for slot in np.flatnonzero((steps < step) & (counts < MAX_TILE_COUNT)))
+
+
+class _NormalTableEvaluator(_TableEvaluator):
+    def __init__(self, win_pattern: NormalTypeWin):
+        if win_pattern.melds > MAX_MELDS or win_pattern.pairs > MAX_PAIRS:
+            raise ValueError("table supports at most %d melds and %d pairs, got %s" % (
+                MAX_MELDS, MAX_PAIRS, win_pattern
+            ))
+        self.melds = win_pattern.melds
+        self.pairs = win_pattern.pairs
+        self.need_count = win_pattern.need_count()
+
+    def steps(self, counts: np.ndarray) -> np.ndarray:
+        return self.steps_with_rows(counts, block_rows(block_patterns(counts)))
+
+    def steps_with_rows(self, counts: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        return self.need_count - best_used(rows, self.melds, self.pairs) - 1
+
+
+class _UniquePairsEvaluator(_TableEvaluator):
+    def __init__(self, win_pattern: UniquePairs):
+        self.pairs = win_pattern.pairs
+        self.available = np.ones(TILE_SLOTS, dtype=bool)
+        self.available[[tile_slot(tile) for tile in win_pattern.used]] = False
+
+    def steps(self, counts: np.ndarray) -> np.ndarray:
+        pairs = np.minimum(((counts >= 2) & self.available).sum(axis=-1), self.pairs)
+        singles = ((counts == 1) & self.available).sum(axis=-1)
+        used = pairs * 2 + np.minimum(singles, self.pairs - pairs)
+        return self.pairs * 2 - used - 1
+
+
+def _table_evaluator(win_pattern: WinPattern) -> _TableEvaluator:
+    if isinstance(win_pattern, NormalTypeWin):
+        return _NormalTableEvaluator(win_pattern)
+    elif isinstance(win_pattern, UniquePairs):
+        return _UniquePairsEvaluator(win_pattern)
+    else:
+        raise TypeError("no table for win pattern {}".format(win_pattern))
+
+
+class TableWaiting(Waiting):
+    """
+    Waiting of NormalTypeWin and UniquePairs, resolved by per-block lookup tables instead of searching.
+    Steps and useful tiles are the same as HeuristicPatternMatchWaiting.
+    """
+
+    def __init__(self, win_pattern: WinPattern):
+        super().__init__(win_pattern)
+        self._evaluator = _table_evaluator(win_pattern)
+
+    def _fallback(self) -> Waiting:
+        return HeuristicPatternMatchWaiting(self.win_pattern)
+
+    def before_waiting_step(self, hand, ignore_4counts=True) -> int:
+        if not ignore_4counts:
+            return self._fallback().before_waiting_step(hand, ignore_4counts)
+        return self._evaluator.step(tile_counts(hand))
+
+    def useful_tiles(self, hand, ignore_4counts=True) -> Set[Tile]:
+        _, useful = self.waiting_and_useful_tiles(hand, ignore_4counts)
+        return useful
+
+    def waiting_and_useful_tiles(self, hand, ignore_4counts=True) -> Tuple[int, Set[Tile]]:
+        if not ignore_4counts:
+            return self._fallback().waiting_and_useful_tiles(hand, ignore_4counts)
+        counts = tile_counts(hand)
+        step = self._evaluator.step(counts)
+        return step, set(slot_tile(slot) for slot in self._evaluator.useful_slots(counts, step))
+
+    def batch_waiting_and_useful_tiles(self, hand, ignore_4counts=True) -> Iterator[Tuple[Tile, int, Set[Tile]]]:
+        if not ignore_4counts:
+            yield from self._fallback().batch_waiting_and_useful_tiles(hand, ignore_4counts)
+            return
+        counts = np.array(tile_counts(hand))
+        step = self._evaluator.step(counts)
+        discards = [(tile, tile_slot(tile)) for tile, count in hand.items() if count > 0]
+        discarded = counts - np.eye(TILE_SLOTS, dtype=counts.dtype)[[slot for _, slot in discards]]
+        for (tile, _), left, left_step in zip(discards, discarded, self._evaluator.steps(discarded)):
+            if left_step == step:
+                yield tile, step, set(slot_tile(useful) for useful in self._evaluator.useful_slots(left, step))
+
+
+class IncrementalHand:
+    """
+    Tile counts with waiting steps of win patterns kept up to date tile by tile.
+    a drawn or discarded tile only looks up the table row of its own block again.
+    """
+
+    def __init__(self, hand, win_patterns: List[WinPattern]):
+        self.counts = np.array(tile_counts(hand))
+        self._patterns = block_patterns(self.counts)
+        self._rows = block_rows(self._patterns)
+        self._evaluators = [_table_evaluator(win_pattern) for win_pattern in win_patterns]
+
+    def _change(self, slot: int, delta: int):
+        count = self.counts[slot] + delta
+        if not 0 <= count <= MAX_TILE_COUNT:
+            raise ValueError("count of %s would be %d" % (slot_tile(slot), count))
+        self.counts[slot] = count
+        block_index = _SLOT_BLOCK_INDEX[slot]
+        self._patterns[block_index] += delta * _SLOT_WEIGHT[slot]
+        self._rows[block_index] = _block_row_tables()[block_index][self._patterns[block_index]]
+
+    def draw(self, slot: int):
+        self._change(slot, 1)
+
+    def discard(self, slot: int):
+        self._change(slot, -1)
+
+    def step(self) -> int:
+        return min(int(evaluator.steps_with_rows(self.counts, self._rows)) for evaluator in self._evaluators)
+
+    def is_win(self) -> bool:
+        return self.step() < 0
+
+    def discard_steps(self, slots: List[int]) -> np.ndarray:
+        """
+        steps after discarding each of slots, without changing the hand.
+        """
+        slots = np.asarray(slots)
+        counts = self.counts - np.eye(TILE_SLOTS, dtype=self.counts.dtype)[slots]
+        rows = np.repeat(self._rows[None], len(slots), axis=0)
+        blocks = _SLOT_BLOCK_INDEX[slots]
+        patterns = self._patterns[blocks] - _SLOT_WEIGHT[slots]
+        tables = _block_row_tables()
+        for block_index in set(blocks.tolist()):
+            in_block = blocks == block_index
+            rows[in_block, block_index] = tables[block_index][patterns[in_block]]
+        return np.min([evaluator.steps_with_rows(counts, rows) for evaluator in self._evaluators], axis=0)
+
+    def play(self, draws: Iterable[int], policy: Optional[DiscardPolicy] = None) -> int:
+        """
+        draw slots one by one, return the 1-based index of the draw that wins, -1 if none.
+        without policy the hand keeps every drawn tile, otherwise policy picks a slot to discard after each draw.
+        """
+        for index, slot in enumerate(draws, 1):
+            self.draw(slot)
+            if self.is_win():
+                return index
+            if policy is not None:
+                discard = policy(self, slot)
+                if discard is not None:
+                    self.discard(discard)
+        return -1
+
+
+DiscardPolicy = Callable[[IncrementalHand, int], Optional[int]]
+
+
+def min_step_discard(hand: IncrementalHand, drawn: int) -> int:
+    """
+    discard the tile keeping the least step, the drawn tile first and then lower slots on ties.
+    """
+    candidates = [drawn] + [slot for slot in np.flatnonzero(hand.counts).tolist() if slot != drawn]
+    return candidates[int(np.argmin(hand.discard_steps(candidates)))]
@@ -0,0 +1,97 @@
+import hashlib
+import os
+import sys
+import tempfile
+from typing import Callable, List, Optional
+
+import numpy as np
+from loguru import logger
+
+from ...cache_dir import user_cache_dir
+
+# bump whenever the tables change: their layout, the meaning of entries, or build_block_table and
+# the block patterns it enumerates in table.py. file names only follow this version, so a builder
+# change without a bump keeps loading stale tables.
+TABLE_FORMAT_VERSION = 1
+
+TABLE_PACKAGE = "mahjong.templates"
+TABLE_SUFFIX = ".npy"
+
+
+def table_fingerprint() -> str:
+    """
+    version of the tables in file names, changes only with TABLE_FORMAT_VERSION.
+    """
+    return hashlib.sha1(("table-format-%d" % TABLE_FORMAT_VERSION).encode()).hexdigest()[:12]
+
+
+def table_file_name(name: str) -> str:
+    return "{}_table-{}{}".format(name, table_fingerprint(), TABLE_SUFFIX)
+
+
+def package_table_dir() -> str:
+    if getattr(sys, 'frozen', False):
+        return os.path.join(sys._MEIPASS, *TABLE_PACKAGE.split('.'))
+    return os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "templates")
+
+
+def user_table_dir() -> str:
+    return user_cache_dir()
+
+
+def table_dirs() -> List[str]:
+    return [package_table_dir(), user_table_dir()]
+
+
+def _remove_stale(directory: str, name: str, file_name: str):
+    prefix = "{}_table-".format(name)
+    for stale in os.listdir(directory):
+        if stale.startswith(prefix) and stale.endswith(TABLE_SUFFIX) and stale != file_name:
+            try:
+                os.remove(os.path.join(directory, stale))
+            except OSError:
+                pass
+
+
+def save_table(table: np.ndarray, directory: str, name: str) -> Optional[str]:
+    file_name = table_file_name(name)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(suffix=TABLE_SUFFIX, dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as temp_file:
+                np.save(temp_file, table)
+            os.chmod(temp_path, 0o644)
+            os.replace(temp_path, os.path.join(directory, file_name))
+        except BaseException:
+            os.remove(temp_path)
+            raise
+    except OSError as e:
+        logger.debug("can not save table {} to {}: {}", name, directory, e)
+        return None
+    _remove_stale(directory, name, file_name)
+    return os.path.join(directory, file_name)
+
+
+def load_table(name: str, build: Callable[[], np.ndarray], directories: Optional[List[str]] = None) -> np.ndarray:
+    """
+    memory-map table file of current version from the first directory having it,
+    otherwise build it and save it to the first writable directory (kept in memory if none).
+    """
+    if directories is None:
+        directories = table_dirs()
+    file_name = table_file_name(name)
+    for directory in directories:
+        path = os.path.join(directory, file_name)
+        if os.path.isfile(path):
+            try:
+                return np.load(path, mmap_mode='r')
+            except (OSError, ValueError) as e:
+                logger.warning("broken table file {}: {}", path, e)
+    logger.info("generating {} table", name)
+    table = build()
+    for directory in directories:
+        path = save_table(table, directory, name)
+        if path is not None:
+            return np.load(path, mmap_mode='r')
+    return table
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
 from abc import ABCMeta, abstractmethod
-from typing import List, Optional, Iterator, Iterable, Tuple, Set
+from typing import List, Optional, Iterator, Iterable, Tuple, Set, Hashable
+
+import numpy as np
 
 from ...tile.definition import Tile
+from ..array_set import ArrayTileSet, TILE_SLOTS, tile_slot
 from ..set import TileSet
 from ..utils import distinct
 
@@ -26,7 +29,7 @@ class WinPattern(metaclass=ABCMeta):
             return
         hand = hand.copy()
 
-        possible_units = TileSet()
+        possible_units = type(hand)()
 
         unit_list = list(self.update_possible_units(hand, possible_units))
 
@@ -64,6 +67,13 @@ class WinPattern(metaclass=ABCMeta):
                         states_list.append((unit, next_state))
             yield tile, states_list
 
+    def batch_match(self, hands: np.ndarray) -> np.ndarray:
+        """
+        hands: (N, 34) tile counts in ArrayTileSet slot order -> (N,) bool of match on each hand.
+        """
+        return np.array([self.match(ArrayTileSet.from_counts(hand)) for hand in np.asarray(hands).tolist()],
+                        dtype=bool)
+
     def unique_win_selections(self, hand: TileSet) -> Iterator[List[TileSet]]:
         return distinct((sorted(selection) for selection in self.win_selections(hand)))
 
@@ -87,6 +97,12 @@ class WinPattern(metaclass=ABCMeta):
     def need_units(self) -> int:
         pass
 
+    def pattern_key(self) -> Optional[Hashable]:
+        """
+        hashable key that equals for patterns with the same states, None if the pattern can not be keyed.
+        """
+        return None
+
 
 class NormalTypeWin(WinPattern):
     def need_units(self) -> int:
@@ -106,9 +122,27 @@ class NormalTypeWin(WinPattern):
         self._pairs = pairs
         self._melds = melds
 
+    @property
+    def pairs(self) -> int:
+        return self._pairs
+
+    @property
+    def melds(self) -> int:
+        return self._melds
+
+    def pattern_key(self) -> Optional[Hashable]:
+        return "normal", self._pairs, self._melds
+
     def has_win(self) -> bool:
         return self._pairs == 0 and self._melds == 0
 
+    def batch_match(self, hands: np.ndarray) -> np.ndarray:
+        from .table import MAX_MELDS, MAX_PAIRS, best_used, block_patterns, block_rows
+        if self._melds > MAX_MELDS or self._pairs > MAX_PAIRS:
+            return super().batch_match(hands)
+        used = best_used(block_rows(block_patterns(np.asarray(hands))), self._melds, self._pairs)
+        return used == self.need_count()
+
     def next_states(self, tile: Tile) -> Optional[Iterable[Tuple[TileSet, WinPattern]]]:
         if self._pairs > 0:
             yield (tile.pair(), NormalTypeWin(self._pairs - 1, self._melds))
@@ -135,9 +169,25 @@ class UniquePairs(WinPattern):
         self._pairs = pairs
         self._used = used
 
+    @property
+    def pairs(self) -> int:
+        return self._pairs
+
+    @property
+    def used(self) -> Set[Tile]:
+        return self._used
+
+    def pattern_key(self) -> Optional[Hashable]:
+        return "unique_pairs", self._pairs, frozenset(self._used)
+
     def has_win(self) -> bool:
         return self._pairs == 0
 
+    def batch_match(self, hands: np.ndarray) -> np.ndarray:
+        available = np.ones(TILE_SLOTS, dtype=bool)
+        available[[tile_slot(tile) for tile in self._used]] = False
+        return ((np.asarray(hands) >= 2) & available).sum(axis=-1) >= self._pairs
+
     def next_states(self, tile: Tile) -> Optional[Iterable[Tuple[TileSet, WinPattern]]]:
         if tile not in self._used and self._pairs > 0:
             yield (tile.pair(), UniquePairs(self._pairs - 1, self._used | {tile}))
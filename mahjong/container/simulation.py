@@ -0,0 +1,275 @@
+import math
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from time import perf_counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .array_set import ArrayTileSet, tile_counts
+from .distribution import TileDistribution, sample_wall_draws, draw_counts
+from .pattern.table import IncrementalHand, DiscardPolicy
+from .pattern.win import WinPattern, NormalTypeWin, UniquePairs
+from .set import TileSet
+from ..tile.definition import Tile
+
+# experiments of one shard, fixed so results do not depend on the number of workers.
+SHARD_SIZE = 256
+
+# shards run between two checks of separation, fixed so the stop point does not depend on the number of workers.
+SEPARATION_CHECK_SHARDS = 8
+
+
+class ShardResult:
+    """
+    counters of one shard indexed by discard: win counts, averaged win counts and condition win counts.
+    """
+
+    def __init__(self, discard_count: int, draw_count: int = 0):
+        self.experiments = 0
+        self.win_counts = np.zeros(discard_count, dtype=np.int64)
+        # [discard, k - 1] counts experiments first winning at the k-th draw.
+        self.win_draw_counts = np.zeros((discard_count, draw_count), dtype=np.int64)
+        self.avg_win_counts = np.zeros(discard_count, dtype=np.double)
+        self.condition_win_counts = np.zeros((discard_count, discard_count), dtype=np.double)
+
+    def merge(self, other):
+        self.experiments += other.experiments
+        self.win_counts += other.win_counts
+        self.win_draw_counts += other.win_draw_counts
+        self.avg_win_counts += other.avg_win_counts
+        self.condition_win_counts += other.condition_win_counts
+
+
+class WinRateResult:
+    def __init__(self, input_hand: TileSet, discard_tiles: List[Tile], merged: ShardResult, seed: int):
+        self.input_hand = input_hand
+        self.discard_tiles = discard_tiles
+        self.seed = seed
+        self.try_count = merged.experiments
+        self.win_counter = Counter()
+        self.avg_win_counter = Counter()
+        self.condition_win_counter = defaultdict(Counter)
+        for index, tile in enumerate(discard_tiles):
+            if merged.win_counts[index]:
+                self.win_counter[tile] = int(merged.win_counts[index])
+            if merged.avg_win_counts[index]:
+                self.avg_win_counter[tile] = float(merged.avg_win_counts[index])
+            for win_index, win_tile in enumerate(discard_tiles):
+                if merged.condition_win_counts[index, win_index]:
+                    self.condition_win_counter[tile][win_tile] = float(merged.condition_win_counts[index, win_index])
+        self.total_win_count = sum(self.win_counter.values())
+        self.win_by_draw = {tile: merged.win_draw_counts[index].tolist() for index, tile in enumerate(discard_tiles)}
+        self.stopped_by = "tries"
+
+
+def shard_rng(seed: int, shard_index: int) -> np.random.Generator:
+    return np.random.default_rng(np.random.SeedSequence([seed, shard_index]))
+
+
+def batch_match_any(win_patterns: List[WinPattern], hands: np.ndarray) -> np.ndarray:
+    wins = np.zeros(len(hands), dtype=bool)
+    for win_pattern in win_patterns:
+        wins |= win_pattern.batch_match(hands)
+    return wins
+
+
+def first_win_draws(hands: np.ndarray, draws: np.ndarray, win_patterns: List[WinPattern]) -> np.ndarray:
+    """
+    hands: (N, 34) counts, draws: (N, K) drawn slots in order -> (N,) least k that hand with first k draws
+    matches any of win_patterns, -1 if it never does. drawing more tiles never loses a win,
+    so only hands winning with all K draws are searched, by bisection on k.
+    """
+    hands = np.asarray(hands)
+    first = np.full(len(hands), -1, dtype=np.int64)
+    rows = np.flatnonzero(batch_match_any(win_patterns, hands + draw_counts(draws)))
+    low = np.zeros(len(rows), dtype=np.int64)
+    high = np.full(len(rows), np.shape(draws)[1], dtype=np.int64)
+    while True:
+        active = np.flatnonzero(low < high)
+        if len(active) == 0:
+            break
+        middle = (low[active] + high[active]) // 2
+        active_rows = rows[active]
+        wins = batch_match_any(win_patterns, hands[active_rows] + draw_counts(draws[active_rows], middle))
+        high[active[wins]] = middle[wins]
+        low[active[~wins]] = middle[~wins] + 1
+    first[rows] = low
+    return first
+
+
+def play_draws(hands: np.ndarray, draws: np.ndarray, win_patterns: List[WinPattern],
+               policy: DiscardPolicy) -> np.ndarray:
+    """
+    like first_win_draws, but each hand discards by policy after every draw, tracked by IncrementalHand.
+    """
+    return np.array([IncrementalHand(ArrayTileSet.from_counts(hand), win_patterns).play(hand_draws, policy)
+                     for hand, hand_draws in zip(np.asarray(hands).tolist(), np.asarray(draws).tolist())],
+                    dtype=np.int64)
+
+
+def simulate_shard(discard_counts: np.ndarray, remain_counts: List[int], remain_draw_count: int,
+                   experiments: int, seed: int, shard_index: int,
+                   win_patterns: Optional[List[WinPattern]] = None,
+                   policy: Optional[DiscardPolicy] = None) -> ShardResult:
+    if win_patterns is None:
+        win_patterns = [NormalTypeWin(), UniquePairs()]
+    rng = shard_rng(seed, shard_index)
+    discard_count = len(discard_counts)
+    draws = sample_wall_draws(remain_counts, remain_draw_count, experiments, rng)
+    # rows of experiment-major, discard-minor order.
+    hands = np.tile(discard_counts, (experiments, 1))
+    hand_draws = np.repeat(draws, discard_count, axis=0)
+    if policy is None:
+        first = first_win_draws(hands, hand_draws, win_patterns)
+    else:
+        first = play_draws(hands, hand_draws, win_patterns, policy)
+    first = first.reshape((experiments, discard_count))
+    wins = first >= 0
+
+    result = ShardResult(discard_count, remain_draw_count)
+    result.experiments = experiments
+    for discard_index in range(discard_count):
+        won = first[:, discard_index][wins[:, discard_index]]
+        result.win_draw_counts[discard_index] += np.bincount(np.maximum(won - 1, 0),
+                                                             minlength=remain_draw_count)[:remain_draw_count]
+    for experiment_wins in wins:
+        win_number = int(experiment_wins.sum())
+        if win_number == 0:
+            continue
+        result.win_counts += experiment_wins
+        share = experiment_wins / win_number
+        result.avg_win_counts += share
+        result.condition_win_counts[~experiment_wins] += share
+    return result
+
+
+def z_score(confidence: float) -> float:
+    """
+    two-sided z of the standard normal distribution for confidence in (0, 1), by bisection on erf.
+    """
+    if not 0 < confidence < 1:
+        raise ValueError("confidence should be in (0, 1), got %s" % confidence)
+    low, high = 0.0, 40.0
+    for _ in range(100):
+        middle = (low + high) / 2
+        if math.erf(middle / math.sqrt(2)) < confidence:
+            low = middle
+        else:
+            high = middle
+    return (low + high) / 2
+
+
+def wilson_interval(wins: np.ndarray, tries: int, z: float) -> Tuple[np.ndarray, np.ndarray]:
+    if tries == 0:
+        return np.zeros(np.shape(wins)), np.ones(np.shape(wins))
+    rate = np.asarray(wins) / tries
+    denominator = 1 + z * z / tries
+    center = (rate + z * z / (2 * tries)) / denominator
+    half_width = z * np.sqrt(rate * (1 - rate) / tries + z * z / (4 * tries * tries)) / denominator
+    return center - half_width, center + half_width
+
+
+def is_separated(wins: np.ndarray, tries: int, z: float) -> bool:
+    """
+    whether the discard with most wins has its interval lower bound above upper bounds of all others.
+    """
+    if len(wins) < 2:
+        return tries > 0
+    low, high = wilson_interval(wins, tries, z)
+    best = int(np.argmax(wins))
+    return bool(low[best] > np.delete(high, best).max())
+
+
+def _prepare(input_hand: TileSet):
+    remain_tiles = TileSet(TileDistribution.ALL_TILES * 4) - input_hand
+    possible_discard: Dict[Tile, TileSet] = {tile: input_hand - TileSet([tile]) for tile in input_hand}
+    discard_tiles = list(possible_discard.keys())
+    discard_counts = np.array([tile_counts(hand) for hand in possible_discard.values()])
+    return discard_tiles, discard_counts, tile_counts(remain_tiles)
+
+
+def _shard_sizes(try_count: int) -> List[int]:
+    return [min(SHARD_SIZE, try_count - start) for start in range(0, try_count, SHARD_SIZE)]
+
+
+def _pool(workers: int):
+    return ProcessPoolExecutor(max_workers=workers) if workers > 1 else nullcontext()
+
+
+def _run_shards(executor: Optional[ProcessPoolExecutor], shard_args: List[Tuple]):
+    if executor is None:
+        return (simulate_shard(*args) for args in shard_args)
+    return executor.map(simulate_shard, *zip(*shard_args))
+
+
+def _merge_shards(merged: ShardResult, shard_results, try_count: int, progress):
+    for shard_result in shard_results:
+        merged.merge(shard_result)
+        if progress is not None:
+            progress(merged.experiments, try_count)
+
+
+def simulate(input_hand: TileSet, remain_draw_count: int, try_count: int, seed: Optional[int] = None,
+             workers: int = 1, progress: Optional[Callable[[int, int], None]] = None,
+             policy: Optional[DiscardPolicy] = None) -> WinRateResult:
+    """
+    estimate win rate of each discard of a 14-tile hand by drawing remain_draw_count tiles try_count times.
+    experiments are split into shards of SHARD_SIZE, each with its own RNG seeded by (seed, shard index)
+    and merged in shard order, so a seed gives identical results for any workers.
+    drawn tiles are all kept without policy, otherwise policy discards one tile after each draw.
+    """
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+    discard_tiles, discard_counts, remain_counts = _prepare(input_hand)
+    shard_args = [(discard_counts, remain_counts, remain_draw_count, size, seed, index, None, policy)
+                  for index, size in enumerate(_shard_sizes(try_count))]
+    merged = ShardResult(len(discard_tiles), remain_draw_count)
+    with _pool(workers) as executor:
+        _merge_shards(merged, _run_shards(executor, shard_args), try_count, progress)
+    return WinRateResult(input_hand, discard_tiles, merged, seed)
+
+
+def simulate_until_separated(input_hand: TileSet, remain_draw_count: int, confidence: float = 0.95,
+                             time_budget: float = 10.0, max_try_count: Optional[int] = None,
+                             seed: Optional[int] = None, workers: int = 1,
+                             progress: Optional[Callable[[int, int], None]] = None,
+                             policy: Optional[DiscardPolicy] = None) -> WinRateResult:
+    """
+    like simulate, but check after every SEPARATION_CHECK_SHARDS shards, and stop once the Wilson interval
+    of the best discard's win rate is separated from all others at confidence, time_budget seconds passed,
+    or max_try_count experiments are done. result.stopped_by tells which one happened.
+    the first round always runs, even if time_budget is already used up by then.
+    """
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+    z = z_score(confidence)
+    discard_tiles, discard_counts, remain_counts = _prepare(input_hand)
+    merged = ShardResult(len(discard_tiles), remain_draw_count)
+    deadline = perf_counter() + time_budget
+    shard_index = 0
+    stopped_by = "time"
+    with _pool(workers) as executor:
+        # at least one round is done, so the result always has experiments.
+        while True:
+            round_size = SHARD_SIZE * SEPARATION_CHECK_SHARDS
+            if max_try_count is not None:
+                round_size = min(round_size, max_try_count - merged.experiments)
+            shard_args = []
+            for size in _shard_sizes(round_size):
+                shard_args.append((discard_counts, remain_counts, remain_draw_count, size, seed, shard_index,
+                                   None, policy))
+                shard_index += 1
+            _merge_shards(merged, _run_shards(executor, shard_args), max_try_count or 0, progress)
+            if is_separated(merged.win_counts, merged.experiments, z):
+                stopped_by = "separated"
+                break
+            if max_try_count is not None and merged.experiments >= max_try_count:
+                stopped_by = "tries"
+                break
+            if perf_counter() >= deadline:
+                break
+    result = WinRateResult(input_hand, discard_tiles, merged, seed)
+    result.stopped_by = stopped_by
+    return result
@@ -0,0 +1,208 @@
+"""
+Binary columnar file of a tenhou record, loaded by memory map instead of parsing xml.
+
+layout: MAGIC, uint32 header length, json header (game type, game ranges and the attributes of events
+that columns can not restore), padding to 8 bytes, then one EVENT_DTYPE row per event.
+"""
+import json
+import struct
+import xml.etree.ElementTree as ET
+from typing import Iterator, List, Optional
+
+import numpy as np
+
+from .reader import TenhouGame, TenhouRecord
+from .stream import TenhouRecordHeader
+from .utils.constant import DISCARD_INDICATOR, DRAW_INDICATOR
+from .utils.event import EventKind, TenhouEvent, event_kind, classify_tag
+from .utils.value.gametype import GameType
+
+MAGIC = b"AWRCOL\x00\x01"
+COLUMNAR_SUFFIX = ".awr"
+
+_LENGTH = struct.Struct("<I")
+_ALIGNMENT = 8
+
+EVENT_DTYPE = np.dtype([
+    ("kind", "u1"),
+    # index of the player acting, -1 if none.
+    ("actor", "i1"),
+    # tenhou tile id (0-135), -1 if none.
+    ("tile", "<i2"),
+    # tenhou meld code of N, 0 for other kinds.
+    ("meld", "<u2"),
+    # index in header "extra" of events restored from their stored tag and attributes, -1 if restored by columns.
+    ("extra", "<i2"),
+])
+
+# timestamp of an event is its row index.
+MAX_EXTRA_EVENTS = np.iinfo(np.int16).max
+
+
+def _event_columns(element):
+    kind, actor, tile = classify_tag(element.tag)
+    if actor is None:
+        actor, tile = -1, -1
+    meld = 0
+    if kind == EventKind.MELD:
+        actor, meld = int(element.attrib["who"]), int(element.attrib["m"])
+    elif kind == EventKind.DORA:
+        tile = int(element.attrib["hai"])
+    elif kind in (EventKind.REACH, EventKind.AGARI) and "who" in element.attrib:
+        actor = int(element.attrib["who"])
+    return kind, actor, tile, meld
+
+
+def _restore(kind, actor, tile, meld) -> Optional[ET.Element]:
+    if kind == EventKind.DRAW:
+        return ET.Element("%s%d" % (DRAW_INDICATOR[actor], tile))
+    if kind == EventKind.DISCARD:
+        return ET.Element("%s%d" % (DISCARD_INDICATOR[actor], tile))
+    if kind == EventKind.MELD:
+        return ET.Element("N", {"who": str(actor), "m": str(meld)})
+    if kind == EventKind.DORA:
+        return ET.Element("DORA", {"hai": str(tile)})
+    return None
+
+
+def _same_element(a: ET.Element, b: Optional[ET.Element]) -> bool:
+    return b is not None and a.tag == b.tag and list(a.attrib.items()) == list(b.attrib.items())
+
+
+def _element(event):
+    return event.to_element() if isinstance(event, TenhouEvent) else event
+
+
+def write_columnar(record: TenhouRecord, path: str):
+    elements = [_element(event) for event in record.events]
+    rows = np.zeros(len(elements), dtype=EVENT_DTYPE)
+    extra = []
+    for index, element in enumerate(elements):
+        kind, actor, tile, meld = _event_columns(element)
+        rows[index] = kind, actor, tile, meld, -1
+        if not _same_element(element, _restore(kind, actor, tile, meld)):
+            if len(extra) >= MAX_EXTRA_EVENTS:
+                raise ValueError("too many events to store by attributes in {}".format(path))
+            rows[index]["extra"] = len(extra)
+            extra.append([element.tag, dict(element.attrib)])
+    init_indexes = [index for index, element in enumerate(elements) if event_kind(element) == EventKind.INIT]
+    header = {
+        "game_type": record.game_type.origin,
+        "events": len(elements),
+        "games": [[start, stop] for start, stop in zip(init_indexes, init_indexes[1:] + [len(elements)])],
+        "extra": extra,
+    }
+    header_bytes = json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    data_offset = len(MAGIC) + _LENGTH.size + len(header_bytes)
+    padding = -data_offset % _ALIGNMENT
+    with open(path, "wb") as file:
+        file.write(MAGIC)
+        file.write(_LENGTH.pack(len(header_bytes) + padding))
+        file.write(header_bytes + b" " * padding)
+        file.write(rows.tobytes())
+
+
+class ColumnarRecord:
+    """
+    memory-mapped columnar record. columns are numpy views of the file,
+    events and games are restored from them only when asked.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as file:
+            if file.read(len(MAGIC)) != MAGIC:
+                raise ValueError("{} is not a columnar record file".format(path))
+            header_length, = _LENGTH.unpack(file.read(_LENGTH.size))
+            header = json.loads(file.read(header_length).decode("utf-8"))
+        self.game_type = GameType(header["game_type"])
+        self.game_ranges = [tuple(game_range) for game_range in header["games"]]
+        self._extra = header["extra"]
+        data_offset = len(MAGIC) + _LENGTH.size + header_length
+        if header["events"]:
+            self.events = np.memmap(path, dtype=EVENT_DTYPE, mode="r", offset=data_offset,
+                                    shape=(header["events"],))
+        else:
+            self.events = np.zeros(0, dtype=EVENT_DTYPE)
+        self._header = None
+
+    @property
+    def kinds(self) -> np.ndarray:
+        return self.events["kind"]
+
+    @property
+    def actors(self) -> np.ndarray:
+        return self.events["actor"]
+
+    @property
+    def tiles(self) -> np.ndarray:
+        return self.events["tile"]
+
+    @property
+    def melds(self) -> np.ndarray:
+        return self.events["meld"]
+
+    def tile_slots(self) -> np.ndarray:
+        """
+        slot (see container.array_set) of tile column, -1 if none. aka fives go to slots of their fives.
+        """
+        tiles = self.tiles
+        return np.where(tiles >= 0, tiles // 4, -1)
+
+    def element(self, index: int) -> ET.Element:
+        kind, actor, tile, meld, extra = self.events[index].tolist()
+        if extra >= 0:
+            tag, attrib = self._extra[extra]
+            return ET.Element(tag, attrib)
+        return _restore(kind, actor, tile, meld)
+
+    def elements(self, start: int = 0, stop: Optional[int] = None) -> Iterator[ET.Element]:
+        stop = len(self.events) if stop is None else stop
+        return (self.element(index) for index in range(start, stop))
+
+    @property
+    def header(self) -> TenhouRecordHeader:
+        if self._header is None:
+            head_stop = self.game_ranges[0][0] if self.game_ranges else len(self.events)
+            head_events = [TenhouEvent(element, context=None, timestamp=index)
+                           for index, element in enumerate(self.elements(0, head_stop))]
+            self._header = TenhouRecordHeader(head_events, self.path)
+            for event in head_events:
+                event.context_ = self._header
+        return self._header
+
+    @property
+    def players(self):
+        return self.header.players
+
+    def __len__(self):
+        return len(self.game_ranges)
+
+    def game(self, index: int) -> TenhouGame:
+        start, stop = self.game_ranges[index]
+        header = self.header
+        events = [TenhouEvent(element, context=header, timestamp=timestamp)
+                  for timestamp, element in enumerate(self.elements(start, stop), start)]
+        return TenhouGame(events, header.game_type, header.players, context=header)
+
+    def games(self) -> Iterator[TenhouGame]:
+        return (self.game(index) for index in range(len(self)))
+
+    def to_record(self) -> TenhouRecord:
+        root = ET.Element("mjloggm")
+        root.extend(self.elements())
+        return TenhouRecord(root)
+
+    def close(self):
+        # the map is closed once columns taken out of this record are released too.
+        self.events = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def read_columnar(path: str) -> ColumnarRecord:
+    return ColumnarRecord(path)
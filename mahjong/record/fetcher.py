@@ -0,0 +1,148 @@
+"""
+Download tenhou logs through one pooled session, with retries and a local cache of log files by log id,
+so a log is fetched from the server at most once.
+"""
+import os
+import re
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterable, Iterator, Optional, Tuple, Union
+
+import requests
+from loguru import logger
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from mahjong.cache_dir import user_cache_dir
+from .reader import TenhouRecord, from_file, log_id_from_url
+from .utils.constant import API_URL_TEMPLATE
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) ' \
+             'Chrome/71.0.3578.98 Safari/537.36'
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+RECORD_ROOT_TAG = b"<mjloggm"
+
+LOG_ID_REGEX = re.compile(r"^[0-9A-Za-z_-]+$")
+
+
+def default_cache_dir() -> str:
+    return os.path.join(user_cache_dir(), "records")
+
+
+def to_log_id(url_or_log_id: str) -> str:
+    if "?" in url_or_log_id:
+        log_id = log_id_from_url(url_or_log_id)
+    else:
+        log_id = url_or_log_id
+    if not LOG_ID_REGEX.match(log_id):
+        raise ValueError("invalid log id {!r}".format(log_id))
+    return log_id
+
+
+def make_session(pool_size: int = 4, retries: int = 3, backoff: float = 0.5) -> requests.Session:
+    """
+    session keeping up to pool_size connections, retrying failed connections and RETRY_STATUSES
+    with exponential backoff (backoff, 2 * backoff, 4 * backoff... seconds).
+    """
+    retry = Retry(total=retries, backoff_factor=backoff, status_forcelist=RETRY_STATUSES, raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["User-Agent"] = USER_AGENT
+    return session
+
+
+class RecordFetcher:
+    """
+    fetch logs by view url or log id. downloaded logs are saved as <cache_dir>/<log_id>.xml and read from there next time.
+    at most max_workers downloads run at the same time.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, url_template: str = API_URL_TEMPLATE, timeout: float = 10,
+                 max_workers: int = 4, retries: int = 3, backoff: float = 0.5,
+                 session: Optional[requests.Session] = None):
+        self.cache_dir = cache_dir if cache_dir is not None else default_cache_dir()
+        self.url_template = url_template
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.session = session if session is not None else make_session(max_workers, retries, backoff)
+        self.downloads = 0
+        self._lock = threading.Lock()
+
+    def cache_path(self, url_or_log_id: str) -> str:
+        return os.path.join(self.cache_dir, to_log_id(url_or_log_id) + ".xml")
+
+    def _download(self, log_id: str, timeout: Optional[float] = None) -> bytes:
+        response = self.session.get(self.url_template.format(log_id), allow_redirects=True,
+                                    timeout=self.timeout if timeout is None else timeout)
+        response.raise_for_status()
+        content = response.content
+        if not content.lstrip().startswith(RECORD_ROOT_TAG):
+            raise ValueError("response of log {} is not a tenhou record: {!r}".format(log_id, content[:64]))
+        with self._lock:
+            self.downloads += 1
+        return content
+
+    def _save(self, path: str, content: bytes):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(suffix=".xml", dir=self.cache_dir)
+        try:
+            with os.fdopen(fd, "wb") as temp_file:
+                temp_file.write(content)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+    def fetch_path(self, url_or_log_id: str, timeout: Optional[float] = None) -> str:
+        """
+        path of the cached log file, downloaded first if not cached yet.
+        """
+        log_id = to_log_id(url_or_log_id)
+        path = self.cache_path(log_id)
+        if not os.path.isfile(path):
+            logger.debug("downloading log {}", log_id)
+            self._save(path, self._download(log_id, timeout))
+        return path
+
+    def fetch_content(self, url_or_log_id: str, timeout: Optional[float] = None) -> str:
+        with open(self.fetch_path(url_or_log_id, timeout), encoding="utf-8") as file:
+            return file.read()
+
+    def fetch_record(self, url_or_log_id: str, timeout: Optional[float] = None) -> TenhouRecord:
+        return from_file(self.fetch_path(url_or_log_id, timeout))
+
+    def fetch_many(self, urls_or_log_ids: Iterable[str]) -> Iterator[Tuple[str, Union[str, Exception]]]:
+        """
+        yield (url or log id, cached path or the exception of it) as downloads complete.
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self.fetch_path, item): item for item in urls_or_log_ids}
+            for future in as_completed(futures):
+                try:
+                    yield futures[future], future.result()
+                except Exception as e:
+                    yield futures[future], e
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+_default_fetcher = None
+
+
+def default_fetcher() -> RecordFetcher:
+    global _default_fetcher
+    if _default_fetcher is None:
+        _default_fetcher = RecordFetcher()
+    return _default_fetcher
@@ -1,6 +1,7 @@
 from urllib.parse import unquote
 
-from .utils.constant import DRAW_REGEX, DISCARD_REGEX, RANKS
+from .utils.constant import RANKS
+from .utils.event import EventKind, tile_index_change
 from .utils.value.meld import meld_from
 
 
@@ -32,21 +33,22 @@ class TenhouPlayer:
     def clear(self):
         pass
 
+    def _tile_change(self, event, kind):
+        change = tile_index_change(event, kind)
+        if change and change['player'] == self.index:
+            return change
+
     def is_draw(self, event):
-        regex = DRAW_REGEX[self.index]
-        return regex.match(event.tag)
+        return self._tile_change(event, EventKind.DRAW) is not None
 
     def draw_tile_index(self, draw_event):
-        regex = DRAW_REGEX[self.index]
-        return int(regex.match(draw_event.tag).group(1))
+        return self._tile_change(draw_event, EventKind.DRAW)['tile']
 
     def is_discard(self, event):
-        regex = DISCARD_REGEX[self.index]
-        return regex.match(event.tag)
+        return self._tile_change(event, EventKind.DISCARD) is not None
 
     def discard_tile_index(self, discard_event):
-        regex = DISCARD_REGEX[self.index]
-        return int(regex.match(discard_event.tag).group(1))
+        return self._tile_change(discard_event, EventKind.DISCARD)['tile']
 
     def is_open_hand(self, event):
         return is_event_triggered_by_player(event, self.index, "N")
@@ -2,12 +2,10 @@ from __future__ import annotations
 
 import xml.etree.ElementTree as ET
 from argparse import Namespace
-from functools import reduce
+from functools import reduce, lru_cache
 from typing import List
 from urllib.parse import urlparse, parse_qs
 
-import requests
-
 from mahjong.record.category import SubCategory
 from .player import TenhouPlayer
 from .stage import StageGroupby
@@ -18,10 +16,8 @@ from .utils.value.general import number_list
 
 
 def fetch_record_content(url, timeout=3):
-    url = download_url(url)
-    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) '
-                             'Chrome/71.0.3578.98 Safari/537.36'}
-    return requests.get(url, timeout=timeout, headers=headers, allow_redirects=True).text
+    from .fetcher import default_fetcher
+    return default_fetcher().fetch_content(url, timeout)
 
 
 def download_url(view_url):
@@ -43,6 +39,15 @@ def is_game_end(event):
     return is_somebody_win_game(event) or is_nobody_win_game(event)
 
 
+# shared by games, each SubCategory with names creates a namedtuple class.
+@lru_cache(maxsize=None)
+def prevailing_and_game_category(play_wind_count: int) -> SubCategory:
+    return SubCategory(
+        play_wind_count + 1, 4, caption="prevailing_and_game",
+        names=["prevailing", "game_index"]
+    )
+
+
 class TenhouGame:
     def __init__(self, game_events, game_type: GameType, players: List[TenhouPlayer], *, context):
         self.players = players
@@ -62,10 +67,7 @@ class TenhouGame:
         self.game_type = game_type
         self.seeds = number_list(self._meta.INIT.seed)
         self.east_index = int(self._meta.INIT.oya)
-        self.prevailing_and_game = SubCategory(
-            self.game_type.play_wind_count() + 1, 4, caption="prevailing_and_game",
-            names=["prevailing", "game_index"]
-        )
+        self.prevailing_and_game = prevailing_and_game_category(self.game_type.play_wind_count())
 
     def game_index(self):
         return self.prevailing_and_game.category(self.seeds[0])
@@ -132,6 +134,19 @@ def list_of_xml_configs(xml_element_list):
     return reduce(xml_message_config_scan, reversed(xml_element_list), Namespace())
 
 
+def players_from_meta(meta: Namespace, game_type: GameType) -> List[TenhouPlayer]:
+    return [
+        TenhouPlayer(index, name_encoded, level, rate, sex)
+        for index, name_encoded, level, rate, sex in zip(
+            range(game_type.player_count()),
+            [meta.UN.n0, meta.UN.n1, meta.UN.n2, meta.UN.n3],
+            number_list(meta.UN.dan),
+            number_list(meta.UN.rate),
+            meta.UN.sx.split(',')
+        )
+    ]
+
+
 class TenhouRecord:
     def __init__(self, events):
         events = [TenhouEvent(event, context=self, timestamp=i) for i, event in enumerate(events)]
@@ -141,19 +156,8 @@ class TenhouRecord:
         end_event = events[-1]
         self._end_meta = list_of_xml_configs([end_event])
 
-        meta = self._meta
-        self.game_type = GameType(meta.GO.type)
-        player_mode = self.game_type.player_count()
-        self.players = [
-            TenhouPlayer(index, name_encoded, level, rate, sex)
-            for index, name_encoded, level, rate, sex in zip(
-                range(player_mode),
-                [meta.UN.n0, meta.UN.n1, meta.UN.n2, meta.UN.n3],
-                number_list(meta.UN.dan),
-                number_list(meta.UN.rate),
-                meta.UN.sx.split(',')
-            )
-        ]
+        self.game_type = GameType(self._meta.GO.type)
+        self.players = players_from_meta(self._meta, self.game_type)
         self.game_list = [TenhouGame(item, self.game_type, self.players, context=self) for item in game_chunks]
         end_infos = number_list(end_event.attrib['owari'])
         steps = 2
@@ -191,7 +195,8 @@ class TenhouRecord:
 
 
 def from_url(url: str, timeout=3) -> TenhouRecord:
-    return TenhouRecord(ET.fromstring(fetch_record_content(url, timeout=timeout)))
+    from .fetcher import default_fetcher
+    return default_fetcher().fetch_record(url, timeout)
 
 
 def from_file(file) -> TenhouRecord:
@@ -2,12 +2,13 @@ from __future__ import annotations
 
 from abc import ABCMeta, abstractmethod
 from argparse import Namespace
+from collections import namedtuple
 from functools import reduce
-from itertools import product, chain
-from typing import List, Iterator, Set
+from typing import List, Iterator, Optional, Set
 
-from mahjong.record.utils.constant import TENHOU_TILE_CATEGORY
-from .utils.event import is_game_init, is_open_hand, is_dora_indicator_event, discard_value
+from mahjong.record.utils.value.tile import tenhou_tile_indexes
+from .utils.event import is_game_init, is_open_hand, is_dora_indicator_event, discard_value, event_kind, \
+    tile_index_change, EventKind
 from .player import TenhouPlayer
 from .utils.value.general import number_list
 from .utils.value.meld import meld_from, TenhouAddedKan, Meld, Triplet, KanFromTriplet, is_triplet_of_added_kan
@@ -170,13 +171,7 @@ class DoraIndicators(GameState):
 class InvisibleTiles(GameState):
     def __init__(self, player_num: int, invisible_tiles=None):
         if invisible_tiles is None:
-            tile_total = len(TENHOU_TILE_CATEGORY)
-            if player_num == 4:
-                invisible_tiles = set(range(tile_total))
-            elif player_num == 3:
-                color_1m_9m = ((0, num, i) for num, i in product([1 - 1, 9 - 1], range(4)))
-                others = range(TENHOU_TILE_CATEGORY.index((1, 0, 0)), tile_total)
-                invisible_tiles = set(chain(color_1m_9m, others))
+            invisible_tiles = set(tenhou_tile_indexes(player_num))
         self._invisible_tiles = invisible_tiles
         self._player_num = player_num
 
@@ -188,7 +183,7 @@ class InvisibleTiles(GameState):
             return brand
 
         discard_val = discard_value(event)
-        if discard_val:
+        if discard_val is not None:
             return InvisibleTiles(self._player_num, self._invisible_tiles - {discard_val})
         elif is_open_hand(event):
             return InvisibleTiles(self._player_num, self._invisible_tiles - set(meld_from(event).self_tiles))
@@ -199,3 +194,94 @@ class InvisibleTiles(GameState):
     @property
     def value(self) -> Set[int]:
         return self._invisible_tiles
+
+
+TrackerSnapshot = namedtuple("TrackerSnapshot", ["hand", "melds", "discards", "invisible", "dora_indicators",
+                                                 "somebody_richii"])
+
+
+class GameTracker:
+    """
+    Mutable state of all players in a game, updated in place by apply: hands and tiles nobody has seen
+    are sets of tenhou indexes, discards and melds are appended.
+    gives the same values as PlayerHand, PlayerMeld, DiscardTiles, DoraIndicators and InvisibleTiles.
+    """
+
+    def __init__(self, player_count: int = 4):
+        self.player_count = player_count
+        self._all_tiles = tenhou_tile_indexes(player_count)
+        self._reset()
+
+    def _reset(self):
+        self._hands = [set() for _ in range(self.player_count)]
+        self._invisible = set(self._all_tiles)
+        self._melds = [[] for _ in range(self.player_count)]
+        self._discards = [[] for _ in range(self.player_count)]
+        self.dora_indicators = []
+        self.somebody_richii = False
+
+    def _add_meld(self, player_index: int, meld: Meld):
+        melds = self._melds[player_index]
+        if isinstance(meld, TenhouAddedKan):
+            for i, item in enumerate(melds):
+                if isinstance(item, Triplet) and is_triplet_of_added_kan(item, meld):
+                    melds[i] = KanFromTriplet(item, meld)
+        else:
+            melds.append(meld)
+
+    def apply(self, event):
+        kind = event_kind(event)
+        if kind == EventKind.DRAW:
+            change = tile_index_change(event, kind)
+            self._hands[change['player']].add(change['tile'])
+        elif kind == EventKind.DISCARD:
+            change = tile_index_change(event, kind)
+            self._hands[change['player']].discard(change['tile'])
+            self._discards[change['player']].append(change['tile'])
+            self._invisible.discard(change['tile'])
+        elif kind == EventKind.MELD:
+            meld = meld_from(event)
+            player_index = int(event.attrib['who'])
+            self._hands[player_index].difference_update(meld.self_tiles)
+            self._invisible.difference_update(meld.self_tiles)
+            self._add_meld(player_index, meld)
+        elif kind == EventKind.REACH:
+            self.somebody_richii = True
+        elif kind == EventKind.DORA:
+            index = int(event.attrib['hai'])
+            self.dora_indicators.append(index)
+            self._invisible.discard(index)
+        elif kind == EventKind.INIT:
+            self._reset()
+            for player_index in range(self.player_count):
+                hai = event.attrib.get('hai%d' % player_index)
+                if hai:
+                    self._hands[player_index].update(number_list(hai))
+            index = number_list(event.attrib["seed"])[-1]
+            self.dora_indicators.append(index)
+            self._invisible.discard(index)
+
+    def apply_all(self, events):
+        for event in events:
+            self.apply(event)
+
+    def hand(self, player_index: int) -> Set[int]:
+        return set(self._hands[player_index])
+
+    def melds(self, player_index: int) -> List[Meld]:
+        return list(self._melds[player_index])
+
+    def discards(self, player_index: int) -> List[int]:
+        return list(self._discards[player_index])
+
+    def invisible(self, player_index: Optional[int] = None) -> Set[int]:
+        """
+        tiles nobody has seen, also excluding the hand of player_index if given.
+        """
+        if player_index is None:
+            return set(self._invisible)
+        return self._invisible - self._hands[player_index]
+
+    def snapshot(self, player_index: int) -> TrackerSnapshot:
+        return TrackerSnapshot(self.hand(player_index), self.melds(player_index), self.discards(player_index),
+                               self.invisible(player_index), list(self.dora_indicators), self.somebody_richii)
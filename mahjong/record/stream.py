@@ -0,0 +1,117 @@
+"""
+Streaming reader of Tenhou logs: games are parsed one round at a time by iterparse,
+so memory stays bounded by a single round instead of a whole record or archive.
+"""
+import gzip
+import os
+import xml.etree.ElementTree as ET
+import zipfile
+from typing import IO, Callable, Iterator, List, Optional, Tuple
+
+from .reader import TenhouGame, list_of_xml_configs, players_from_meta
+from .utils.event import TenhouEvent, is_game_init
+from .utils.value.gametype import GameType
+
+RECORD_SUFFIX = ".xml"
+GZIP_SUFFIX = ".gz"
+ZIP_SUFFIX = ".zip"
+
+
+class TenhouRecordHeader:
+    """
+    Events before the first round (GO, UN, TAIKYOKU...) of a streamed record, context of its games.
+    """
+
+    def __init__(self, head_events: List[TenhouEvent], name: Optional[str] = None):
+        self.name = name
+        self.events = head_events
+        self._meta = list_of_xml_configs(head_events)
+        self.game_type = GameType(self._meta.GO.type)
+        self.players = players_from_meta(self._meta, self.game_type)
+
+    def __str__(self):
+        return "%s %s" % (self.game_type, ",".join(str(player) for player in self.players))
+
+    def __repr__(self):
+        return "<%s>" % self
+
+
+def stream_games(file, name: Optional[str] = None) -> Iterator[TenhouGame]:
+    """
+    yield TenhouGame of a record file (path or binary file object) round by round.
+    elements of yielded rounds are detached from the document, so they are freed with the game.
+    """
+    context = ET.iterparse(file, events=("start", "end"))
+    _, root = next(context)
+    depth = 1
+    timestamp = 0
+    head_events = []
+    game_events = []
+    header = None
+    for action, element in context:
+        if action == "start":
+            depth += 1
+            continue
+        depth -= 1
+        if depth != 1:
+            continue
+        event = TenhouEvent(element, context=header, timestamp=timestamp)
+        timestamp += 1
+        if is_game_init(element):
+            if header is None:
+                header = TenhouRecordHeader(head_events, name)
+                for head_event in head_events:
+                    head_event.context_ = header
+            elif game_events:
+                yield TenhouGame(game_events, header.game_type, header.players, context=header)
+            game_events = [event]
+            root.clear()
+        elif header is None:
+            head_events.append(event)
+        else:
+            game_events.append(event)
+    if game_events:
+        yield TenhouGame(game_events, header.game_type, header.players, context=header)
+    root.clear()
+
+
+def _is_record_name(name: str) -> bool:
+    return name.endswith(RECORD_SUFFIX) or name.endswith(RECORD_SUFFIX + GZIP_SUFFIX)
+
+
+def _open_gzip_or_plain(name: str, opener: Callable[[], IO]) -> IO:
+    file = opener()
+    if name.endswith(GZIP_SUFFIX):
+        return gzip.GzipFile(fileobj=file, mode="rb")
+    return file
+
+
+def iter_record_files(path: str) -> Iterator[Tuple[str, IO]]:
+    """
+    yield (name, opened binary file) of every record under path: a directory (walked recursively),
+    a zip archive, a .xml.gz file or a plain .xml file. each file is closed when the next one is requested.
+    """
+    if os.path.isdir(path):
+        for directory, sub_directories, files in os.walk(path):
+            sub_directories.sort()
+            for file_name in sorted(files):
+                if _is_record_name(file_name) or file_name.endswith(ZIP_SUFFIX):
+                    yield from iter_record_files(os.path.join(directory, file_name))
+    elif path.endswith(ZIP_SUFFIX):
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and _is_record_name(info.filename):
+                    with _open_gzip_or_plain(info.filename, lambda: archive.open(info)) as file:
+                        yield "{}/{}".format(path, info.filename), file
+    else:
+        with _open_gzip_or_plain(path, lambda: open(path, "rb")) as file:
+            yield path, file
+
+
+def stream_archive_games(path: str) -> Iterator[TenhouGame]:
+    """
+    yield games of every record under path one round at a time, see iter_record_files.
+    game.context_ is the TenhouRecordHeader of its record, whose name is the file name.
+    """
+    for name, file in iter_record_files(path):
+        yield from stream_games(file, name)
@@ -1,6 +1,7 @@
 import operator
-from typing import Iterable
+from typing import Iterable, Iterator, List, Tuple
 
+import numpy as np
 import pandas as pd
 from loguru import logger
 
@@ -67,6 +68,19 @@ def state_series_apply(x):
     return x
 
 
+TIMESTAMP_COLUMN = ("global", "time", "timestamp")
+
+
+def forward_fill(rows: List[int], values: list, row_count: int) -> np.ndarray:
+    """
+    column of row_count cells from its changes: values[i] from rows[i] on, NaN before the first change.
+    """
+    positions = np.searchsorted(np.asarray(rows, dtype=np.int64), np.arange(row_count), side="right")
+    source = np.empty(len(values) + 1, dtype=object)
+    source[0] = np.nan
+    source[1:] = values
+    return source[positions]
+
 
 class GameExecutor:
     @staticmethod
@@ -96,13 +110,18 @@ class GameExecutor:
         self.states = TransferDict(all_dict)
 
     @staticmethod
-    def state_value(state_dict, command: GameCommand):
+    def state_path(command: GameCommand) -> tuple:
         scope_key = command.prop.scope
         multi_values = ViewScope.scopes_with_multi_value()[scope_key]
         if multi_values is None:
-            return state_dict[scope_key]["single"]
+            return scope_key, "single"
         else:
-            return state_dict[scope_key][multi_values(command.sub_scope_id)]
+            return scope_key, multi_values(command.sub_scope_id)
+
+    @staticmethod
+    def state_value(state_dict, command: GameCommand):
+        scope_key, sub_key = GameExecutor.state_path(command)
+        return state_dict[scope_key][sub_key]
 
     def execute(self, commands: Iterable[GameCommand]):
         curr_state = self.states
@@ -110,9 +129,36 @@ class GameExecutor:
             curr_state = self.execute_update_state(command, curr_state)
             yield curr_state["global"]["time"].set("timestamp", command.timestamp)
 
+    def execute_changes(self, commands: Iterable[GameCommand]) -> Iterator[Tuple[GameCommand, tuple, object]]:
+        """
+        like execute, but yield the flattened key and new value of the state changed by each command.
+        """
+        curr_state = self.states
+        for command in commands:
+            curr_state = self.execute_update_state(command, curr_state)
+            scope_key, sub_key = GameExecutor.state_path(command)
+            view_property = command.prop.view_property
+            yield command, (scope_key, sub_key, view_property), curr_state[scope_key][sub_key][view_property]
+
     def execute_as_dataframe(self, commands: Iterable[GameCommand]):
-        df = pd.DataFrame(x.flatten() for x in self.execute(commands))
-        df.columns = pd.MultiIndex.from_tuples(df.columns)
+        """
+        flattened states of execute as rows, columns in order of their first change.
+        built from changes of commands and forward filled, so each changed value is serialized once.
+        """
+        timestamps = []
+        changes = {}
+        for row, (command, column, value) in enumerate(self.execute_changes(commands)):
+            timestamps.append(prop_manager.to_str(command.timestamp, prop=TIMESTAMP_COLUMN[-1]))
+            rows, values = changes.setdefault(column, ([], []))
+            rows.append(row)
+            values.append(prop_manager.to_str(value, prop=column[-1]))
+        row_count = len(timestamps)
+        df = pd.DataFrame({
+            0: timestamps,
+            **{index: forward_fill(rows, values, row_count)
+               for index, (rows, values) in enumerate(changes.values(), start=1)}
+        })
+        df.columns = pd.MultiIndex.from_tuples([TIMESTAMP_COLUMN, *changes.keys()])
         return df
 
     def execute_update_state(self, command: GameCommand, curr_state):
@@ -138,23 +184,49 @@ class GameExecutor:
         return result_state
 
 
+def _to_node(value):
+    if isinstance(value, TransferDict):
+        return value.nested_dict
+    elif isinstance(value, dict):
+        return {k: _to_node(v) for k, v in value.items()}
+    else:
+        return value
+
+
+def _flatten_node(node: dict, prefix: tuple):
+    for k, v in node.items():
+        if isinstance(v, dict):
+            yield from _flatten_node(v, prefix + (k,))
+        else:
+            yield prefix + (k,), v
+
+
 class TransferDict:
+    """
+    immutable nested dict, set and drop return the modified root.
+    nested levels are kept as plain dicts that are never changed after creation, so a modification
+    copies only the dicts on the path from the root to the modified one and shares all the others.
+    """
+    __slots__ = ("parent", "parent_key", "nested_dict")
+
     def __init__(self, nested_dict, parent=None, parent_key=None):
         self.parent: TransferDict = parent
         self.parent_key = parent_key
-        self.nested_dict = {
-            k: self.transfer_value(k, v)  # fix construction (also copy TransferDict)
-            for k, v in nested_dict.items()
-        }
+        self.nested_dict = {k: _to_node(v) for k, v in nested_dict.items()}
+
+    @classmethod
+    def _view(cls, node: dict, parent=None, parent_key=None):
+        view = cls.__new__(cls)
+        view.parent = parent
+        view.parent_key = parent_key
+        view.nested_dict = node
+        return view
+
+    def _wrap(self, k, v):
+        return TransferDict._view(v, self, k) if isinstance(v, dict) else v
 
     def flatten_iter(self):
-        for k, v in self.nested_dict.items():
-            initial = [k]
-            if isinstance(v, TransferDict):
-                for sub_k, sub_v in v.flatten_iter():
-                    yield tuple(initial + list(sub_k)), sub_v
-            else:
-                yield tuple(initial), v
+        return _flatten_node(self.nested_dict, ())
 
     def flatten(self):
         return dict((k, prop_manager.to_str(v, prop=k[-1])) for k, v in self.flatten_iter())
@@ -163,11 +235,28 @@ class TransferDict:
         return getattr(self.nested_dict, item)
 
     def __getitem__(self, item):
-        return self.nested_dict[item]
+        return self._wrap(item, self.nested_dict[item])
+
+    def get(self, key, default=None):
+        if key in self.nested_dict:
+            return self[key]
+        return default
+
+    def items(self):
+        return ((k, self._wrap(k, v)) for k, v in self.nested_dict.items())
+
+    def values(self):
+        return (self._wrap(k, v) for k, v in self.nested_dict.items())
 
     def __contains__(self, item):
         return item in self.nested_dict
 
+    def __iter__(self):
+        return iter(self.nested_dict)
+
+    def __len__(self):
+        return len(self.nested_dict)
+
     def __str__(self):
         return str(self.nested_dict)
 
@@ -179,44 +268,27 @@ class TransferDict:
 
     __setitem__ = __delattr__ = pop = update = popitem = _readonly
 
-    def set(self, key, value):
-        modified_dict = {
-            **self.nested_dict,
-            key: value
-        }
-        modified = TransferDict(modified_dict, parent=self.parent, parent_key=self.parent_key)
+    def _replace(self, node: dict):
         if self.parent is not None:
-            return self.parent.set(
-                self.parent_key, modified
-            )
+            return self.parent._set_node(self.parent_key, node)
         else:
-            # modified._update_link()
-            return modified
+            return TransferDict._view(node)
+
+    def _set_node(self, key, node):
+        modified = self.nested_dict.copy()
+        modified[key] = node
+        return self._replace(modified)
 
-    # def _update_link(self):
-    #     for k,v in self.nested_dict.items():
-    #         if isinstance(v, TransferDict):
-    #             v.parent = self
-    #             v.parent_key =
+    def set(self, key, value):
+        return self._set_node(key, _to_node(value))
 
     def drop(self, key):
         dict_cpy = self.nested_dict.copy()
         del dict_cpy[key]
-        modified = TransferDict(dict_cpy)
-        return self.parent.set(
-            self.parent_key, modified
-        ) if self.parent is not None else modified
+        return self._replace(dict_cpy)
 
     def setdefault(self, key, default):
         if key not in self:
             return self.set(key, default)
         else:
             return self
-
-    def transfer_value(self, k, v):
-        if isinstance(v, dict):
-            return TransferDict(v, self, k)
-        elif isinstance(v, TransferDict):
-            return TransferDict(v.nested_dict, self, k)
-        else:
-            return v
@@ -0,0 +1,198 @@
+"""
+streaming export of game commands: commands of a record are converted in chunks and appended to a
+csv or parquet file, and a folder (or zip archive) of logs is exported record by record into one
+dataset partitioned by log id, so memory stays bounded by a single record.
+"""
+import csv
+import os
+from collections import namedtuple
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional
+
+from loguru import logger
+
+from mahjong.record.reader import from_file, TenhouRecord
+from mahjong.record.stream import iter_record_files, RECORD_SUFFIX, GZIP_SUFFIX
+from mahjong.record.universe.command import command_field_names
+from mahjong.record.universe.tenhou import to_command_records
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+DEFAULT_CHUNK_SIZE = 4096
+
+FORMAT_SUFFIXES = {
+    "csv": ".csv",
+    "parquet": ".parquet",
+}
+
+PARTITION_KEY = "log_id"
+
+PART_NAME = "part-0"
+
+ExportResult = namedtuple("ExportResult", ["log_id", "path", "rows", "error"])
+
+
+def default_format() -> str:
+    return "parquet" if pyarrow is not None else "csv"
+
+
+def resolve_format(file_format: Optional[str] = None) -> str:
+    """
+    file_format, or default_format if None. parquet falls back to csv when pyarrow is not installed.
+    """
+    if file_format is None:
+        return default_format()
+    if file_format not in FORMAT_SUFFIXES:
+        raise ValueError("unknown format {}, should be one of {}".format(file_format, list(FORMAT_SUFFIXES)))
+    if file_format == "parquet" and pyarrow is None:
+        logger.warning("pyarrow is not installed, writing csv instead of parquet")
+        return "csv"
+    return file_format
+
+
+def chunked(iterable: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class CsvCommandWriter:
+    """
+    command records as csv rows. with index, rows are led by their row number under an empty header,
+    as DataFrame.to_csv writes them by default.
+    """
+
+    def __init__(self, path: str, index: bool = False):
+        self.path = path
+        self.index = index
+        self._rows = 0
+        self._file = open(path, "w", encoding="utf-8", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow([""] + list(command_field_names) if index else command_field_names)
+
+    def write(self, records: List[tuple]):
+        if self.index:
+            records = [(self._rows + i,) + tuple(record) for i, record in enumerate(records)]
+        self._writer.writerows(records)
+        self._rows += len(records)
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def _optional_str(value):
+    return None if value is None else str(value)
+
+
+class ParquetCommandWriter:
+    """
+    command records as row groups of a parquet file, timestamp as int64 and other fields as strings.
+    """
+
+    def __init__(self, path: str):
+        if pyarrow is None:
+            raise ImportError("pyarrow is required to write parquet, install auto_white_reimu[parquet]")
+        self.path = path
+        self.schema = pyarrow.schema([
+            (name, pyarrow.int64() if name == "timestamp" else pyarrow.string()) for name in command_field_names
+        ])
+        self._writer = pyarrow.parquet.ParquetWriter(path, self.schema)
+
+    def write(self, records: List[tuple]):
+        columns = list(zip(*records))
+        arrays = [
+            pyarrow.array(column if field.name == "timestamp" else [_optional_str(x) for x in column],
+                          type=field.type)
+            for field, column in zip(self.schema, columns)
+        ]
+        self._writer.write_table(pyarrow.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+COMMAND_WRITERS = {
+    "csv": CsvCommandWriter,
+    "parquet": ParquetCommandWriter,
+}
+
+
+def write_commands(records: Iterable[tuple], path: str, file_format: str = "csv",
+                   chunk_size: int = DEFAULT_CHUNK_SIZE, index: bool = False) -> int:
+    """
+    write command records (GameCommand.to_record) to path chunk by chunk, return the number of rows.
+    index (csv only) leads rows with their row number, see CsvCommandWriter.
+    """
+    if index and file_format != "csv":
+        raise ValueError("index column is only written to csv, not {}".format(file_format))
+    rows = 0
+    with (CsvCommandWriter(path, index=True) if index else COMMAND_WRITERS[file_format](path)) as writer:
+        for chunk in chunked(records, chunk_size):
+            writer.write(chunk)
+            rows += len(chunk)
+    return rows
+
+
+def export_record(record: TenhouRecord, path: str, file_format: Optional[str] = None,
+                  chunk_size: int = DEFAULT_CHUNK_SIZE, index: bool = False) -> int:
+    return write_commands(to_command_records(record), path, resolve_format(file_format), chunk_size, index)
+
+
+def log_id_from_name(name: str) -> str:
+    name = os.path.basename(name)
+    for suffix in [GZIP_SUFFIX, RECORD_SUFFIX]:
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+    return name
+
+
+def partition_path(output_dir: str, log_id: str, file_format: str) -> str:
+    return os.path.join(output_dir, "{}={}".format(PARTITION_KEY, log_id), PART_NAME + FORMAT_SUFFIXES[file_format])
+
+
+def export_dataset(path: str, output_dir: str, file_format: Optional[str] = None,
+                   chunk_size: int = DEFAULT_CHUNK_SIZE, overwrite: bool = False) -> Iterator[ExportResult]:
+    """
+    export commands of every record under path (see iter_record_files) into output_dir/log_id=<id>/,
+    one record at a time. partitions are written to a temporary file first and renamed when complete,
+    so existing ones are skipped unless overwrite, and a stopped build can be resumed.
+    a failed record is yielded with its error instead of stopping the export.
+    """
+    file_format = resolve_format(file_format)
+    for name, file in iter_record_files(path):
+        log_id = log_id_from_name(name)
+        target = partition_path(output_dir, log_id, file_format)
+        if not overwrite and os.path.exists(target):
+            yield ExportResult(log_id, target, None, None)
+            continue
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        temp_path = target + ".tmp"
+        try:
+            rows = export_record(from_file(file), temp_path, file_format, chunk_size)
+            os.replace(temp_path, target)
+        except Exception as e:
+            logger.warning("exporting {} failed: {!r}", name, e)
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            yield ExportResult(log_id, None, 0, repr(e))
+            continue
+        yield ExportResult(log_id, target, rows, None)
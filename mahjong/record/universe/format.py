@@ -34,6 +34,12 @@ class View:
 
     @property
     def scope(self):
+        try:
+            return self._scope_
+        except AttributeError:
+            return self._find_scope()
+
+    def _find_scope(self):
         for k, v in View.registered_view().items():
             if isinstance(self, v):
                 return k
@@ -55,6 +61,15 @@ class View:
 
     @property
     def type(self):
+        try:
+            view_type = self._type_
+        except AttributeError:
+            return self._find_type()
+        if isinstance(view_type, ValueError):
+            raise view_type
+        return view_type
+
+    def _find_type(self):
         view_type = View.registered_view()[self.scope]
         typs = view_type.all_types()
         prefix = self.get_type_prefix()
@@ -160,6 +175,20 @@ class PlayerView(View, Flag):
     type__melds = fixed_meld
     type__list = discard_from_hand | faans
 
+
+def _cache_scope_and_type():
+    # members combined at runtime (such as a | b) have no cache and are resolved on every access.
+    for view in View.registered_view().values():
+        for member in view.__members__.values():
+            member._scope_ = member._find_scope()
+            try:
+                member._type_ = member._find_type()
+            except ValueError as e:
+                member._type_ = e
+
+
+_cache_scope_and_type()
+
 # public_tiles =
 # GameView.dora_indicators |
 # PlayerView.discard_tiles |
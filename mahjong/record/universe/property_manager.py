@@ -16,24 +16,36 @@ class PropertyMethod(Enum):
 class PropertyTypeManager:
     def __init__(self):
         self._func_mapper = OrderedDict()
+        # (prop, method) -> func, resolved from _func_mapper on first call.
+        self._dispatch = {}
 
     def register(self, typ, method):
         def _register_func(func):
             self._func_mapper[(typ, method)] = func
+            self._dispatch.clear()
             return func
 
         return _register_func
 
+    def lookup(self, prop, method):
+        key = prop, method
+        func = self._dispatch.get(key)
+        if func is None:
+            func = self._dispatch[key] = find_func(self._func_mapper, method, prop)
+        return func
+
     def call(self, *values, prop, method):
-        return lookup_func_table(self._func_mapper, method, prop, *values)
+        return self.lookup(prop, method)(*values)
 
     def __getattr__(self, item):
         if item in PropertyMethod.__members__:
             mthd = PropertyMethod[item]
 
             def _call_wrapper(*args, prop: View = None):
-                return self.call(*args, prop=prop, method=mthd)
+                return self.lookup(prop, mthd)(*args)
 
+            # found by normal attribute lookup from now on.
+            self.__dict__[item] = _call_wrapper
             return _call_wrapper
         else:
             return getattr(super(), item)
@@ -120,8 +132,12 @@ def assertion(func):
     return _check_assert
 
 
-def lookup_func_table(call_table, method, view, *args):
+def find_func(call_table, method, view):
     for (typ, mthd), func in call_table.items():
         if method == mthd and (typ is None or (view is not None and hasattr(view, "type") and view.type in typ)):
-            return func(*args)
+            return func
     raise ValueError("no '{},{}' found in table {}.".format(view.type, method, call_table))
+
+
+def lookup_func_table(call_table, method, view, *args):
+    return find_func(call_table, method, view)(*args)
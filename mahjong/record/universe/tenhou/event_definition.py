@@ -25,21 +25,12 @@ def tile_str_list(tile_list: Union[str, Iterable[int]]):
     return [str(tile_from_tenhou(x)) for x in tile_list]
 
 
-def tile_change_tenhou(event, regex, indicator):
-    matched = regex.match(event.tag)
-    if matched:
-        return {
-            'tile': int(matched.group(2)),
-            'player': indicator.index(matched.group(1))
-        }
-
-
 def draw_tile_tenhou(event):
-    return tile_change_tenhou(event, DRAW_GROUPED_REGEX, DRAW_INDICATOR)
+    return tile_index_change(event, EventKind.DRAW)
 
 
 def discard_tile_tenhou(event):
-    return tile_change_tenhou(event, DISCARD_GROUPED_REGEX, DISCARD_INDICATOR)
+    return tile_index_change(event, EventKind.DISCARD)
 
 
 @tenhou_command.default_event
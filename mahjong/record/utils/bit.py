@@ -16,6 +16,31 @@ def named_tuple_from_desc(type_name, desc_str):
     return namedtuple(type_name, [line.split(":")[0] for line in reverse_order])
 
 
+def bit_fields_from_desc(desc_str):
+    """
+    (shift, mask, is_bool) of each field, in the order of named_tuple_from_desc.
+    desc lists fields from the lowest bit.
+    """
+    fields = []
+    shift = 0
+    for line in desc_str.strip().split():
+        kind = line.split(":")[1]
+        width = int(kind[1:])
+        fields.append((shift, (1 << width) - 1, kind[0] == "b"))
+        shift += width
+    fields.reverse()
+    return tuple(fields)
+
+
+def unpack_int_with(data_class, fields, value):
+    """
+    same as unpack_with, but by shifts and masks on the int value.
+    """
+    value = int(value)
+    return data_class(*(bool((value >> shift) & mask) if is_bool else (value >> shift) & mask
+                        for shift, mask, is_bool in fields))
+
+
 def unpack_with(data_class, unpacker, value):
     return data_class(*unpacker.unpack(to_bit_bytes(value)))
 
@@ -3,10 +3,8 @@ import re
 from ..category import SubCategory, MixedCategory
 
 DRAW_INDICATOR = ['T', 'U', 'V', 'W']
-DRAW_ALL_REGEX = re.compile(r"^[%s]([0-9]+)$" % ("".join(DRAW_INDICATOR)))
 DRAW_GROUPED_REGEX = re.compile(r"^([%s])([0-9]+)$" % ("".join(DRAW_INDICATOR)))
 DISCARD_INDICATOR = ['D', 'E', 'F', 'G']
-DISCARD_ALL_REGEX = re.compile(r"^[%s]([0-9]+)$" % ("".join(DISCARD_INDICATOR)))
 DISCARD_GROUPED_REGEX = re.compile(r"^([%s])([0-9]+)$" % ("".join(DISCARD_INDICATOR)))
 
 SUIT_ORDER = 'mpsz'
@@ -111,7 +109,5 @@ SCORE_PATTERN = [
     "裏ドラ",
     "赤ドラ",
 ]
-DRAW_REGEX = [re.compile(r"^%s([0-9]+)" % draw) for draw in DRAW_INDICATOR]
-DISCARD_REGEX = [re.compile(r"^%s([0-9]+)" % draw) for draw in DISCARD_INDICATOR]
 API_URL_TEMPLATE = 'http://e.mjv.jp/0/log/?{0}'
 TENHOU_TILE_CATEGORY = MixedCategory([SubCategory(9, 4)] * 3 + [SubCategory(7, 4)])
@@ -1,66 +1,123 @@
 import logging
+import sys
 import xml.etree.ElementTree as ET
+from enum import IntEnum
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Optional, Tuple
 from xml.etree.ElementTree import Element
 
-from mahjong.record.utils.bit import unpack_with
 from mahjong.record.utils.value.general import number_list
-from mahjong.record.utils.value.meld import meld_from, MeldTypeData, meld_type_unpacker
+from mahjong.record.utils.value.meld import meld_from, decode_meld, meld_type, MeldType
 from mahjong.record.utils.value.tile import tile_from_tenhou
-from .constant import DRAW_ALL_REGEX, DISCARD_ALL_REGEX, DRAW_GROUPED_REGEX, DISCARD_GROUPED_REGEX, DISCARD_INDICATOR, \
-    DRAW_INDICATOR, DRAWN_TYPES
+from .constant import DRAW_GROUPED_REGEX, DISCARD_GROUPED_REGEX, DISCARD_INDICATOR, DRAW_INDICATOR, DRAWN_TYPES
+
+
+class EventKind(IntEnum):
+    OTHER = 0
+    DRAW = 1
+    DISCARD = 2
+    MELD = 3
+    REACH = 4
+    DORA = 5
+    INIT = 6
+    AGARI = 7
+    RYUUKYOKU = 8
+
+
+_TAG_KINDS = {
+    "N": EventKind.MELD,
+    "REACH": EventKind.REACH,
+    "DORA": EventKind.DORA,
+    "INIT": EventKind.INIT,
+    "AGARI": EventKind.AGARI,
+    "RYUUKYOKU": EventKind.RYUUKYOKU,
+}
+
+
+@lru_cache(maxsize=None)
+def classify_tag(tag: str) -> Tuple[EventKind, Optional[int], Optional[int]]:
+    """
+    (kind, player, tenhou tile index) told by the tag alone, player and tile are None if the tag has not them.
+    tags are few (draws and discards of 136 tiles by 4 players, and named ones), so they are matched once each.
+    """
+    for kind, regex, indicator in ((EventKind.DRAW, DRAW_GROUPED_REGEX, DRAW_INDICATOR),
+                                   (EventKind.DISCARD, DISCARD_GROUPED_REGEX, DISCARD_INDICATOR)):
+        matched = regex.match(tag)
+        if matched:
+            return kind, indicator.index(matched.group(1)), int(matched.group(2))
+    return _TAG_KINDS.get(tag, EventKind.OTHER), None, None
+
+
+def event_kind(event) -> EventKind:
+    if isinstance(event, TenhouEvent):
+        return event.kind_
+    return classify_tag(event.tag)[0]
 
 
 def is_game_init(event):
-    return event.tag == "INIT"
+    return event_kind(event) == EventKind.INIT
 
 
 def is_open_hand(event):
-    return event.tag == "N"
+    return event_kind(event) == EventKind.MELD
 
 
 def is_dora_indicator_event(event):
-    return event.tag == "DORA"
+    return event_kind(event) == EventKind.DORA
 
 
 def is_richii(event):
-    return event.tag == "REACH"
+    return event_kind(event) == EventKind.REACH
 
 
 def is_somebody_win_game(event):
-    return event.tag == "AGARI"
+    return event_kind(event) == EventKind.AGARI
 
 
 def is_nobody_win_game(event):
-    return event.tag == "RYUUKYOKU"
+    return event_kind(event) == EventKind.RYUUKYOKU
+
+
+def tile_index_change(event, kind):
+    """
+    {'tile': tenhou tile index, 'player': player index} of a draw or discard event of kind, None for others.
+    """
+    if isinstance(event, TenhouEvent):
+        event_kind_, player, tile = event.kind_, event.player_index_, event.tile_index_
+    else:
+        event_kind_, player, tile = classify_tag(event.tag)
+    if event_kind_ == kind:
+        return {'tile': tile, 'player': player}
 
 
 def draw_value(event):
-    matched = DRAW_ALL_REGEX.match(event.tag)
-    if matched:
-        return int(matched.group(1))
+    change = tile_index_change(event, EventKind.DRAW)
+    if change:
+        return change['tile']
 
 
 def discard_value(event):
-    matched = DISCARD_ALL_REGEX.match(event.tag)
-    if matched:
-        return int(matched.group(1))
+    change = tile_index_change(event, EventKind.DISCARD)
+    if change:
+        return change['tile']
 
 
-def tile_change(event, regex, indicator):
-    matched = regex.match(event.tag)
-    if matched:
+def tile_change(event, kind):
+    change = tile_index_change(event, kind)
+    if change:
         return {
-            'tile': tile_from_tenhou(int(matched.group(2))),
-            'player': indicator.index(matched.group(1))
+            'tile': tile_from_tenhou(change['tile']),
+            'player': change['player']
         }
 
 
 def draw_tile_change(event):
-    return tile_change(event, DRAW_GROUPED_REGEX, DRAW_INDICATOR)
+    return tile_change(event, EventKind.DRAW)
 
 
 def discard_tile_change(event):
-    return tile_change(event, DISCARD_GROUPED_REGEX, DISCARD_INDICATOR)
+    return tile_change(event, EventKind.DISCARD)
 
 
 class TenhouSubEvent:
@@ -80,66 +137,98 @@ class TenhouSubEvent:
         pass
 
 
+# attributes of events without any, such as draws and discards.
+_NO_ATTRIB = MappingProxyType({})
+
+
 class TenhouEvent:
+    """
+    decoded event of a tenhou record. only tag and attributes of the xml element are kept,
+    to_element builds an element again when needed.
+    """
+    __slots__ = ("timestamp", "tag", "_attrib", "context_", "_meld", "kind_", "player_index_", "tile_index_")
+
     def __init__(self, xml_element: Element, *, context, timestamp=None):
         self.timestamp = timestamp
-        self._wrapped_xml_event = xml_element
+        # tags repeat a lot (T12, D12...), keep one string of each.
+        self.tag = sys.intern(xml_element.tag)
+        self._attrib = xml_element.attrib or _NO_ATTRIB
         self.context_ = context
-        draw = draw_tile_change(xml_element)
-        if draw:
-            self.player_index_ = draw['player']
-            self.see_tiles_ = [draw['tile']]
-        discard = discard_tile_change(xml_element)
-        if discard:
-            self.player_index_ = discard['player']
-            self.show_tiles_ = [discard['tile']]
+        self._meld = None
+        # classified once, predicates of this module read these instead of matching the tag.
+        self.kind_, self.player_index_, self.tile_index_ = classify_tag(xml_element.tag)
 
-        # return "player {player} discard {tile}".format(**discard)
+    @property
+    def see_tiles_(self):
+        if self.kind_ == EventKind.DRAW:
+            return [tile_from_tenhou(self.tile_index_)]
 
-    def __getattr__(self, name):
-        return getattr(self._wrapped_xml_event, name)
+    @property
+    def show_tiles_(self):
+        if self.kind_ == EventKind.DISCARD:
+            return [tile_from_tenhou(self.tile_index_)]
+
+    @property
+    def attrib(self):
+        return self._attrib
+
+    def get(self, key, default=None):
+        return self._attrib.get(key, default)
+
+    def to_element(self) -> Element:
+        return Element(self.tag, dict(self._attrib))
 
     def __repr__(self):
-        return "[%s]:%s" % self, self._wrapped_xml_event
+        return "<%s>" % self
+
+    @property
+    def meld_(self):
+        """
+        decoded meld of an N event, None for other events.
+        """
+        if self._meld is None and self.kind_ == EventKind.MELD:
+            attrs = self._attrib
+            self._meld = decode_meld(int(attrs['who']), attrs['m'])
+        return self._meld
 
     @property
     def meta_attribute(self):
-        return self._wrapped_xml_event.attrib
+        return self._attrib
 
     def __str__(self):
         return "{}:{}".format(
-            self.base_str(), ET.tostring(self._wrapped_xml_event).decode("utf-8")
+            self.base_str(), ET.tostring(self.to_element()).decode("utf-8")
         )
 
     def base_str(self):
-        event = self._wrapped_xml_event
+        event = self
         attrs = event.attrib
-        draw = draw_tile_change(event)
+        draw = draw_tile_change(self)
         if draw:
             return "player {player} draw {tile}".format(**draw)
-        discard = discard_tile_change(event)
+        discard = discard_tile_change(self)
         if discard:
             return "player {player} discard {tile}".format(**discard)
-        if is_open_hand(event):
+        if is_open_hand(self):
             return "player {who} claimed {item}".format(
                 who=attrs['who'],
-                item=meld_from(event)
+                item=meld_from(self)
             )
-        if is_richii(event):
+        if is_richii(self):
             return "player {who} richii".format(
                 who=attrs['who'],
             )
-        if is_dora_indicator_event(event):
+        if is_dora_indicator_event(self):
             return "new dora indicator {tile}".format(
                 tile=tile_from_tenhou(int(attrs['hai'])),
             )
-        if is_somebody_win_game(event):
+        if is_somebody_win_game(self):
             return 'player {winner} win {score} from player {loser}'.format(
                 winner=attrs['who'],
                 loser=attrs['fromWho'],
                 score=number_list(event.attrib['ten'])[1],
             )
-        if is_nobody_win_game(event):
+        if is_nobody_win_game(self):
             return 'no body win {reason}'.format(
                 reason=DRAWN_TYPES[attrs['type']]
                 if 'type' in attrs else '',
@@ -150,7 +239,7 @@ class TenhouEvent:
         )
 
     def to_paifu(self):
-        event = self._wrapped_xml_event
+        event = self
         attrs = event.attrib
         if event.tag == 'INIT':
             dict0 = {'event_type': 'INIT1', 'player': '0', 'player_see': ''.join(
@@ -173,38 +262,38 @@ class TenhouEvent:
                 return [dict0, dict1, dict2, dict3, dora, initround]
             else:
                 return [dict0, dict1, dict2, dora, initround]
-        draw = draw_tile_change(event)
+        draw = draw_tile_change(self)
         if draw:
             player, tile = draw['player'], draw['tile']
             return [{'event_type': 'DRAW', 'player': str(player), 'player_see': str(tile)}]
-        discard = discard_tile_change(event)
+        discard = discard_tile_change(self)
         if discard:
             player, tile = discard['player'], discard['tile']
             return [{'event_type': 'DISCARD', 'player': str(player), 'player_show': str(tile)}]
-        if is_open_hand(event):
+        if is_open_hand(self):
 
             player = attrs['who']
-            item = meld_from(event)
-            type_of = unpack_with(MeldTypeData, meld_type_unpacker, event.attrib['m'])
+            item = meld_from(self)
+            type_of = meld_type(event.attrib['m'])
             source = item.from_who
             self_tile = item.self_tiles
             borrow_tile = item.borrowed_tiles
-            if type_of.syuntsu:
+            if type_of == MeldType.flush:
                 return [{'event_type': 'CHI', 'player': str(player),
                          'player_show': ''.join([str(tile_from_tenhou(int(i))) for i in self_tile]),
                          'player_open': ''.join([str(tile_from_tenhou(int(i))) for i in borrow_tile]) + ''.join(
                              [str(tile_from_tenhou(int(i))) for i in self_tile]), 'origin': str(source)}]
-            elif type_of.koutsu:
+            elif type_of == MeldType.triplet:
                 return [{'event_type': 'PENG ', 'player': str(player),
                          'player_show': ''.join([str(tile_from_tenhou(int(i))) for i in self_tile]),
                          'player_open': ''.join([str(tile_from_tenhou(int(i))) for i in borrow_tile]) + ''.join(
                              [str(tile_from_tenhou(int(i))) for i in self_tile]), 'origin': str(source)}]
-            elif type_of.chakan:
+            elif type_of == MeldType.add_kan:
                 return [{'event_type': 'GANG', 'player': str(player),
                          'player_show': ''.join([str(tile_from_tenhou(int(i))) for i in self_tile]),
                          'player_open': ''.join([str(tile_from_tenhou(int(i))) for i in borrow_tile]) + ''.join(
                              [str(tile_from_tenhou(int(i))) for i in self_tile]), 'origin': str(source)}]
-            elif type_of.nuki:
+            elif type_of == MeldType.kita:
                 return [{'event_type': 'KITA', 'player': str(player),
                          'player_show': str([tile_from_tenhou(i) for i in self_tile][0]),
                          'player_open': str([tile_from_tenhou(i) for i in self_tile][0])}]
@@ -220,7 +309,7 @@ class TenhouEvent:
                              'player_open': ''.join([str(tile_from_tenhou(int(i))) for i in borrow_tile]) + ''.join(
                                  [str(tile_from_tenhou(int(i))) for i in self_tile]), 'origin': str(source)}]
 
-        if is_richii(event):
+        if is_richii(self):
             player = attrs['who']
             status = attrs['step']
             if status == '1':
@@ -230,17 +319,17 @@ class TenhouEvent:
                 score = {'event_type': 'SCORE', 'player': str(player), 'score': '-1000'}
                 return [richi, score]
 
-        if is_dora_indicator_event(event):
+        if is_dora_indicator_event(self):
             tile = tile_from_tenhou(int(attrs['hai']))
             return [{'event_type': 'DORA', 'player': '0', 'player_see': tile, 'player_show': tile}]
 
-        if is_somebody_win_game(event):
+        if is_somebody_win_game(self):
             player = attrs['who']
             loser = attrs['fromWho']
             score = number_list(event.attrib['ten'])[1]
             return [{'event_type': 'WIN', 'player': str(player), 'origin': str(loser)}]
 
-        if is_nobody_win_game(event):
+        if is_nobody_win_game(self):
             return [{'event_type': 'EVEN', 'origin': DRAWN_TYPES[attrs['type']] if 'type' in attrs else ''}]
 
         logging.warning('Unparsed or not support event: {0}'.format(str(event)))
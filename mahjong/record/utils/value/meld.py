@@ -1,11 +1,13 @@
 from abc import ABCMeta, abstractmethod
+from collections import namedtuple
 from enum import Enum, auto
-from typing import Set, Iterable
+from typing import Set, Iterable, Tuple
+
+import numpy as np
 
 from mahjong.container.set import TileSet
-from ..bit import bit_struct_from_desc, named_tuple_from_desc, unpack_with
-from ..constant import TENHOU_TILE_CATEGORY
-from ..value.tile import tile_from_tenhou
+from ..bit import named_tuple_from_desc, bit_fields_from_desc, unpack_int_with
+from ..value.tile import tile_from_tenhou, tenhou_index, tenhou_category
 from ...category import SubCategory
 
 flush_desc = """
@@ -113,7 +115,7 @@ class TenhouMeld(Meld, metaclass=ABCMeta):
 
     @property
     @abstractmethod
-    def unpacker(self):
+    def bit_fields(self):
         pass
 
     @property
@@ -129,9 +131,7 @@ class TenhouMeld(Meld, metaclass=ABCMeta):
         return (self.who_index + FROM_MAP[self.data.kui]) % 4
 
     def unpack(self, value):
-        unpacker = self.unpacker
-        data_class = self.data_class
-        return unpack_with(data_class, unpacker, value)
+        return unpack_int_with(self.data_class, self.bit_fields, value)
 
     def __init__(self, who_index, value) -> None:
         super().__init__()
@@ -147,7 +147,7 @@ class Flush(TenhouMeld):
         flush_color, flush_start_number, which_first = flush_kinds.category(data.type6)
         hais = [data.hai0, data.hai1, data.hai2]
         tiles_basic = [
-            TENHOU_TILE_CATEGORY.index((flush_color, flush_start_number + i, hai))
+            tenhou_index(flush_color, flush_start_number + i, hai)
             for i, hai in enumerate(hais)
         ]
         borrowed_tiles, self_tiles = init_from_basic(tiles_basic, which_first)
@@ -167,8 +167,8 @@ class Flush(TenhouMeld):
         return FlushData
 
     @property
-    def unpacker(self):
-        return flush_packer
+    def bit_fields(self):
+        return flush_fields
 
 
 class Triplet(TenhouMeld):
@@ -184,7 +184,7 @@ class Triplet(TenhouMeld):
         color, number = triplet_color_number.category(tile_type)
         hais = sorted(list(set(range(4)) - {self.data.hai_unused}))
         tiles_basic = [
-            TENHOU_TILE_CATEGORY.index((color, number, hai))
+            tenhou_index(color, number, hai)
             for i, hai in enumerate(hais)
         ]
         borrowed_tiles, self_tiles = init_from_basic(tiles_basic, which_first)
@@ -192,8 +192,8 @@ class Triplet(TenhouMeld):
         self._borrowed_tiles = borrowed_tiles
 
     @property
-    def unpacker(self):
-        return triplet_packer
+    def bit_fields(self):
+        return triplet_fields
 
     @property
     def self_tiles(self):
@@ -222,12 +222,12 @@ class TenhouAddedKan(TenhouMeld):
         triplet_color_number = SubCategory(4, 9)
         tile_type, which_first = triplet_kinds.category(self.data.type7)
         color, number = triplet_color_number.category(tile_type)
-        self._self_tiles = {TENHOU_TILE_CATEGORY.index((color, number, self.data.hai_added))}
+        self._self_tiles = {tenhou_index(color, number, self.data.hai_added)}
         self._borrowed_tiles = set()
 
     @property
-    def unpacker(self):
-        return added_kan_packer
+    def bit_fields(self):
+        return added_kan_fields
 
     @property
     def self_tiles(self):
@@ -249,10 +249,10 @@ class TenhouKan(TenhouMeld, Kan):
 
     def __init__(self, who_index, value) -> None:
         super().__init__(who_index, value)
-        color, number, hai_index = TENHOU_TILE_CATEGORY.category(self.data.type8)
+        color, number, hai_index = tenhou_category(self.data.type8)
         hais = list(range(4))
         tiles_basic = [
-            TENHOU_TILE_CATEGORY.index((color, number, hai))
+            tenhou_index(color, number, hai)
             for i, hai in enumerate(hais)
         ]
         if self.data.kui == 0:
@@ -264,8 +264,8 @@ class TenhouKan(TenhouMeld, Kan):
             self._borrowed_tiles = borrowed_tiles
 
     @property
-    def unpacker(self):
-        return kan_packer
+    def bit_fields(self):
+        return kan_fields
 
     @property
     def self_tiles(self):
@@ -311,8 +311,8 @@ class Kita(TenhouMeld):
         self._borrowed_tiles = set()
 
     @property
-    def unpacker(self):
-        return kita_packer
+    def bit_fields(self):
+        return kita_fields
 
     @property
     def self_tiles(self):
@@ -324,23 +324,25 @@ class Kita(TenhouMeld):
 
 
 FlushData = named_tuple_from_desc("flush_data", flush_desc)
-flush_packer = bit_struct_from_desc(flush_desc)
+flush_fields = bit_fields_from_desc(flush_desc)
 
 TripletData = named_tuple_from_desc("triplet_data", triplet_desc)
-triplet_packer = bit_struct_from_desc(triplet_desc)
+triplet_fields = bit_fields_from_desc(triplet_desc)
 
 KanData = named_tuple_from_desc("kan_data", kan_desc)
-kan_packer = bit_struct_from_desc(kan_desc)
+kan_fields = bit_fields_from_desc(kan_desc)
 
 AddedKanData = named_tuple_from_desc("added_kan_data", added_kan_desc)
-added_kan_packer = bit_struct_from_desc(added_kan_desc)
+added_kan_fields = bit_fields_from_desc(added_kan_desc)
 
 KitaData = named_tuple_from_desc("kita_data", kita_desc)
-kita_packer = bit_struct_from_desc(kita_desc)
+kita_fields = bit_fields_from_desc(kita_desc)
 
-meld_type_desc = kita_desc
-meld_type_unpacker = bit_struct_from_desc(meld_type_desc)
-MeldTypeData = named_tuple_from_desc("meld_type", meld_type_desc)
+# flags of meld code telling its type, checked in this order.
+SYUNTSU_BIT = 1 << 2
+KOUTSU_BIT = 1 << 3
+CHAKAN_BIT = 1 << 4
+NUKI_BIT = 1 << 5
 
 
 class MeldType(Enum):
@@ -350,35 +352,114 @@ class MeldType(Enum):
     add_kan = auto()
     kita = auto()
 
+
 def meld_type(data):
-    type_of = unpack_with(MeldTypeData, meld_type_unpacker, data)
-    if type_of.syuntsu:
+    data = int(data)
+    if data & SYUNTSU_BIT:
         return MeldType.flush
-    elif type_of.koutsu:
+    elif data & KOUTSU_BIT:
         return MeldType.triplet
-    elif type_of.chakan:
+    elif data & CHAKAN_BIT:
         return MeldType.add_kan
-    elif type_of.nuki:
+    elif data & NUKI_BIT:
         return MeldType.kita
     else:
         return MeldType.kan
 
 
+MELD_CLASSES = {
+    MeldType.flush: Flush,
+    MeldType.triplet: Triplet,
+    MeldType.add_kan: TenhouAddedKan,
+    MeldType.kita: Kita,
+    MeldType.kan: TenhouKan,
+}
+
+
+def decode_meld(who: int, data) -> Meld:
+    data = int(data)
+    return MELD_CLASSES[meld_type(data)](who, data)
+
+
 def meld_from(event) -> Meld:
-    who = int(event.attrib['who'])
-    data = event.attrib['m']
-    type_of = unpack_with(MeldTypeData, meld_type_unpacker, data)
-
-    if type_of.syuntsu:
-        return Flush(who, data)
-    elif type_of.koutsu:
-        return Triplet(who, data)
-    elif type_of.chakan:
-        return TenhouAddedKan(who, data)
-    elif type_of.nuki:
-        return Kita(who, data)
-    else:
-        return TenhouKan(who, data)
+    """
+    meld of an N event. a TenhouEvent decodes it once and keeps it as meld_.
+    """
+    meld = getattr(event, "meld_", None)
+    if meld is not None:
+        return meld
+    return decode_meld(int(event.attrib['who']), event.attrib['m'])
+
+
+# kind: MeldType value, self_tiles: (N, 4) tenhou indexes padded by -1, borrowed_tile: tenhou index or -1.
+MeldArray = namedtuple("MeldArray", ["kind", "from_who", "self_tiles", "borrowed_tile"])
+
+
+def decode_meld_array(who, data) -> MeldArray:
+    """
+    vectorized decode_meld of (N,) who and meld codes, with the same tiles as the Meld classes.
+    """
+    who = np.asarray(who, dtype=np.int64)
+    data = np.asarray(data, dtype=np.int64)
+    count = len(data)
+    kui = data & 3
+    kind = np.full(count, MeldType.kan.value, dtype=np.int8)
+    for flag, meld_type_of_flag in reversed([(SYUNTSU_BIT, MeldType.flush), (KOUTSU_BIT, MeldType.triplet),
+                                             (CHAKAN_BIT, MeldType.add_kan), (NUKI_BIT, MeldType.kita)]):
+        kind[(data & flag) != 0] = meld_type_of_flag.value
+    tiles = np.full((count, 4), -1, dtype=np.int64)
+    borrowed_index = np.full(count, -1, dtype=np.int64)
+
+    flush = kind == MeldType.flush.value
+    flush_type = data[flush] >> 10
+    flush_start = (flush_type // 21) * 9 + (flush_type // 3) % 7
+    for i in range(3):
+        tiles[flush, i] = (flush_start + i) * 4 + ((data[flush] >> (3 + 2 * i)) & 3)
+    borrowed_index[flush] = flush_type % 3
+
+    triplet = kind == MeldType.triplet.value
+    triplet_type = data[triplet] >> 9
+    unused = (data[triplet] >> 5) & 3
+    for i in range(3):
+        # copies in order, skipping the unused one.
+        tiles[triplet, i] = (triplet_type // 3) * 4 + i + (i >= unused)
+    borrowed_index[triplet] = triplet_type % 3
+
+    added_kan = kind == MeldType.add_kan.value
+    tiles[added_kan, 0] = (data[added_kan] >> 9) // 3 * 4 + ((data[added_kan] >> 5) & 3)
+
+    kita = kind == MeldType.kita.value
+    tiles[kita, 0] = data[kita] >> 8
+
+    kan = kind == MeldType.kan.value
+    kan_type = data[kan] >> 8
+    for i in range(4):
+        tiles[kan, i] = kan_type // 4 * 4 + i
+    borrowed_index[kan] = np.where(kui[kan] != 0, kan_type % 4, -1)
+
+    rows = np.arange(count)
+    has_borrowed = borrowed_index >= 0
+    borrowed_tile = np.where(has_borrowed, tiles[rows, np.maximum(borrowed_index, 0)], -1)
+    # the borrowed tile is moved out of self tiles, keeping them left aligned.
+    keep = ~(has_borrowed[:, None] & (np.arange(4)[None, :] == borrowed_index[:, None])) & (tiles >= 0)
+    order = np.argsort(~keep, axis=1, kind="stable")
+    self_tiles = np.where(np.take_along_axis(keep, order, axis=1), np.take_along_axis(tiles, order, axis=1), -1)
+    return MeldArray(kind, (who + kui) % 4, self_tiles, borrowed_tile)
+
+
+def record_meld_array(events) -> Tuple[np.ndarray, MeldArray]:
+    """
+    positions of N events in events, and their decode_meld_array.
+    """
+    positions = []
+    who = []
+    data = []
+    for position, event in enumerate(events):
+        if event.tag == "N":
+            positions.append(position)
+            who.append(int(event.attrib['who']))
+            data.append(int(event.attrib['m']))
+    return np.array(positions, dtype=np.int64), decode_meld_array(who, data)
 
 
 def is_triplet_of_added_kan(item: Triplet, added: TenhouAddedKan):
@@ -1,25 +1,88 @@
+from typing import FrozenSet, Iterable, List, Tuple
+
+import numpy as np
+
+from mahjong.container.array_set import tile_slot, SLOT_TILES
 from mahjong.tile.definition import Tile, AkaTile
-from ..constant import TENHOU_TILE_CATEGORY, SUIT_ORDER
+from ..constant import SUIT_ORDER
+
+TENHOU_TILE_COPIES = 4
+TENHOU_TILE_COUNT = len(SLOT_TILES) * TENHOU_TILE_COPIES
+
+# first copy of each suit's 5 is the aka dora when the game plays with aka.
+TENHOU_AKA_INDEXES = frozenset(
+    (SUIT_ORDER.index(color) * 9 + 5 - 1) * TENHOU_TILE_COPIES for color in "mps"
+)
+
+# tenhou kinds (index // 4) follow the slot order of container.array_set.
+TENHOU_SLOTS = np.arange(TENHOU_TILE_COUNT, dtype=np.int64) // TENHOU_TILE_COPIES
+
+_PLAIN_TILES: Tuple[Tile, ...] = tuple(SLOT_TILES[slot] for slot in TENHOU_SLOTS.tolist())
+_AKA_TILES: Tuple[Tile, ...] = tuple(
+    AkaTile(0, tile.color) if index in TENHOU_AKA_INDEXES else tile for index, tile in enumerate(_PLAIN_TILES)
+)
+_SLOT_INDEXES: Tuple[FrozenSet[int], ...] = tuple(
+    frozenset(range(slot * TENHOU_TILE_COPIES, (slot + 1) * TENHOU_TILE_COPIES)) for slot in range(len(SLOT_TILES))
+)
+
+# tiles of 2m-8m are not played by three players.
+_THREE_PLAYER_SLOTS = [slot for slot, tile in enumerate(SLOT_TILES) if tile.color != 'm' or tile.number in (1, 9)]
+_TENHOU_INDEXES = {
+    4: frozenset(range(TENHOU_TILE_COUNT)),
+    3: frozenset().union(*(_SLOT_INDEXES[slot] for slot in _THREE_PLAYER_SLOTS)),
+}
+
+
+def tenhou_index(color: int, number: int, copy: int) -> int:
+    """
+    color is index of SUIT_ORDER, number is 0-based, copy in [0, 4).
+    """
+    return (color * 9 + number) * TENHOU_TILE_COPIES + copy
+
+
+def tenhou_category(index: int) -> Tuple[int, int, int]:
+    """
+    inverse of tenhou_index.
+    """
+    kind, copy = divmod(index, TENHOU_TILE_COPIES)
+    color, number = divmod(kind, 9)
+    return color, number, copy
 
 
-def tile_from_tenhou(index):
+def tile_from_tenhou(index, aka=True):
     """
     tenhou index is numbered as [1m,1m,1m,1m,2m,2m,...,9m,1p,...,9p,1s,...,9s,1z,...,7z,7z,7z,7z]
-    numbered first 5m,5s,5p is considered as aka dora.
+    numbered first 5m,5s,5p is considered as aka dora, unless aka is False.
     """
-    if index == TENHOU_TILE_CATEGORY.index((SUIT_ORDER.index('m'), 4, 0)):
-        return AkaTile(0, 'm')
-    elif index == TENHOU_TILE_CATEGORY.index((SUIT_ORDER.index('p'), 4, 0)):
-        return AkaTile(0, 'p')
-    elif index == TENHOU_TILE_CATEGORY.index((SUIT_ORDER.index('s'), 4, 0)):
-        return AkaTile(0, 's')
-    else:
-        color, number, _ = TENHOU_TILE_CATEGORY.category(index)
-        return Tile(number + 1, SUIT_ORDER[color])
+    return (_AKA_TILES if aka else _PLAIN_TILES)[index]
+
+
+def tiles_from_tenhou(indexes: Iterable[int], aka=True) -> List[Tile]:
+    tiles = _AKA_TILES if aka else _PLAIN_TILES
+    return [tiles[index] for index in indexes]
+
+
+def tile_to_tenhou_indexes(tile: Tile) -> FrozenSet[int]:
+    """
+    the 4 tenhou indexes of tile, an aka five gives those of its five.
+    """
+    return _SLOT_INDEXES[tile_slot(tile)]
 
 
 def tile_to_tenhou_range(tile: Tile):
-    color = SUIT_ORDER.index(tile.color)
-    number = tile.number - 1
-    start_tile, end_tile = (TENHOU_TILE_CATEGORY.index(t) for t in [(color, number, 0), (color, number, 3)])
-    return range(start_tile, end_tile + 1)
+    start = tile_slot(tile) * TENHOU_TILE_COPIES
+    return range(start, start + TENHOU_TILE_COPIES)
+
+
+def tenhou_tile_indexes(player_count: int = 4) -> FrozenSet[int]:
+    """
+    indexes of all tiles in a game of player_count players.
+    """
+    return _TENHOU_INDEXES[player_count]
+
+
+def tenhou_slots(indexes) -> np.ndarray:
+    """
+    vectorized slots (see container.array_set) of tenhou indexes.
+    """
+    return TENHOU_SLOTS[np.asarray(indexes, dtype=np.int64)]
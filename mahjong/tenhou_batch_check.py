@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+"""
+check many tenhou records at once: every record is analysed for all its players in a process pool,
+reports are written as they complete, then a summary of all of them is saved as json and csv.
+"""
+import argparse
+import csv
+import gzip
+import json
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from loguru import logger
+
+from mahjong.record.fetcher import RecordFetcher, default_fetcher
+from mahjong.record.reader import from_file, log_id_from_url, TenhouRecord
+from mahjong.tenhou_record_check import template_env, render_template, players_analysis, WAITING_CACHE
+
+RECORD_SUFFIXES = (".xml", ".xml.gz")
+
+MAX_PLAYER_COUNT = 4
+
+SUMMARY_FIELDS = ["log_id", "player_index", "player", "games", "discards", "mistakes", "mean_wrong_rate",
+                  "report", "error"]
+
+
+def is_url(path: str) -> bool:
+    return "://" in path
+
+
+def record_paths(paths: Iterable[str], fetcher: Optional[RecordFetcher] = None) -> List[str]:
+    """
+    record files of paths, directories are walked recursively for *.xml and *.xml.gz in name order.
+    urls are downloaded concurrently by fetcher (the default one if None) and replaced by their cached files.
+    """
+    paths = list(paths)
+    urls = [path for path in paths if is_url(path)]
+    downloaded = {}
+    if urls:
+        if fetcher is None:
+            fetcher = default_fetcher()
+        downloaded = dict(fetcher.fetch_many(urls))
+        for url, path in downloaded.items():
+            if isinstance(path, Exception):
+                logger.warning("downloading {} failed: {!r}", url, path)
+    result = []
+    for path in paths:
+        if is_url(path):
+            result.append(downloaded[path] if isinstance(downloaded[path], str) else path)
+        elif os.path.isdir(path):
+            for directory, sub_directories, files in os.walk(path):
+                sub_directories.sort()
+                result.extend(os.path.join(directory, name) for name in sorted(files)
+                              if name.endswith(RECORD_SUFFIXES))
+        else:
+            result.append(path)
+    return result
+
+
+def log_id_from_path(path: str) -> str:
+    if is_url(path):
+        return log_id_from_url(path)
+    name = os.path.basename(path)
+    for suffix in RECORD_SUFFIXES:
+        if name.endswith(suffix):
+            return name[:-len(suffix)]
+    return os.path.splitext(name)[0]
+
+
+def load_record(path: str) -> TenhouRecord:
+    if path.endswith(".gz"):
+        with gzip.open(path, "rb") as file:
+            return from_file(file)
+    return from_file(path)
+
+
+@lru_cache(maxsize=None)
+def _report_template():
+    return template_env("mahjong").get_template("record_checker_template.html")
+
+
+class CheckResult:
+    def __init__(self, path: str, player_index: int, player: str = "", games: int = 0, discards: int = 0,
+                 mistakes: int = 0, mean_wrong_rate: float = 0.0, report: Optional[str] = None,
+                 error: Optional[str] = None):
+        self.path = path
+        self.log_id = log_id_from_path(path)
+        self.player_index = player_index
+        self.player = player
+        self.games = games
+        self.discards = discards
+        self.mistakes = mistakes
+        self.mean_wrong_rate = mean_wrong_rate
+        self.report = report
+        self.error = error
+
+    def as_dict(self) -> dict:
+        return {field: getattr(self, field) for field in SUMMARY_FIELDS}
+
+    def __str__(self):
+        if self.error is not None:
+            return "{} [{}]: failed, {}".format(self.log_id, self.player_index, self.error)
+        return "{} [{}] {}: {} mistakes in {} discards".format(self.log_id, self.player_index, self.player,
+                                                               self.mistakes, self.discards)
+
+
+def check_record(path: str, player_indexes: Optional[Sequence[int]], output_dir: str) -> List[CheckResult]:
+    """
+    analyse players of a record file (all of them if player_indexes is None, those it has otherwise)
+    in one replay of its games, write their html reports into output_dir.
+    """
+    record = load_record(path)
+    players = [record.players[index] for index in _player_indexes(record, player_indexes)]
+    analyses = players_analysis(players, record)
+    results = []
+    for player in players:
+        games = analyses[player.index]
+        file_name, rendered_str = render_template(player, record, _report_template(),
+                                                  log_id=log_id_from_path(path), games=games)
+        report = os.path.join(output_dir, file_name)
+        with open(report, "w", encoding='utf-8') as result_file:
+            result_file.write(rendered_str)
+        rounds = [round_reasoning for game in games for round_reasoning in game.rounds]
+        mistakes = sum(1 for round_reasoning in rounds if round_reasoning.wrong_rate > 0)
+        mean_wrong_rate = sum(round_reasoning.wrong_rate for round_reasoning in rounds) / len(rounds) \
+            if rounds else 0.0
+        results.append(CheckResult(path, player.index, str(player), len(games), len(rounds), mistakes,
+                                   mean_wrong_rate, report))
+    logger.debug("waiting cache {}", WAITING_CACHE.info())
+    return results
+
+
+def check_player(path: str, player_index: int, output_dir: str) -> CheckResult:
+    """
+    analyse one player of a record file, write its html report into output_dir.
+    """
+    return check_record(path, [player_index], output_dir)[0]
+
+
+def _player_indexes(record: TenhouRecord, player_indexes: Optional[Sequence[int]]) -> List[int]:
+    player_count = len(record.players)
+    if player_indexes is None:
+        return list(range(player_count))
+    dropped = [index for index in player_indexes if not 0 <= index < player_count]
+    if dropped:
+        logger.warning("record has {} players, skipped player {}", player_count,
+                       ", ".join(str(index + 1) for index in dropped))
+    return [index for index in player_indexes if 0 <= index < player_count]
+
+
+def _init_worker(log_level: Optional[str]):
+    if log_level is not None:
+        logger.remove()
+        logger.add(sys.stderr, level=log_level)
+
+
+def _failed(path: str, player_index: int, e: Exception) -> CheckResult:
+    logger.warning("checking {} player {} failed: {!r}", path, player_index, e)
+    return CheckResult(path, player_index, error=repr(e))
+
+
+def _failed_record(path: str, player_indexes: Optional[Sequence[int]], e: Exception) -> List[CheckResult]:
+    # players of a record that can not be read are unknown, report it once as player -1.
+    return [_failed(path, index, e) for index in (player_indexes if player_indexes is not None else [-1])]
+
+
+def batch_check(paths: Iterable[str], output_dir: str = ".", player_indexes: Optional[Sequence[int]] = None,
+                workers: int = 1, log_level: Optional[str] = None,
+                fetcher: Optional[RecordFetcher] = None) -> Iterator[CheckResult]:
+    """
+    check every player (or those of player_indexes) of every record under paths, see record_paths.
+    results are yielded as they complete, so in no particular order when workers > 1.
+    a failed record or player is yielded with its error instead of stopping the batch.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    paths = record_paths(paths, fetcher)
+    if workers <= 1:
+        for path in paths:
+            try:
+                yield from check_record(path, player_indexes, output_dir)
+            except Exception as e:
+                yield from _failed_record(path, player_indexes, e)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(log_level,)) as executor:
+        futures = {executor.submit(check_record, path, player_indexes, output_dir): path for path in paths}
+        for future in as_completed(futures):
+            try:
+                yield from future.result()
+            except Exception as e:
+                yield from _failed_record(futures[future], player_indexes, e)
+
+
+def write_summary(results: List[CheckResult], output_dir: str, name: str = "summary") -> Tuple[str, str]:
+    """
+    save results sorted by record and player as <name>.json and <name>.csv in output_dir.
+    """
+    rows = [result.as_dict() for result in sorted(results, key=lambda r: (r.path, r.player_index))]
+    json_path = os.path.join(output_dir, name + ".json")
+    with open(json_path, "w", encoding='utf-8') as json_file:
+        json.dump(rows, json_file, ensure_ascii=False, indent=2)
+    csv_path = os.path.join(output_dir, name + ".csv")
+    with open(csv_path, "w", encoding='utf-8', newline='') as csv_file:
+        writer = csv.DictWriter(csv_file, fieldnames=SUMMARY_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+    return json_path, csv_path
+
+
+def player_number(value: str) -> int:
+    number = int(value)
+    if not 1 <= number <= MAX_PLAYER_COUNT:
+        raise argparse.ArgumentTypeError("player number should be in 1-{}, got {}".format(MAX_PLAYER_COUNT, value))
+    return number
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="check tenhou record files in batch.")
+    parser.add_argument("paths", nargs="+", help="record files (.xml or .xml.gz), directories of them or tenhou.net log links")
+    parser.add_argument("-o", "--output", default="tenhou_reports", help="directory of reports and summary")
+    parser.add_argument("-p", "--player", type=player_number, action="append",
+                        help="player number (1-4) to check, repeatable, all players by default")
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="number of processes (default 1, run in this process)")
+    parser.add_argument("--log-level", default="WARNING")
+    options = parser.parse_args(args)
+
+    logger.remove()
+    logger.add(sys.stderr, level=options.log_level)
+    player_indexes = None if options.player is None else [number - 1 for number in options.player]
+    results = []
+    for result in batch_check(options.paths, options.output, player_indexes, options.workers, options.log_level):
+        results.append(result)
+        print(result)
+    json_path, csv_path = write_summary(results, options.output)
+    failed = sum(1 for result in results if result.error is not None)
+    print("{} reports, {} failed. summary has been saved to {} and {}".format(
+        len(results) - failed, failed, os.path.abspath(json_path), os.path.abspath(csv_path)))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    # frozen binaries start worker processes from this executable.
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -9,19 +9,19 @@ import pkg_resources
 from loguru import logger
 from functools import reduce
 from itertools import groupby, product
-from typing import Set, List, Callable, TypeVar, Optional
+from typing import Set, List, Callable, TypeVar, Optional, Dict
 
 from jinja2 import Environment, select_autoescape, PackageLoader, FileSystemLoader
 
-from mahjong.container.pattern.reasoning import HeuristicPatternMatchWaiting
+from mahjong.container.pattern.cache import CachedWaiting, LRUCache
+from mahjong.container.pattern.table import TableWaiting
 from mahjong.container.pattern.win import NormalTypeWin, UniquePairs
 from mahjong.container.set import TileSet
 from mahjong.record.category import MixedCategory, SubCategory
 from mahjong.record.reader import from_url, log_id_from_url, log_id_to_url
-from mahjong.record.state import PlayerHand, InvisibleTiles, PlayerMeld
-from mahjong.record.utils import event
+from mahjong.record.state import GameTracker, TrackerSnapshot
 from mahjong.record.utils.value.meld import Kita
-from mahjong.record.utils.value.tile import tile_from_tenhou, tile_to_tenhou_range
+from mahjong.record.utils.value.tile import tile_from_tenhou, tiles_from_tenhou, tile_to_tenhou_indexes
 from mahjong.tile.definition import Tile
 
 
@@ -34,6 +34,9 @@ def n_c_r(n, r):
     return n_a_r(n, r) / n_a_r(r, r)
 
 
+# shared by all discards, hand shapes recur across rounds, players and records.
+WAITING_CACHE = LRUCache()
+
 UNICODE_TILE_ORDER = "zmsp"
 
 UNICODE_HONOR_ORDER = [int(x) for x in "01234765"]
@@ -107,7 +110,7 @@ def reasoning_merge(reason_list: List[ReasoningItem], invisible_set: Set[int]) -
     tiles_reasoning_item = reduce(reduce_useful, reason_list)
     return ReasoningItem(reason_list[0].discard_tile,
                          min(item.waiting_step for item in reason_list), tiles_reasoning_item.useful_tiles,
-                         sum(len(set(tile_to_tenhou_range(tile)) & invisible_set)
+                         sum(len(tile_to_tenhou_indexes(tile) & invisible_set)
                              for tile in tiles_reasoning_item.useful_tiles))
 
 
@@ -173,15 +176,34 @@ def main():
     env = template_env("mahjong")
 
     template = env.get_template("record_checker_template.html")
+    analyses = players_analysis(planned_players, record)
     for player in planned_players:
-        file_name, rendered_str = render_template(player, record, template, log_url)
+        file_name, rendered_str = render_template(player, record, template, log_url, games=analyses[player.index])
         with open(file_name, "w+", encoding='utf-8') as result_file:
             result_file.write(rendered_str)
         print("report has been saved to", os.path.abspath(file_name))
+    logger.debug("waiting cache {}", WAITING_CACHE.info())
+
+
+def players_analysis(players, record) -> Dict[int, List[GameAnalysis]]:
+    """
+    analysis of each of players by player index, every game is replayed once for all of them.
+    """
+    analyses = {player.index: [] for player in players}
+    for game in record.game_list:
+        name = str(game)
+        for index, rounds in game_reason_lists(game, players, record).items():
+            analyses[index].append(GameAnalysis(name, rounds))
+    return analyses
+
 
+def record_analysis(player, record) -> List[GameAnalysis]:
+    return players_analysis([player], record)[player.index]
 
-def render_template(player, record, template, log_url=None, log_id=None, generate_filename=True):
-    games = [GameAnalysis(str(game), game_reason_list(game, player, record)) for game in record.game_list]
+
+def render_template(player, record, template, log_url=None, log_id=None, generate_filename=True, games=None):
+    if games is None:
+        games = record_analysis(player, record)
     if log_url is not None:
         log_id = log_id_from_url(log_url)
     elif log_id is not None:
@@ -199,43 +221,38 @@ def render_template(player, record, template, log_url=None, log_id=None, generat
 
 
 def game_reason_list(game, player, record):
+    return game_reason_lists(game, [player], record)[player.index]
+
+
+def game_reason_lists(game, players, record) -> Dict[int, List[RoundReasoning]]:
     logger.info("start game {}", game)
-    hand_state = PlayerHand(player)
-    player_meld_state = PlayerMeld(player)
-    invisible_tiles_state = InvisibleTiles(len(record.players))
-    return list(game_reasoning(game, hand_state, invisible_tiles_state, player, player_meld_state))
-
-
-def game_reasoning(game, hand_state, invisible_tiles_state, player, player_meld_state):
-    somebody_richii = False
-    for discarded, g in groupby(game.events, lambda e: player.is_discard(e)):
-        round_of_game = list(g)
-        discard_event = round_of_game[0]
-        somebody_richii = somebody_richii or any(event.is_richii(e) for e in round_of_game)
-        if discarded:
-            reasoning = discard_reasoning(discard_event, hand_state, invisible_tiles_state, player, player_meld_state)
-            reasoning.somebody_richii = somebody_richii
-            yield reasoning
-        hand_state = hand_state.passed_events(round_of_game)
-        invisible_tiles_state = invisible_tiles_state.passed_events(round_of_game)
-        player_meld_state = player_meld_state.passed_events(round_of_game)
-
-
-def discard_reasoning(discard_event, hand_state, invisible_tiles_state, player, player_meld_state):
-    invisible_player_perspective = invisible_tiles_state.value - set(hand_state.value)
-    meld_count = sum(1 for meld in player_meld_state.value if not isinstance(meld, Kita))
-    hand = TileSet(tile_from_tenhou(index) for index in hand_state.value)
+    reasonings = {player.index: [] for player in players}
+    for player, reasoning in game_reasoning(game, GameTracker(len(record.players)), players):
+        reasonings[player.index].append(reasoning)
+    return reasonings
+
+
+def game_reasoning(game, tracker: GameTracker, players):
+    for event in game.events:
+        for player in players:
+            if player.is_discard(event):
+                reasoning = discard_reasoning(event, tracker.snapshot(player.index), player)
+                reasoning.somebody_richii = tracker.somebody_richii
+                yield player, reasoning
+        tracker.apply(event)
+
+
+def discard_reasoning(discard_event, snapshot: TrackerSnapshot, player):
+    invisible_player_perspective = snapshot.invisible
+    meld_count = sum(1 for meld in snapshot.melds if not isinstance(meld, Kita))
+    hand = TileSet(tiles_from_tenhou(sorted(snapshot.hand)))
     logger.info("reasoning {}", hand)
     win_types = [NormalTypeWin(melds=4 - meld_count)]
     reasoning_names = ["normal_reasonings", "seven_pair_reasonings"]
     if meld_count == 0:
         win_types.append(UniquePairs())
     win_reasonings = all_win_type_reasoning(hand, invisible_player_perspective, win_types)
-    merged_win_reasonings = [
-        reasoning_merge(list(reasoning_same_discard), invisible_player_perspective)
-        for reasoning_same_discard in zip(*win_reasonings)
-    ]
-    merged_win_reasonings.sort(key=reasoning_key)
+    merged_win_reasonings = merged_reasoning(hand, invisible_player_perspective, win_types)
     _, expected_reasonings = next(groupby(merged_win_reasonings, key=reasoning_key))
     expected_reasonings = list(expected_reasonings)
     your_choice_tile = tile_from_tenhou(player.discard_tile_index(discard_event))
@@ -271,7 +288,7 @@ def discard_reasoning(discard_event, hand_state, invisible_tiles_state, player,
     meld_strs = [
         join_tiles(to_plain_tile(tile_from_tenhou(x))
                    for x in list(meld.self_tiles) + list(meld.borrowed_tiles))
-        for meld in player_meld_state.value
+        for meld in snapshot.melds
 
     ]
     round_reasoning = RoundReasoning(
@@ -289,13 +306,26 @@ def discard_reasoning(discard_event, hand_state, invisible_tiles_state, player,
     return round_reasoning
 
 
+def merged_reasoning(hand, invisible_player_perspective, win_types) -> List[ReasoningItem]:
+    """
+    reasoning of every distinct discard merged over win_types, sorted by reasoning_key.
+    """
+    merged_win_reasonings = [
+        reasoning_merge([reasoning_discards(hand, invisible_player_perspective, tile, win) for win in win_types],
+                        invisible_player_perspective)
+        for tile in sorted(set(hand.tiles()))
+    ]
+    merged_win_reasonings.sort(key=reasoning_key)
+    return merged_win_reasonings
+
+
 def all_win_type_reasoning(hand, invisible_player_perspective, win_types):
     for win in win_types:
         yield list(one_win_reasoning(hand, invisible_player_perspective, win))
 
 
 def one_win_reasoning(hand, invisible_player_perspective, win):
-    reasoning = HeuristicPatternMatchWaiting(win)
+    reasoning = CachedWaiting(TableWaiting(win), WAITING_CACHE)
     # analysed_tiles = set()
     for tile, step, useful in reasoning.batch_waiting_and_useful_tiles(hand):
         # analysed_tiles.add(tile)
@@ -306,13 +336,13 @@ def one_win_reasoning(hand, invisible_player_perspective, win):
 
 def reasoning_discards(hand, invisible_player_perspective, tile, win):
     hand_temp = hand - TileSet([tile])
-    reasoning = HeuristicPatternMatchWaiting(win)
+    reasoning = CachedWaiting(TableWaiting(win), WAITING_CACHE)
     waiting_step, useful_tiles = reasoning.waiting_and_useful_tiles(hand_temp)
     return convert_to_reasoning(invisible_player_perspective, tile, useful_tiles, waiting_step)
 
 
 def convert_to_reasoning(invisible_player_perspective, tile, useful_tiles, waiting_step):
-    useful_tiles_count = sum(len(set(tile_to_tenhou_range(tile)) & invisible_player_perspective)
+    useful_tiles_count = sum(len(tile_to_tenhou_indexes(tile) & invisible_player_perspective)
                              for tile in useful_tiles)
     return ReasoningItem(tile, waiting_step, useful_tiles, useful_tiles_count)
 
@@ -1,21 +1,68 @@
+import argparse
 import os
-
-import pandas
+import sys
 
 from mahjong.record.reader import from_url, log_id_from_url
-from mahjong.record.universe.command import GameCommand
-from mahjong.record.universe.executor import GameExecutor
-from mahjong.record.universe.tenhou import to_commands, to_command_records
+from mahjong.record.universe.export import export_record, export_dataset, resolve_format, FORMAT_SUFFIXES, \
+    DEFAULT_CHUNK_SIZE
+
 
+def is_url(source: str) -> bool:
+    return "://" in source
 
-def main():
-    tenhou_link = input("input your tenhou.net paifu link:").strip()
+
+def export_url(tenhou_link, output_dir=".", file_format="csv", chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    export commands of a link to <log_id>_command.csv (or .parquet) in output_dir.
+    csv keeps the leading row number column written by earlier versions.
+    """
+    file_format = resolve_format(file_format or "csv")
     log_id = log_id_from_url(tenhou_link)
     record = from_url(tenhou_link, timeout=10)
-    command_csv_path = "{}_command.csv".format(log_id)
-    pandas.DataFrame(to_command_records(record)).to_csv(command_csv_path)
-    print("command and state saved to '{}'".format(command_csv_path))
-    os.system("pause")
+    os.makedirs(output_dir, exist_ok=True)
+    command_path = os.path.join(output_dir, "{}_command{}".format(log_id, FORMAT_SUFFIXES[file_format]))
+    export_record(record, command_path, file_format, chunk_size, index=file_format == "csv")
+    return command_path
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="extract game commands of tenhou records.")
+    parser.add_argument("sources", nargs="*",
+                        help="tenhou.net log links, or record files, directories or zip archives of them "
+                             "exported into one dataset partitioned by log id. ask for a link if none")
+    parser.add_argument("-o", "--output", default=None,
+                        help="directory of the dataset (paifu_dataset by default) or of files of links")
+    parser.add_argument("-f", "--format", choices=sorted(FORMAT_SUFFIXES), default=None,
+                        help="csv for links by default, led by a row number column. for datasets, "
+                             "parquet if pyarrow is installed, otherwise csv (without row numbers) by default")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="commands written at a time")
+    parser.add_argument("--overwrite", action="store_true", help="export records already in the dataset again")
+    options = parser.parse_args(args)
+
+    if not options.sources:
+        tenhou_link = input("input your tenhou.net paifu link:").strip()
+        command_path = export_url(tenhou_link, options.output or ".", options.format, options.chunk_size)
+        print("command and state saved to '{}'".format(command_path))
+        os.system("pause")
+        return 0
+
+    failed = 0
+    for source in options.sources:
+        if is_url(source):
+            command_path = export_url(source, options.output or ".", options.format, options.chunk_size)
+            print("commands saved to '{}'".format(command_path))
+            continue
+        output_dir = options.output or "paifu_dataset"
+        for result in export_dataset(source, output_dir, options.format, options.chunk_size, options.overwrite):
+            if result.error is not None:
+                failed += 1
+                print("{}: failed, {}".format(result.log_id, result.error))
+            elif result.rows is None:
+                print("{}: exists, skipped".format(result.log_id))
+            else:
+                print("{}: {} commands".format(result.log_id, result.rows))
+    return 1 if failed else 0
+
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    sys.exit(main())
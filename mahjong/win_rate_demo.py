@@ -1,69 +1,98 @@
+import argparse
+import multiprocessing
 import os
-from collections import Counter, defaultdict
+from itertools import accumulate
 from time import perf_counter
 
-from mahjong.container.distribution import TileDistribution, StaticWall
-from mahjong.container.pattern.win import NormalTypeWin, UniquePairs
-from mahjong.container.set import TileSet
+from mahjong.container.pattern.table import min_step_discard
+from mahjong.container.simulation import simulate, simulate_until_separated
 from mahjong.container.utils import tile_set_from_string
 
 import numpy as np
 from numpy import linalg as LA
 
+DISCARD_POLICIES = {
+    "keep": None,
+    "min-step": min_step_discard,
+}
 
-def main():
-    input_hand = tile_set_from_string(input('Input hand:'))
+
+def positive(convert):
+    def _positive(value):
+        number = convert(value)
+        if number <= 0:
+            raise argparse.ArgumentTypeError("should be positive, got %s" % value)
+        return number
+
+    return _positive
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Estimate win rate of each discard by Monte Carlo experiments.")
+    parser.add_argument("--hand", help="14 tiles hand, e.g. 123m067p9s1234567z")
+    parser.add_argument("--draws", type=int, help="remain times for drawing tiles")
+    parser.add_argument("--tries", type=positive(int),
+                        help="experiment times (default 1000), the most experiment times with --auto")
+    parser.add_argument("--auto", action="store_true",
+                        help="stop once the best discard is separated from others, or time budget is used up")
+    parser.add_argument("--confidence", type=float, default=0.95,
+                        help="confidence to separate the best discard with --auto (default 0.95)")
+    parser.add_argument("--time-budget", type=positive(float), default=10.0,
+                        help="seconds to run at most with --auto (default 10)")
+    parser.add_argument("--seed", type=int, help="random seed, the same seed gives the same result")
+    parser.add_argument("--discard-policy", choices=sorted(DISCARD_POLICIES), default="keep",
+                        help="keep all drawn tiles (default), or discard the tile keeping least step after "
+                             "each draw (much slower)")
+    parser.add_argument("--by-draw", action="store_true", help="print win rate by each draw")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="worker processes (default 1, run in this process)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    input_hand = tile_set_from_string(args.hand if args.hand is not None else input('Input hand:'))
     while len(input_hand) != 14:
         print("Input hand should be 14 tiles, e.g. 123m067p9s1234567z. " +
               "You have input %s legal tiles" % len(input_hand))
         input_hand = tile_set_from_string(input('Input hand:'))
-    remain_tiles = TileSet(TileDistribution.ALL_TILES * 4) - input_hand
-    remain_tile_distribution = StaticWall(remain_tiles)
-    possible_discard = {tile: input_hand - TileSet([tile]) for tile in input_hand}
-    remain_draw_count = int(input('Remain times for drawing tiles:'))
-    win_counter = Counter()
-    condition_win_counter = defaultdict(Counter)
-    try_count = input('Experiment times (default 1000):')
-    try_count = 1000 if try_count.strip() == '' else int(try_count)
-    normal_win = NormalTypeWin()
-    seven_pair = UniquePairs()
-    win_patterns = [normal_win, seven_pair]
-    avg_win_counter = Counter()
-    total_win_count = 0
-    elapsed_time = 0
-    start = perf_counter()
-    task_start_time = start
-    for i in range(try_count):
-        sample_wall = TileSet(remain_tile_distribution.sample(remain_draw_count))
-
-        possible_win_set = set()
-
-        for tile, hand in possible_discard.items():
-            total_hand = hand + sample_wall
-            for win_pattern in win_patterns:
-                if win_pattern.match(total_hand):
-                    win_counter.update([tile])
-                    total_win_count += 1
-                    possible_win_set.add(tile)
-                    break
-
-        for tile in possible_win_set:
-            avg_win_counter[tile] += 1 / len(possible_win_set)
+    remain_draw_count = args.draws if args.draws is not None else int(input('Remain times for drawing tiles:'))
+    try_count = args.tries
+    auto = args.auto
+    if try_count is None and not auto:
+        try_count = input('Experiment times (default 1000, "auto" to stop once the best discard is clear):').strip()
+        auto = try_count == "auto"
+        try_count = None if auto else 1000 if try_count == '' else positive(int)(try_count)
+    task_start_time = perf_counter()
+    last_report = [task_start_time]
 
-        for no_win_tile in set(possible_discard.keys()) - possible_win_set:
-            for tile in possible_win_set:
-                condition_win_counter[no_win_tile][tile] += 1 / len(possible_win_set)
+    def report_progress(done, total):
+        if perf_counter() - last_report[0] > 1:
+            last_report[0] = perf_counter()
+            elapsed_time = last_report[0] - task_start_time
+            if total:
+                eta = elapsed_time / done * total - elapsed_time
+                print("Experiments %d/%d with %.1fs, ETA %.1fs" % (done, total, elapsed_time, eta))
+            else:
+                print("Experiments %d with %.1fs" % (done, elapsed_time))
 
-        interval = perf_counter() - start
-        if interval > 1:
-            start = perf_counter()
-            elapsed_time = start - task_start_time
-            done = i + 1
-            eta = elapsed_time / done * try_count - elapsed_time
-            print("Experiments %d/%d with %.1fs, ETA %.1fs" % (done, try_count, elapsed_time, eta))
-    solution_count = len(possible_discard)
-    print("Done in %.1fs!" % (perf_counter() - task_start_time))
-    solution_tiles = list(possible_discard.keys())
+    if auto:
+        result = simulate_until_separated(input_hand, remain_draw_count, confidence=args.confidence,
+                                          time_budget=args.time_budget, max_try_count=try_count, seed=args.seed,
+                                          workers=args.workers, progress=report_progress,
+                                          policy=DISCARD_POLICIES[args.discard_policy])
+        try_count = result.try_count
+        print("Stopped by %s after %d experiments." % (result.stopped_by, try_count))
+    else:
+        result = simulate(input_hand, remain_draw_count, try_count, seed=args.seed, workers=args.workers,
+                          progress=report_progress, policy=DISCARD_POLICIES[args.discard_policy])
+    win_counter = result.win_counter
+    avg_win_counter = result.avg_win_counter
+    condition_win_counter = result.condition_win_counter
+    total_win_count = result.total_win_count
+    solution_tiles = result.discard_tiles
+    solution_count = len(solution_tiles)
+    print("Done in %.1fs with seed %d!" % (perf_counter() - task_start_time, result.seed))
     min_rate = 1 / try_count
     condition_matrix = np.full((solution_count, solution_count), min_rate, dtype=np.double)
     for condition_index, condition_tile in enumerate(solution_tiles):
@@ -100,8 +129,15 @@ def main():
                win_count * 100 / try_count,
                win_count, try_count
                , rough * 100, infinite * 100))
+        if args.by_draw:
+            print("    win by draw: " + ' '.join(
+                "%d:%.1f%%" % (draw, won * 100 / try_count)
+                for draw, won in enumerate(accumulate(result.win_by_draw[tile]), 1)
+            ))
     os.system('pause')
 
 
 if __name__ == '__main__':
+    # frozen binaries start worker processes from this executable.
+    multiprocessing.freeze_support()
     main()
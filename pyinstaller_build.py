@@ -1,6 +1,8 @@
 import os
 import shlex
 
+from mahjong.container.pattern.table import block_tables
+
 resources = [
     os.path.join("mahjong", "templates"),
 ]
@@ -18,6 +20,9 @@ resources_all = ' '.join(
     ) for res in resources
 )
 
+# generate lookup tables into mahjong/templates, so frozen binaries only memory-map them.
+block_tables()
+
 for target in targets:
     command = "pyinstaller {res} -c --onefile {target}".format(res=resources_all, target=target)
     print("executing '{}'".format(command))
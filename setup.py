@@ -9,17 +9,19 @@ setup(
     author="Ledenel",
     author_email="ledenelintelli@gmail.com",
     description="",
-    package_data={"": ["*.png", "*.html"]},
+    package_data={"": ["*.png", "*.html", "*.npy"]},
     install_requires=["numpy", "bitstruct", "requests", "jinja2", "loguru", "pandas"],
     setup_requires=["pytest-runner"],
     # tests_require=test_deps,
     extras_require={
         "dev": ["pipenv-setup",],
-        "test": ["pytest", "pandas", "beautifulsoup4"],
+        "test": ["pytest", "pandas", "beautifulsoup4", "pyarrow"],
+        "parquet": ["pyarrow"],
     },
     entry_points={
         "console_scripts": [
             "tenhou-check = mahjong.tenhou_record_check:main",
+            "tenhou-check-batch = mahjong.tenhou_batch_check:main",
             "mahjong-win-rate = mahjong.win_rate_demo:main",
             "paifu-extract = mahjong.universe_paifu_convert:main",
         ]
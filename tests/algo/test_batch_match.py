@@ -0,0 +1,35 @@
+import random
+
+import numpy as np
+import pytest
+
+from mahjong.container.array_set import SLOT_TILES, tile_counts
+from mahjong.container.pattern.win import NormalTypeWin, UniquePairs, WinPattern
+from mahjong.container.set import TileSet
+from mahjong.container.utils import tile_set_from_string
+from mahjong.tile.definition import Tile
+
+win_hands = [
+    "11123455678999m",
+    "111123456s55567p",
+    "1122m3344p5566s77z",
+    "123m456p789s11122z",
+    "11s555p1123456s67p2z",
+]
+
+
+def random_hands(count, seed=0):
+    rng = random.Random(seed)
+    wall = [tile for tile in SLOT_TILES for _ in range(4)]
+    return [TileSet(rng.sample(wall, rng.choice([13, 14, 17, 20]))) for _ in range(count)]
+
+
+@pytest.mark.parametrize("win", [NormalTypeWin(), NormalTypeWin(melds=3), UniquePairs(),
+                                 UniquePairs(6, {Tile(1, 'm')})],
+                         ids=["normal", "three_melds", "seven_pairs", "used_pairs"])
+def test_batch_match_same_as_match(win):
+    hands = [tile_set_from_string(hand) for hand in win_hands] + random_hands(200)
+    counts = np.array([tile_counts(hand) for hand in hands])
+    expected = [win.match(hand) for hand in hands]
+    assert win.batch_match(counts).tolist() == expected
+    assert WinPattern.batch_match(win, counts).tolist() == expected
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from mahjong.container.array_set import tile_counts
+from mahjong.container.distribution import sample_wall_draws, draw_counts
+from mahjong.container.pattern.win import NormalTypeWin, UniquePairs
+from mahjong.container.simulation import simulate, simulate_until_separated, SHARD_SIZE, z_score, wilson_interval, \
+    is_separated, first_win_draws, batch_match_any, play_draws
+from mahjong.container.utils import tile_set_from_string
+from mahjong.tile.definition import Tile
+from mahjong.win_rate_demo import parse_args
+
+
+def result_counters(result):
+    return result.win_counter, result.avg_win_counter, dict(result.condition_win_counter), result.total_win_count
+
+
+def test_same_result_for_any_workers():
+    hand = tile_set_from_string("123m067p9s1234567z")
+    try_count = SHARD_SIZE + 44
+    single = simulate(hand, 10, try_count, seed=7, workers=1)
+    multiple = simulate(hand, 10, try_count, seed=7, workers=2)
+    assert single.try_count == multiple.try_count == try_count
+    assert result_counters(single) == result_counters(multiple)
+    assert single.total_win_count > 0
+
+
+def test_seed_changes_result():
+    hand = tile_set_from_string("11m123456789p1234z")
+    first = simulate(hand, 12, 100, seed=1)
+    assert result_counters(first) == result_counters(simulate(hand, 12, 100, seed=1))
+    assert result_counters(first) != result_counters(simulate(hand, 12, 100, seed=2))
+
+
+def test_z_score():
+    assert abs(z_score(0.95) - 1.959964) < 1e-5
+    assert abs(z_score(0.99) - 2.575829) < 1e-5
+
+
+def test_wilson_interval():
+    low, high = wilson_interval(np.array([0, 50, 100]), 100, z_score(0.95))
+    assert low[0] == 0 and high[2] == 1
+    assert low[1] < 0.5 < high[1]
+    assert is_separated(np.array([90, 10, 5]), 100, z_score(0.95))
+    assert not is_separated(np.array([52, 48]), 100, z_score(0.95))
+
+
+def test_stop_when_separated():
+    hand = tile_set_from_string("1112345678999m1z")
+    result = simulate_until_separated(hand, 4, time_budget=60, seed=1)
+    assert result.stopped_by == "separated"
+    assert result.win_counter.most_common(1)[0][0] == Tile(1, 'z')
+    limited = simulate_until_separated(tile_set_from_string("123m067p9s1234567z"), 10, max_try_count=300, seed=1)
+    assert limited.stopped_by == "tries" and limited.try_count == 300
+
+
+def test_expired_budget_runs_one_round():
+    result = simulate_until_separated(tile_set_from_string("123m067p9s1234567z"), 10, time_budget=0, seed=1)
+    assert result.stopped_by in ("time", "separated") and result.try_count > 0
+    for argv in (["--time-budget", "0"], ["--tries", "0"], ["--tries", "-5"]):
+        with pytest.raises(SystemExit):
+            parse_args(argv)
+
+
+def test_first_win_draws():
+    win_patterns = [NormalTypeWin(), UniquePairs()]
+    hand = np.array(tile_counts(tile_set_from_string("123m06p9s1234567z")))
+    hands = np.tile(hand, (100, 1))
+    draws = sample_wall_draws(4 - hand, 18, 100, np.random.default_rng(0))
+    first = first_win_draws(hands, draws, win_patterns)
+    for row, first_draw in enumerate(first):
+        matched = [batch_match_any(win_patterns, hands[row:row + 1] + draw_counts(draws[row:row + 1], [k]))[0]
+                   for k in range(19)]
+        assert first_draw == (matched.index(True) if any(matched) else -1)
+    assert (play_draws(hands[:20], draws[:20], win_patterns, None) == first[:20]).all()
+
+
+def test_win_by_draw():
+    result = simulate(tile_set_from_string("123m067p9s1234567z"), 12, 300, seed=5)
+    for tile in result.discard_tiles:
+        assert len(result.win_by_draw[tile]) == 12
+        assert sum(result.win_by_draw[tile]) == result.win_counter[tile]
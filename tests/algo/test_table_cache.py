@@ -0,0 +1,58 @@
+import os
+
+import numpy as np
+
+from mahjong.container.pattern import table_cache
+from mahjong.container.pattern.table_cache import load_table, table_file_name, table_fingerprint
+
+
+def build_counter(calls):
+    def build():
+        calls.append(1)
+        return np.arange(10, dtype=np.uint8).reshape((5, 2))
+
+    return build
+
+
+def test_fingerprint_stable():
+    assert table_fingerprint() == table_fingerprint()
+    assert table_fingerprint() in table_file_name("suit")
+
+
+def test_generate_once_then_mmap(tmp_path):
+    calls = []
+    table = load_table("test", build_counter(calls), [str(tmp_path)])
+    assert isinstance(table, np.memmap)
+    assert os.path.isfile(os.path.join(str(tmp_path), table_file_name("test")))
+    again = load_table("test", build_counter(calls), [str(tmp_path)])
+    assert isinstance(again, np.memmap)
+    assert np.array_equal(table, again)
+    assert len(calls) == 1
+
+
+def test_regenerate_on_version_change(tmp_path, monkeypatch):
+    calls = []
+    load_table("test", build_counter(calls), [str(tmp_path)])
+    old_name = table_file_name("test")
+    monkeypatch.setattr(table_cache, "TABLE_FORMAT_VERSION", table_cache.TABLE_FORMAT_VERSION + 1)
+    assert table_file_name("test") != old_name
+    load_table("test", build_counter(calls), [str(tmp_path)])
+    assert len(calls) == 2
+    assert os.listdir(str(tmp_path)) == [table_file_name("test")]
+
+
+def test_fallback_directory(tmp_path):
+    calls = []
+    blocked = tmp_path / "blocked"
+    blocked.write_text("not a directory")
+    table = load_table("test", build_counter(calls), [str(blocked), str(tmp_path / "cache")])
+    assert isinstance(table, np.memmap)
+    assert os.listdir(str(tmp_path / "cache")) == [table_file_name("test")]
+
+
+def test_memory_only(tmp_path):
+    blocked = tmp_path / "blocked"
+    blocked.write_text("not a directory")
+    table = load_table("test", build_counter([]), [str(blocked)])
+    assert not isinstance(table, np.memmap)
+    assert table.shape == (5, 2)
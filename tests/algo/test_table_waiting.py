@@ -0,0 +1,89 @@
+import random
+
+import numpy as np
+import pytest
+
+from mahjong.container.array_set import ArrayTileSet, SLOT_TILES, tile_slot, slot_tile
+from mahjong.container.pattern.reasoning import HeuristicPatternMatchWaiting
+from mahjong.container.pattern.table import TableWaiting, suit_table, honor_table, IncrementalHand, \
+    min_step_discard
+from mahjong.container.pattern.win import NormalTypeWin, UniquePairs
+from mahjong.container.set import TileSet
+from mahjong.container.utils import tile_set_from_string
+from mahjong.tile.definition import Tile
+from tests.algo.test_heuristic_pattern_waiting import hands, shantens, seven_pair_shantens, usefuls, \
+    record_converted
+
+
+def test_table_shape():
+    assert suit_table().shape == (5 ** 9, 5, 2)
+    assert honor_table().shape == (5 ** 7, 5, 2)
+    assert suit_table()[0].max() == 0
+
+
+@pytest.mark.parametrize("hand,shanten", zip(hands, shantens))
+def test_table_waiting_step(hand, shanten):
+    assert TableWaiting(NormalTypeWin()).before_waiting_step(tile_set_from_string(hand)) == shanten
+
+
+@pytest.mark.parametrize("hand,shanten", zip(hands, seven_pair_shantens))
+def test_table_seven_pair_waiting_step(hand, shanten):
+    assert TableWaiting(UniquePairs()).before_waiting_step(tile_set_from_string(hand)) == shanten
+
+
+@pytest.mark.parametrize("hand,useful", zip(hands, usefuls))
+def test_table_useful_tiles(hand, useful):
+    assert TileSet(TableWaiting(NormalTypeWin()).useful_tiles(tile_set_from_string(hand))) \
+           == tile_set_from_string(useful)
+
+
+@pytest.mark.parametrize("hand", hands)
+@pytest.mark.parametrize("win", [NormalTypeWin(), NormalTypeWin(melds=2), UniquePairs()],
+                         ids=["normal", "two_melds", "seven_pairs"])
+def test_same_as_heuristic(hand, win):
+    tile_set = tile_set_from_string(hand)
+    expected = {tile: (step, useful) for tile, step, useful in
+                HeuristicPatternMatchWaiting(win).batch_waiting_and_useful_tiles(tile_set)}
+    for hand_set in [tile_set, ArrayTileSet(tile_set)]:
+        assert {tile: (step, useful) for tile, step, useful in
+                TableWaiting(win).batch_waiting_and_useful_tiles(hand_set)} == expected
+
+
+@pytest.mark.parametrize("hand_rec", record_converted, ids=lambda t: str(t[0]))
+def test_table_batch_convert(hand_rec):
+    hand, record_map = hand_rec
+    for tile, step, useful in TableWaiting(NormalTypeWin()).batch_waiting_and_useful_tiles(hand):
+        assert record_map[tile] == TileSet(useful)
+
+
+def test_incremental_hand():
+    rng = random.Random(2)
+    wall = [tile for tile in SLOT_TILES for _ in range(4)]
+    win_patterns = [NormalTypeWin(), UniquePairs()]
+    for _ in range(10):
+        rng.shuffle(wall)
+        hand = ArrayTileSet(wall[:13])
+        incremental = IncrementalHand(hand, win_patterns)
+        for tile in wall[13:25]:
+            incremental.draw(tile_slot(tile))
+            hand.update([tile])
+            candidates = np.flatnonzero(incremental.counts).tolist()
+            expected = []
+            for slot in candidates:
+                hand.subtract([slot_tile(slot)])
+                expected.append(min(TableWaiting(win).before_waiting_step(hand) for win in win_patterns))
+                hand.update([slot_tile(slot)])
+            assert incremental.discard_steps(candidates).tolist() == expected
+            discard = min_step_discard(incremental, tile_slot(tile))
+            assert expected[candidates.index(discard)] == min(expected)
+            incremental.discard(discard)
+            hand.subtract([slot_tile(discard)])
+            assert incremental.step() == min(TableWaiting(win).before_waiting_step(hand) for win in win_patterns)
+
+
+def test_incremental_play():
+    hand = IncrementalHand(tile_set_from_string("1112345678999m"), [NormalTypeWin()])
+    assert hand.step() == 0
+    draws = [tile_slot(tile) for tile in [Tile(1, 'z'), Tile(2, 'z'), Tile(5, 'm')]]
+    assert hand.play(draws, min_step_discard) == 3
+    assert hand.is_win()
@@ -0,0 +1,61 @@
+import pytest
+
+from mahjong.container.pattern.cache import LRUCache, CachedWaiting, hand_key
+from mahjong.container.pattern.reasoning import HeuristicPatternMatchWaiting
+from mahjong.container.pattern.table import TableWaiting
+from mahjong.container.pattern.win import NormalTypeWin, UniquePairs
+from mahjong.container.utils import tile_set_from_string
+from mahjong.tile.definition import AkaTile
+from tests.algo.test_heuristic_pattern_waiting import hands
+
+
+def test_lru_eviction():
+    cache = LRUCache(2)
+    cache.put(1, "a")
+    cache.put(2, "b")
+    assert cache.get(1) == "a"
+    cache.put(3, "c")
+    assert 2 not in cache and 1 in cache and 3 in cache
+    assert cache.get(2) is None
+    assert cache.info() == (1, 1, 2, 2)
+
+
+def test_hand_key():
+    assert hand_key(tile_set_from_string("123m")) != hand_key(tile_set_from_string("123p"))
+    assert hand_key(tile_set_from_string("406m")) == hand_key(tile_set_from_string("456m"))
+    assert hand_key(tile_set_from_string("1112m")) != hand_key(tile_set_from_string("1122m"))
+
+
+def test_pattern_key():
+    assert NormalTypeWin(melds=3).pattern_key() == NormalTypeWin(melds=3).pattern_key()
+    assert NormalTypeWin(melds=3).pattern_key() != NormalTypeWin().pattern_key()
+    assert UniquePairs().pattern_key() != UniquePairs(used={AkaTile(0, 'm')}).pattern_key()
+
+
+def batch_dict(waiting, hand):
+    return {tile: (step, useful) for tile, step, useful in waiting.batch_waiting_and_useful_tiles(hand)}
+
+
+@pytest.mark.parametrize("hand", hands)
+@pytest.mark.parametrize("win", [NormalTypeWin(), UniquePairs()], ids=["normal", "seven_pairs"])
+def test_cached_same_as_uncached(hand, win):
+    tile_set = tile_set_from_string(hand)
+    cache = LRUCache()
+    waiting = HeuristicPatternMatchWaiting(win)
+    expected = waiting.waiting_and_useful_tiles(tile_set)
+    expected_batch = batch_dict(waiting, tile_set)
+    for _ in range(2):
+        cached = CachedWaiting(TableWaiting(win), cache)
+        assert cached.waiting_and_useful_tiles(tile_set) == expected
+        assert batch_dict(cached, tile_set) == expected_batch
+    assert cache.hits == 2 and cache.misses == 2
+
+
+def test_cached_batch_keeps_aka():
+    cache = LRUCache()
+    waiting = CachedWaiting(TableWaiting(NormalTypeWin()), cache)
+    list(waiting.batch_waiting_and_useful_tiles(tile_set_from_string("123m456p5789s1123z")))
+    discards = [tile for tile, _, _ in
+                waiting.batch_waiting_and_useful_tiles(tile_set_from_string("123m456p0789s1123z"))]
+    assert cache.hits == 1
+    assert any(isinstance(tile, AkaTile) for tile in discards)
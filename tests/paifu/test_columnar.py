@@ -0,0 +1,58 @@
+import glob
+import os
+
+import numpy as np
+import pytest
+
+from mahjong.record.columnar import write_columnar, read_columnar, EVENT_DTYPE
+from mahjong.record.reader import from_file
+from mahjong.record.utils.event import EventKind
+
+RECORD_FILES = sorted(glob.glob(os.path.join("tests", "*.xml")))
+
+
+def event_summary(events):
+    return [(event.tag, list(event.attrib.items()), event.timestamp) for event in events]
+
+
+@pytest.mark.parametrize("file_name", RECORD_FILES)
+def test_round_trip(file_name, tmp_path):
+    record = from_file(file_name)
+    path = str(tmp_path / "record.awr")
+    write_columnar(record, path)
+    with read_columnar(path) as columnar:
+        assert len(columnar) == len(record.game_list)
+        assert columnar.game_type == record.game_type
+        assert [str(player) for player in columnar.players] == [str(player) for player in record.players]
+        for game, expected in zip(columnar.games(), record.game_list):
+            assert str(game) == str(expected)
+            assert event_summary(game.events) == event_summary(expected.events)
+        restored = columnar.to_record()
+        assert str(restored) == str(record)
+        assert event_summary(restored.events) == event_summary(record.events)
+
+
+def test_columns(tmp_path):
+    record = from_file(RECORD_FILES[0])
+    path = str(tmp_path / "record.awr")
+    write_columnar(record, path)
+    with read_columnar(path) as columnar:
+        assert columnar.events.dtype == EVENT_DTYPE
+        assert not columnar.events.flags.writeable
+        draws = columnar.kinds == EventKind.DRAW
+        assert np.count_nonzero(draws) == sum(1 for event in record.events if event.tag[0] in "TUVW"
+                                              and event.tag[1:].isdigit())
+        first_draw = int(np.flatnonzero(draws)[0])
+        assert record.events[first_draw].tag == "%s%d" % ("TUVW"[columnar.actors[first_draw]],
+                                                          columnar.tiles[first_draw])
+        assert columnar.tile_slots()[first_draw] == columnar.tiles[first_draw] // 4
+        assert (columnar.tile_slots()[~draws & (columnar.tiles < 0)] == -1).all()
+        assert (columnar.melds[columnar.kinds != EventKind.MELD] == 0).all()
+        assert (columnar.melds[columnar.kinds == EventKind.MELD] > 0).all()
+
+
+def test_not_columnar(tmp_path):
+    path = tmp_path / "record.awr"
+    path.write_bytes(b"<mjloggm/>" * 4)
+    with pytest.raises(ValueError):
+        read_columnar(str(path))
@@ -0,0 +1,65 @@
+import glob
+import os
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from mahjong.record.reader import from_file
+from mahjong.record.state import InvisibleTiles
+from mahjong.record.utils.constant import DRAW_GROUPED_REGEX, DISCARD_GROUPED_REGEX
+from mahjong.record.utils.event import EventKind, TenhouEvent, classify_tag, event_kind, draw_value, \
+    discard_value, draw_tile_change, is_game_init, is_open_hand
+from mahjong.record.utils.value.tile import tile_from_tenhou
+
+RECORD_FILES = sorted(glob.glob(os.path.join("tests", "*.xml")))
+
+
+@pytest.mark.parametrize("file_name", RECORD_FILES)
+def test_classified_same_as_regex(file_name):
+    record = from_file(file_name)
+    for event in record.events:
+        draw = DRAW_GROUPED_REGEX.match(event.tag)
+        discard = DISCARD_GROUPED_REGEX.match(event.tag)
+        element = event.to_element()
+        assert event.kind_ == event_kind(element)
+        if draw:
+            assert event.kind_ == EventKind.DRAW
+            assert draw_value(event) == draw_value(element) == int(draw.group(2))
+            assert event.see_tiles_ == [tile_from_tenhou(int(draw.group(2)))]
+        elif discard:
+            assert event.kind_ == EventKind.DISCARD
+            assert discard_value(event) == discard_value(element) == int(discard.group(2))
+            assert event.show_tiles_ == [tile_from_tenhou(int(discard.group(2)))]
+        else:
+            assert event.player_index_ is None and draw_value(event) is None and discard_value(event) is None
+        for player in record.players:
+            assert player.is_draw(event) == bool(draw and "TUVW".index(draw.group(1)) == player.index)
+            assert player.is_discard(event) == bool(discard and "DEFG".index(discard.group(1)) == player.index)
+        assert is_game_init(event) == (event.tag == "INIT")
+        assert is_open_hand(event) == (event.tag == "N")
+
+
+def test_classify_tag():
+    assert classify_tag("W135") == (EventKind.DRAW, 3, 135)
+    assert classify_tag("D0") == (EventKind.DISCARD, 0, 0)
+    assert classify_tag("DORA") == (EventKind.DORA, None, None)
+    assert classify_tag("UN") == (EventKind.OTHER, None, None)
+    assert draw_tile_change(ET.Element("U16")) == {'tile': tile_from_tenhou(16), 'player': 1}
+
+
+def test_discard_of_first_tile_index():
+    event = TenhouEvent(ET.Element("D0"), context=None)
+    assert 0 not in InvisibleTiles(4).scan(event).value
+
+
+def test_event_keeps_no_element():
+    element = ET.Element("N", {"who": "1", "m": "31520"})
+    event = TenhouEvent(element, context=None, timestamp=3)
+    assert not hasattr(event, "__dict__")
+    assert event.tag == "N" and event.attrib == {"who": "1", "m": "31520"} and event.get("who") == "1"
+    rebuilt = event.to_element()
+    assert rebuilt is not element
+    assert ET.tostring(rebuilt) == ET.tostring(element)
+    with pytest.raises(AttributeError):
+        event.text
+    assert TenhouEvent(ET.Element("T12"), context=None).attrib == {}
@@ -0,0 +1,98 @@
+import os
+import threading
+from collections import Counter
+from http.server import HTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+from mahjong.record.fetcher import RecordFetcher, to_log_id
+from mahjong.record.reader import from_file
+
+LOG_ID = "2009060321gm-00b9-0000-75b25bcf"
+OTHER_LOG_ID = "2018011723gm-00e1-0000-d28ec3fd"
+FIXTURE_DIR = os.path.abspath("tests")
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    # log id -> number of requests to answer with 503 before serving it.
+    failures = Counter()
+    requests = Counter()
+
+    def do_GET(self):
+        log_id = self.path.lstrip("/?")
+        self.requests[log_id] += 1
+        path = os.path.join(FIXTURE_DIR, log_id + ".xml")
+        if self.failures[log_id] > 0:
+            self.failures[log_id] -= 1
+            self.send_response(503)
+            self.end_headers()
+            return
+        if not os.path.isfile(path):
+            self.send_response(404)
+            self.end_headers()
+            return
+        with open(path, "rb") as file:
+            content = file.read()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    FixtureHandler.failures.clear()
+    FixtureHandler.requests.clear()
+    httpd = HTTPServer(("127.0.0.1", 0), FixtureHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield "http://127.0.0.1:%d/?{0}" % httpd.server_port
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def make_fetcher(server, tmp_path, **kwargs):
+    return RecordFetcher(str(tmp_path / "cache"), url_template=server, timeout=5, backoff=0, **kwargs)
+
+
+def test_to_log_id():
+    assert to_log_id("http://tenhou.net/0/?log=%s&tw=1" % LOG_ID) == LOG_ID
+    assert to_log_id(LOG_ID) == LOG_ID
+    with pytest.raises(ValueError):
+        to_log_id("../secret")
+
+
+def test_fetch_record_cached(server, tmp_path):
+    with make_fetcher(server, tmp_path) as fetcher:
+        record = fetcher.fetch_record("http://tenhou.net/0/?log=%s" % LOG_ID)
+        again = fetcher.fetch_record(LOG_ID)
+    expected = from_file(os.path.join(FIXTURE_DIR, LOG_ID + ".xml"))
+    assert str(record) == str(again) == str(expected)
+    assert FixtureHandler.requests[LOG_ID] == 1
+    assert fetcher.downloads == 1
+    assert os.path.isfile(fetcher.cache_path(LOG_ID))
+
+
+def test_fetch_retry(server, tmp_path):
+    FixtureHandler.failures[LOG_ID] = 2
+    with make_fetcher(server, tmp_path, retries=3) as fetcher:
+        fetcher.fetch_path(LOG_ID)
+    assert FixtureHandler.requests[LOG_ID] == 3
+
+    FixtureHandler.failures[OTHER_LOG_ID] = 5
+    with make_fetcher(server, tmp_path, retries=1) as fetcher:
+        with pytest.raises(Exception):
+            fetcher.fetch_path(OTHER_LOG_ID)
+        assert not os.path.exists(fetcher.cache_path(OTHER_LOG_ID))
+
+
+def test_fetch_many(server, tmp_path):
+    with make_fetcher(server, tmp_path, max_workers=2) as fetcher:
+        results = dict(fetcher.fetch_many([LOG_ID, OTHER_LOG_ID, "missing-log"]))
+    assert results[LOG_ID] == fetcher.cache_path(LOG_ID)
+    assert results[OTHER_LOG_ID] == fetcher.cache_path(OTHER_LOG_ID)
+    assert isinstance(results["missing-log"], Exception)
+    assert fetcher.downloads == 2
@@ -0,0 +1,55 @@
+import glob
+import os
+
+import pytest
+
+from mahjong.record.reader import from_file
+from mahjong.record.state import GameTracker, PlayerHand, PlayerMeld, DiscardTiles, DoraIndicators, InvisibleTiles
+from mahjong.record.utils.event import is_richii
+
+RECORD_FILES = sorted(glob.glob(os.path.join("tests", "*.xml")))
+
+
+@pytest.mark.parametrize("file_name", RECORD_FILES)
+def test_same_as_game_states(file_name):
+    record = from_file(file_name)
+    player_count = len(record.players)
+    for game in record.game_list:
+        tracker = GameTracker(player_count)
+        hands = [PlayerHand(player) for player in record.players]
+        melds = [PlayerMeld(player) for player in record.players]
+        discards = [DiscardTiles(player) for player in record.players]
+        dora_indicators = DoraIndicators()
+        invisible = InvisibleTiles(player_count)
+        somebody_richii = False
+        for event in game.events:
+            tracker.apply(event)
+            hands = [state.scan(event) for state in hands]
+            melds = [state.scan(event) for state in melds]
+            discards = [state.scan(event) for state in discards]
+            dora_indicators = dora_indicators.scan(event)
+            invisible = invisible.scan(event)
+            somebody_richii = somebody_richii or is_richii(event)
+            assert tracker.invisible() == invisible.value
+            assert tracker.dora_indicators == dora_indicators.value
+            assert tracker.somebody_richii == somebody_richii
+            for index in range(player_count):
+                assert tracker.hand(index) == hands[index].value
+                assert [str(meld) for meld in tracker.melds(index)] == [str(meld) for meld in melds[index].value]
+                assert tracker.discards(index) == discards[index].value
+                assert tracker.invisible(index) == invisible.value - hands[index].value
+
+
+def test_snapshot_is_a_copy():
+    record = from_file(RECORD_FILES[0])
+    game = record.game_list[0]
+    tracker = GameTracker(len(record.players))
+    tracker.apply(game.events[0])
+    snapshot = tracker.snapshot(0)
+    tracker.apply_all(game.events[1:])
+    assert len(snapshot.hand) == 13
+    assert snapshot.discards == [] and snapshot.melds == []
+    assert snapshot.invisible != tracker.invisible(0)
+    snapshot.hand.clear()
+    snapshot.invisible.clear()
+    assert tracker.hand(0) and tracker.invisible(0) and tracker.invisible()
@@ -0,0 +1,56 @@
+import glob
+import os
+
+import numpy as np
+import pytest
+
+from mahjong.record.reader import from_file
+from mahjong.record.utils.bit import bit_fields_from_desc, unpack_int_with, unpack_with, bit_struct_from_desc
+from mahjong.record.utils.value.meld import decode_meld, decode_meld_array, record_meld_array, meld_from, \
+    meld_type, FlushData, flush_desc, TripletData, triplet_desc, KanData, kan_desc, AddedKanData, added_kan_desc, \
+    KitaData, kita_desc
+
+RECORD_FILES = sorted(glob.glob(os.path.join("tests", "*.xml")))
+
+
+def decodable_melds(codes):
+    for code in codes:
+        try:
+            meld = decode_meld(code % 4, code)
+            yield code, meld, meld.self_tiles, meld.borrowed_tiles
+        except (AssertionError, IndexError, ValueError):
+            pass
+
+
+@pytest.mark.parametrize("data_class,desc", [(FlushData, flush_desc), (TripletData, triplet_desc),
+                                             (KanData, kan_desc), (AddedKanData, added_kan_desc),
+                                             (KitaData, kita_desc)])
+def test_int_unpack_same_as_bitstruct(data_class, desc):
+    packer = bit_struct_from_desc(desc)
+    fields = bit_fields_from_desc(desc)
+    for value in range(0, 1 << 16, 13):
+        assert unpack_int_with(data_class, fields, value) == unpack_with(data_class, packer, value)
+
+
+def test_array_same_as_classes():
+    melds = list(decodable_melds(range(0, 1 << 16, 7)))
+    codes = np.array([code for code, *_ in melds])
+    decoded = decode_meld_array(codes % 4, codes)
+    for i, (code, meld, self_tiles, borrowed_tiles) in enumerate(melds):
+        assert decoded.kind[i] == meld_type(code).value
+        assert decoded.from_who[i] == meld.from_who
+        assert sorted(x for x in decoded.self_tiles[i].tolist() if x >= 0) == sorted(self_tiles)
+        assert ([decoded.borrowed_tile[i]] if decoded.borrowed_tile[i] >= 0 else []) == list(borrowed_tiles)
+
+
+@pytest.mark.parametrize("file_name", RECORD_FILES)
+def test_record_melds(file_name):
+    record = from_file(file_name)
+    positions, decoded = record_meld_array(record.events)
+    assert [record.events[i].tag for i in positions] == ["N"] * len(positions)
+    for position, self_tiles in zip(positions, decoded.self_tiles):
+        event = record.events[position]
+        meld = meld_from(event)
+        assert meld is event.meld_ is meld_from(event)
+        assert sorted(x for x in self_tiles.tolist() if x >= 0) == sorted(meld.self_tiles)
+    assert all(event.meld_ is None for event in record.events if event.tag != "N")
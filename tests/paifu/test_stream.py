@@ -0,0 +1,58 @@
+import glob
+import gzip
+import os
+import shutil
+import zipfile
+
+import pytest
+
+from mahjong.record.reader import from_file
+from mahjong.record.stream import stream_games, stream_archive_games, iter_record_files, TenhouRecordHeader
+
+RECORD_FILES = sorted(glob.glob(os.path.join("tests", "*.xml")))
+
+
+def event_summary(game):
+    return [(event.tag, event.attrib, event.timestamp) for event in game.events]
+
+
+@pytest.mark.parametrize("file_name", RECORD_FILES)
+def test_stream_games_same_as_from_file(file_name):
+    record = from_file(file_name)
+    games = list(stream_games(file_name, file_name))
+    assert len(games) == len(record.game_list)
+    for streamed, game in zip(games, record.game_list):
+        assert str(streamed) == str(game)
+        assert event_summary(streamed) == event_summary(game)
+        assert [str(player) for player in streamed.players] == [str(player) for player in record.players]
+        assert isinstance(streamed.context_, TenhouRecordHeader)
+        assert streamed.context_.name == file_name
+
+
+def test_stream_gzip_and_zip(tmp_path):
+    file_name = RECORD_FILES[0]
+    base_name = os.path.basename(file_name)
+    expected = [str(game) for game in from_file(file_name).game_list]
+
+    gzip_path = str(tmp_path / (base_name + ".gz"))
+    with open(file_name, "rb") as source, gzip.open(gzip_path, "wb") as target:
+        shutil.copyfileobj(source, target)
+    assert [str(game) for game in stream_archive_games(gzip_path)] == expected
+
+    zip_path = str(tmp_path / "logs.zip")
+    with zipfile.ZipFile(zip_path, "w") as archive:
+        archive.write(file_name, base_name)
+        archive.write(gzip_path, "nested/" + base_name + ".gz")
+        archive.writestr("readme.txt", "not a record")
+    names = [name for name, _ in iter_record_files(zip_path)]
+    assert names == [zip_path + "/" + base_name, zip_path + "/nested/" + base_name + ".gz"]
+    assert [str(game) for game in stream_archive_games(zip_path)] == expected * 2
+
+
+def test_stream_directory(tmp_path):
+    for file_name in RECORD_FILES:
+        shutil.copy(file_name, str(tmp_path))
+    (tmp_path / "notes.txt").write_text("skipped")
+    games = list(stream_archive_games(str(tmp_path)))
+    assert len(games) == sum(len(from_file(file_name).game_list) for file_name in RECORD_FILES)
+    assert [os.path.basename(game.context_.name) for game in games][0] == os.path.basename(RECORD_FILES[0])
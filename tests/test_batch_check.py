@@ -0,0 +1,80 @@
+import csv
+import json
+import os
+import shutil
+
+import pytest
+
+from mahjong.tenhou_batch_check import batch_check, write_summary, record_paths, main, check_record, check_player
+
+RECORD = os.path.join("tests", "2009060321gm-00b9-0000-75b25bcf.xml")
+
+
+def summary_rows(results):
+    return sorted((result.log_id, result.player_index, result.discards, result.mistakes, result.error)
+                  for result in results)
+
+
+def test_batch_check_workers(tmp_path):
+    serial = list(batch_check([RECORD], str(tmp_path / "serial")))
+    parallel = list(batch_check([RECORD], str(tmp_path / "parallel"), workers=2))
+    assert len(serial) == 3
+    assert all(result.error is None for result in serial)
+    assert summary_rows(serial) == summary_rows(parallel)
+    for result in parallel:
+        assert os.path.isfile(result.report)
+
+
+def test_check_record_same_as_each_player(tmp_path):
+    os.makedirs(str(tmp_path / "together"))
+    os.makedirs(str(tmp_path / "each"))
+    together = check_record(RECORD, [0, 1, 2], str(tmp_path / "together"))
+    each = [check_player(RECORD, index, str(tmp_path / "each")) for index in range(3)]
+    assert summary_rows(together) == summary_rows(each)
+    for together_result, each_result in zip(together, each):
+        with open(together_result.report, encoding='utf-8') as together_file, \
+                open(each_result.report, encoding='utf-8') as each_file:
+            assert together_file.read() == each_file.read()
+
+
+def test_batch_check_errors_and_summary(tmp_path):
+    records = tmp_path / "records"
+    records.mkdir()
+    shutil.copy(RECORD, str(records))
+    (records / "broken.xml").write_text("<mjloggm>")
+    assert [os.path.basename(path) for path in record_paths([str(records)])] == \
+           ["2009060321gm-00b9-0000-75b25bcf.xml", "broken.xml"]
+
+    results = list(batch_check([str(records)], str(tmp_path), player_indexes=[1]))
+    assert [(result.log_id, result.error is None) for result in results] == \
+           [("2009060321gm-00b9-0000-75b25bcf", True), ("broken", False)]
+
+    json_path, csv_path = write_summary(results, str(tmp_path))
+    with open(json_path, encoding='utf-8') as json_file:
+        rows = json.load(json_file)
+    with open(csv_path, encoding='utf-8') as csv_file:
+        csv_rows = list(csv.DictReader(csv_file))
+    assert [row["log_id"] for row in rows] == [row["log_id"] for row in csv_rows]
+    assert rows[0]["player_index"] == 1 and rows[0]["discards"] > 0
+
+
+def test_main(tmp_path):
+    assert main([RECORD, "-o", str(tmp_path), "-p", "1", "-j", "1"]) == 0
+    assert os.path.isfile(str(tmp_path / "summary.csv"))
+
+
+def test_batch_check_broken_record_in_worker(tmp_path):
+    broken = tmp_path / "broken.xml"
+    broken.write_text("<mjloggm>")
+    results = list(batch_check([str(broken), RECORD], str(tmp_path), workers=2))
+    assert sorted((result.log_id, result.player_index, result.error is None) for result in results) == [
+        ("2009060321gm-00b9-0000-75b25bcf", 0, True), ("2009060321gm-00b9-0000-75b25bcf", 1, True),
+        ("2009060321gm-00b9-0000-75b25bcf", 2, True), ("broken", -1, False)]
+
+
+def test_player_numbers(tmp_path):
+    for number in ["0", "5"]:
+        with pytest.raises(SystemExit):
+            main([RECORD, "-o", str(tmp_path), "-p", number])
+    results = list(batch_check([RECORD], str(tmp_path), player_indexes=[3, 0, -1]))
+    assert [result.player_index for result in results] == [0]
@@ -0,0 +1,38 @@
+import pytest
+
+from mahjong.container.pattern.reasoning import HeuristicPatternMatchWaiting
+from mahjong.container.pattern.win import NormalTypeWin, UniquePairs
+from mahjong.container.set import TileSet
+from mahjong.container.utils import tile_set_from_string
+from mahjong.tenhou_record_check import merged_reasoning
+from mahjong.record.utils.value.tile import tile_to_tenhou_indexes
+
+ALL_INVISIBLE = set(range(136))
+
+HAND = "1122m3457p469s1255z"
+
+
+def merged_rows(hand, invisible):
+    return [(str(item.discard_tile), item.waiting_step, item.useful_tiles_count)
+            for item in merged_reasoning(hand, invisible, [NormalTypeWin(), UniquePairs()])]
+
+
+def test_merged_rows_pinned():
+    rows = merged_rows(tile_set_from_string(HAND), ALL_INVISIBLE)
+    assert rows[:5] == [("7p", 2, 20), ("9s", 2, 20), ("1z", 2, 20), ("2z", 2, 20), ("6s", 3, 88)]
+    assert ("4p", 3, 60) in rows and ("1m", 3, 68) in rows
+    assert len(rows) == len(set(tile_set_from_string(HAND).tiles()))
+
+
+@pytest.mark.parametrize("hand_str", [HAND, "123m067p9s1234567z", "11223344m55p66s7z"])
+def test_merged_rows_same_as_every_win_type(hand_str):
+    hand = tile_set_from_string(hand_str)
+    invisible = ALL_INVISIBLE - {14, 15, 50}
+    expected = {}
+    for tile in set(hand.tiles()):
+        results = [HeuristicPatternMatchWaiting(win).waiting_and_useful_tiles(hand - TileSet([tile]))
+                   for win in [NormalTypeWin(), UniquePairs()]]
+        step = min(step for step, _ in results)
+        useful = set().union(*(useful for result_step, useful in results if result_step == step))
+        expected[str(tile)] = step, sum(len(tile_to_tenhou_indexes(x) & invisible) for x in useful)
+    assert {discard: (step, count) for discard, step, count in merged_rows(hand, invisible)} == expected
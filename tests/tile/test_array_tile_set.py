@@ -0,0 +1,63 @@
+import pytest
+
+from mahjong.container.array_set import ArrayTileSet, tile_slot, slot_tile, TILE_SLOTS
+from mahjong.container.pattern.reasoning import HeuristicPatternMatchWaiting
+from mahjong.container.pattern.win import NormalTypeWin, UniquePairs
+from mahjong.container.set import TileSet
+from mahjong.container.utils import tile_set_from_string
+from mahjong.tile.definition import Tile, AkaTile
+
+hands = [
+    "11266677788992m",
+    "4677m2357p668s6z6s",
+    "4677m2307p668s6z6s",
+    "1110555s406m111z",
+]
+
+
+def test_slot_order():
+    tiles = [slot_tile(i) for i in range(TILE_SLOTS)]
+    assert tiles == sorted(tiles)
+    assert all(tile_slot(tile) == i for i, tile in enumerate(tiles))
+    assert tile_slot(AkaTile(0, 'p')) == tile_slot(Tile(5, 'p'))
+
+
+@pytest.mark.parametrize("hand", hands)
+def test_same_as_tile_set(hand):
+    tile_set = tile_set_from_string(hand)
+    array_set = ArrayTileSet(tile_set)
+    assert str(array_set) == str(tile_set)
+    assert len(array_set) == len(tile_set)
+    assert array_set == tile_set
+    assert list(array_set.tiles()) == list(tile_set.tiles())
+    assert array_set.to_tile_set() == tile_set
+
+
+def test_operators():
+    hand = ArrayTileSet(tile_set_from_string("11123m406p"))
+    assert str(hand + tile_set_from_string("5p7z")) == "11123m4056p7z"
+    assert str(hand - tile_set_from_string("1m5p")) == "1123m46p"
+    assert hand.contains(tile_set_from_string("11m"))
+    assert not hand.contains(tile_set_from_string("1111m"))
+    assert hand.exclude(tile_set_from_string("44p")) is None
+    assert str(hand.exclude(ArrayTileSet(tile_set_from_string("123m")))) == "11m406p"
+    borrowed = hand.copy()
+    borrowed.subtract(tile_set_from_string("789m"))
+    assert str(-borrowed) == "789m"
+    assert str(+borrowed) == "11123m406p"
+
+
+@pytest.mark.parametrize("hand", hands)
+@pytest.mark.parametrize("win", [NormalTypeWin(), UniquePairs()], ids=["normal", "seven_pairs"])
+def test_heuristic_waiting_on_array_set(hand, win):
+    tile_set = tile_set_from_string(hand)
+    array_set = ArrayTileSet(tile_set)
+    assert HeuristicPatternMatchWaiting(win).waiting_and_useful_tiles(array_set) == \
+           HeuristicPatternMatchWaiting(win).waiting_and_useful_tiles(tile_set)
+
+
+def test_win_selections_on_array_set():
+    hand = ArrayTileSet(tile_set_from_string("111123456s55567p8p"))
+    assert NormalTypeWin().match(hand)
+    assert sum(1 for _ in NormalTypeWin().unique_win_selections(hand)) == 3
+    assert isinstance(TileSet(hand), TileSet) and TileSet(hand) == hand
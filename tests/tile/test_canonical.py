@@ -0,0 +1,60 @@
+import pytest
+
+from mahjong.container.array_set import SLOT_TILES
+from mahjong.container.canonical import canonicalize, SuitTransform
+from mahjong.container.pattern.cache import LRUCache, CachedWaiting
+from mahjong.container.pattern.reasoning import HeuristicPatternMatchWaiting
+from mahjong.container.pattern.win import NormalTypeWin, UniquePairs
+from mahjong.container.utils import tile_set_from_string
+from mahjong.tile.definition import Tile, AkaTile
+from tests.algo.test_heuristic_pattern_waiting import hands
+
+isomorphic_hands = [
+    ("123m456p789s1122z", "123p456m789s1122z"),
+    ("123m4567p89s1122z", "789s3456m12p1122z"),
+    ("11266677788992m", "11223334448899s"),
+    ("4677m2357p668s6z6s", "4677s2357m668p6z6p"),
+]
+
+
+@pytest.mark.parametrize("hand,other", isomorphic_hands)
+def test_same_normal_form(hand, other):
+    assert canonicalize(tile_set_from_string(hand))[0] == canonicalize(tile_set_from_string(other))[0]
+
+
+def test_no_reflect():
+    assert canonicalize(tile_set_from_string("123m"), reflect=False)[0] != \
+           canonicalize(tile_set_from_string("789m"), reflect=False)[0]
+
+
+def test_transform_round_trip():
+    transform = SuitTransform((2, 0, 1), (True, False, True))
+    assert all(transform.inverse(transform.apply(tile)) == tile for tile in SLOT_TILES)
+    assert transform.apply(Tile(1, 's')) == Tile(9, 'm')
+    assert transform.apply(Tile(3, 'z')) == Tile(3, 'z')
+    assert isinstance(transform.apply(AkaTile(0, 'm')), AkaTile)
+    assert transform.apply(AkaTile(0, 'm')).color == 'p'
+    assert SuitTransform().is_identity() and not transform.is_identity()
+
+
+@pytest.mark.parametrize("hand", hands)
+@pytest.mark.parametrize("win", [NormalTypeWin(), UniquePairs(), UniquePairs(6, {Tile(9, 'm'), Tile(1, 'z')})],
+                         ids=["normal", "seven_pairs", "used_pairs"])
+def test_canonical_cache_same_as_heuristic(hand, win):
+    tile_set = tile_set_from_string(hand)
+    waiting = HeuristicPatternMatchWaiting(win)
+    cached = CachedWaiting(waiting, LRUCache())
+    assert cached.waiting_and_useful_tiles(tile_set) == waiting.waiting_and_useful_tiles(tile_set)
+    assert {tile: (step, useful) for tile, step, useful in cached.batch_waiting_and_useful_tiles(tile_set)} == \
+           {tile: (step, useful) for tile, step, useful in waiting.batch_waiting_and_useful_tiles(tile_set)}
+
+
+@pytest.mark.parametrize("hand,other", isomorphic_hands)
+def test_isomorphic_hit(hand, other):
+    cache = LRUCache()
+    waiting = HeuristicPatternMatchWaiting(NormalTypeWin())
+    for item in [hand, other]:
+        tile_set = tile_set_from_string(item)
+        assert CachedWaiting(waiting, cache).waiting_and_useful_tiles(tile_set) == \
+               waiting.waiting_and_useful_tiles(tile_set)
+    assert cache.info()[:2] == (1, 1)
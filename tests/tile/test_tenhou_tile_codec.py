@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from mahjong.record.state import InvisibleTiles
+from mahjong.record.utils.constant import TENHOU_TILE_CATEGORY, SUIT_ORDER
+from mahjong.record.utils.value.tile import tile_from_tenhou, tiles_from_tenhou, tile_to_tenhou_range, \
+    tile_to_tenhou_indexes, tenhou_index, tenhou_category, tenhou_tile_indexes, tenhou_slots, TENHOU_TILE_COUNT
+from mahjong.tile.definition import Tile, AkaTile
+
+
+@pytest.mark.parametrize("index", range(TENHOU_TILE_COUNT))
+def test_same_as_category(index):
+    color, number, copy = TENHOU_TILE_CATEGORY.category(index)
+    assert tenhou_category(index) == (color, number, copy)
+    assert tenhou_index(color, number, copy) == index
+    tile = tile_from_tenhou(index)
+    assert tile == Tile(number + 1, SUIT_ORDER[color])
+    assert isinstance(tile, AkaTile) == (number == 4 and copy == 0 and color < 3)
+    assert type(tile_from_tenhou(index, aka=False)) is Tile
+    assert index in tile_to_tenhou_range(tile)
+    assert set(tile_to_tenhou_range(tile)) == tile_to_tenhou_indexes(tile)
+
+
+def test_aka_and_vectorized():
+    assert tile_to_tenhou_indexes(AkaTile(0, 'p')) == frozenset(range(52, 56))
+    assert tiles_from_tenhou([16, 17, 135]) == [AkaTile(0, 'm'), Tile(5, 'm'), Tile(7, 'z')]
+    assert tenhou_slots([0, 16, 135]).tolist() == [0, 4, 33]
+    assert (tenhou_slots(np.arange(TENHOU_TILE_COUNT)) == np.repeat(np.arange(34), 4)).all()
+
+
+def test_three_player_tiles():
+    indexes = tenhou_tile_indexes(3)
+    assert len(indexes) == 108
+    assert {tile_from_tenhou(index) for index in indexes if tile_from_tenhou(index).color == 'm'} == \
+           {Tile(1, 'm'), Tile(9, 'm')}
+    assert InvisibleTiles(3).value == set(indexes)
+    assert InvisibleTiles(4).value == set(range(TENHOU_TILE_COUNT))
@@ -0,0 +1,36 @@
+import random
+
+import numpy as np
+import pytest
+
+from mahjong.container.array_set import tile_counts
+from mahjong.container.distribution import StaticWall, sample_wall_draws, draw_counts
+from mahjong.container.set import TileSet
+from mahjong.container.utils import tile_set_from_string
+
+wall = tile_set_from_string("1112345m0p99s777z")
+
+
+def test_static_wall_sample():
+    rng = random.Random(3)
+    for _ in range(50):
+        drawn = TileSet(StaticWall(wall).sample(6, rng))
+        assert len(list(drawn.elements())) == 6
+        assert wall.contains(drawn)
+    assert TileSet(StaticWall(wall).sample(len(wall), rng)) == wall
+    with pytest.raises(ValueError):
+        list(StaticWall(wall).sample(len(wall) + 1, rng))
+
+
+def test_sample_wall_draws():
+    counts = np.array(tile_counts(wall))
+    draws = sample_wall_draws(counts, 6, 2000, np.random.default_rng(1))
+    assert draws.shape == (2000, 6)
+    drawn_counts = draw_counts(draws)
+    assert (drawn_counts.sum(axis=1) == 6).all()
+    assert (drawn_counts <= counts).all()
+    # every tile is equally likely to be drawn first.
+    first = np.bincount(draws[:, 0], minlength=len(counts)) / len(draws)
+    assert np.allclose(first, counts / counts.sum(), atol=0.03)
+    assert (draw_counts(sample_wall_draws(counts, counts.sum(), 3, np.random.default_rng(2))) == counts).all()
+    assert sample_wall_draws(counts, 0, 3, np.random.default_rng(2)).shape == (3, 0)
@@ -21,6 +21,14 @@ def test_execute_export(file_name):
     assert len(df) > 1
 
 
+@pytest.mark.parametrize("file_name", test_files)
+def test_execute_as_dataframe(file_name):
+    commands = list(file_to_commands(file_name))
+    df = pd.DataFrame(x.flatten() for x in GameExecutor().execute(commands))
+    df.columns = pd.MultiIndex.from_tuples(df.columns)
+    pd.testing.assert_frame_equal(GameExecutor().execute_as_dataframe(commands), df)
+
+
 @pytest.mark.parametrize("file_name", test_files)
 def test_execute_enum_transform(file_name):
     commands = file_to_commands(file_name)
@@ -0,0 +1,97 @@
+import os
+import shutil
+
+import pandas
+import pytest
+
+from mahjong.record.reader import from_file
+from mahjong.record.universe.export import export_record, export_dataset, write_commands, partition_path
+from mahjong.record.universe.tenhou import to_command_records
+from mahjong.universe_paifu_convert import main
+from tests.uni_record.paifu_list import test_files
+
+
+@pytest.mark.parametrize("file_name", test_files)
+def test_export_record_csv(file_name, tmp_path):
+    record = from_file(file_name)
+    path = str(tmp_path / "commands.csv")
+    rows = export_record(record, path, "csv", chunk_size=100)
+    expected = pandas.DataFrame(to_command_records(record)).to_csv(index=False)
+    with open(path, encoding="utf-8") as csv_file:
+        assert csv_file.read() == expected
+    assert rows == len(expected.splitlines()) - 1
+
+
+def test_export_record_csv_index(tmp_path):
+    record = from_file(test_files[0])
+    path = str(tmp_path / "commands.csv")
+    export_record(record, path, "csv", chunk_size=100, index=True)
+    with open(path, encoding="utf-8") as csv_file:
+        assert csv_file.read() == pandas.DataFrame(to_command_records(record)).to_csv()
+    with pytest.raises(ValueError):
+        export_record(record, str(tmp_path / "commands.parquet"), "parquet", index=True)
+
+
+def test_export_parquet(tmp_path):
+    pytest.importorskip("pyarrow")
+    record = from_file(test_files[0])
+    path = str(tmp_path / "commands.parquet")
+    export_record(record, path, "parquet", chunk_size=100)
+    expected = pandas.DataFrame(to_command_records(record))
+    actual = pandas.read_parquet(path)
+    assert list(actual.columns) == list(expected.columns)
+    assert list(actual["value"]) == list(expected["value"])
+
+
+def test_export_dataset(tmp_path):
+    records = tmp_path / "records"
+    records.mkdir()
+    for file_name in test_files[:2]:
+        shutil.copy(file_name, str(records))
+    (records / "broken.xml").write_text("<mjloggm>")
+    output = str(tmp_path / "dataset")
+
+    results = list(export_dataset(str(records), output, "csv"))
+    assert sorted((result.log_id, result.error is None) for result in results) == sorted(
+        [(os.path.basename(file_name)[:-len(".xml")], True) for file_name in test_files[:2]] + [("broken", False)])
+    for result in results:
+        if result.error is None:
+            assert result.path == partition_path(output, result.log_id, "csv") and os.path.isfile(result.path)
+            assert result.rows > 0
+    assert not os.path.exists(partition_path(output, "broken", "csv") + ".tmp")
+
+    resumed = list(export_dataset(str(records), output, "csv"))
+    assert [result.rows for result in resumed if result.error is None] == [None, None]
+
+
+def test_write_commands_empty(tmp_path):
+    path = str(tmp_path / "empty.csv")
+    assert write_commands([], path) == 0
+    with open(path, encoding="utf-8") as csv_file:
+        assert csv_file.read().startswith("timestamp,")
+
+
+def test_main(tmp_path):
+    output = str(tmp_path / "dataset")
+    assert main([test_files[0], "-o", output, "-f", "csv"]) == 0
+    assert len(os.listdir(output)) == 1
+
+
+def test_export_url_creates_output(tmp_path, monkeypatch):
+    import mahjong.universe_paifu_convert as convert
+    monkeypatch.setattr(convert, "from_url", lambda url, timeout: from_file(test_files[0]))
+    output = str(tmp_path / "new" / "dir")
+    path = convert.export_url("http://tenhou.net/0/?log=2018010604gm-00a9-0000-bbc99254", output, None)
+    assert path == os.path.join(output, "2018010604gm-00a9-0000-bbc99254_command.csv")
+    expected = pandas.DataFrame(to_command_records(from_file(test_files[0]))).to_csv()
+    with open(path, encoding="utf-8") as csv_file:
+        assert csv_file.read() == expected
+
+
+def test_export_dataset_parquet(tmp_path):
+    pytest.importorskip("pyarrow")
+    output = str(tmp_path / "dataset")
+    results = list(export_dataset(os.path.dirname(os.path.abspath(test_files[0])), output, "parquet", chunk_size=100))
+    dataset = pandas.read_parquet(output)
+    assert len(dataset) == sum(result.rows for result in results)
+    assert set(dataset["log_id"].astype(str)) == set(result.log_id for result in results)
@@ -0,0 +1,41 @@
+from mahjong.record.universe.format import GameView, PlayerView, ViewType, ViewScope, View
+from mahjong.record.universe.property_manager import PropertyTypeManager, PropertyMethod, prop_manager
+
+
+def test_dispatch_cached():
+    assert prop_manager.to_str(["1m"], prop=PlayerView.hand) == '["1m"]'
+    assert prop_manager.to_str(1, prop="timestamp") == '1'
+    assert prop_manager.check_equal(["1m", "2m"], ["2m", "1m"], prop=PlayerView.hand)
+    assert not prop_manager.check_equal([1, 2], [2, 1], prop=GameView.richii_remain_scores)
+    assert prop_manager.to_str is prop_manager.to_str
+    assert prop_manager.lookup(PlayerView.hand, PropertyMethod.to_str) is \
+           prop_manager.lookup(PlayerView.hand, PropertyMethod.to_str)
+
+
+def test_register_invalidates():
+    manager = PropertyTypeManager()
+    manager.register(ViewType.list, PropertyMethod.to_str)(lambda x: "list")
+    assert manager.to_str(1, prop=PlayerView.hand) == "list"
+    manager.register(None, PropertyMethod.to_str)(lambda x: "general")
+    assert manager.to_str(1, prop=PlayerView.score) == "general"
+    assert manager.to_str(1, prop=PlayerView.hand) == "list"
+
+    manager = PropertyTypeManager()
+    manager.register(None, PropertyMethod.to_str)(lambda x: "general")
+    assert manager.to_str(1, prop=PlayerView.hand) == "general"
+    manager.register(ViewType.list, PropertyMethod.to_str)(lambda x: "list")
+    # functions registered earlier are preferred.
+    assert manager.to_str(1, prop=PlayerView.hand) == "general"
+    manager.register(None, PropertyMethod.to_str)(lambda x: "replaced")
+    assert manager.to_str(1, prop=PlayerView.hand) == "replaced"
+
+
+def test_view_scope_and_type_cached():
+    for view in View.registered_view().values():
+        for member in view.__members__.values():
+            assert member.scope == member._find_scope()
+            if not member.name.startswith(View.get_type_prefix()):
+                assert member.type == member._find_type()
+    assert PlayerView.hand.type == ViewType.tiles
+    assert GameView.round.scope == ViewScope.game and PlayerView.round.scope == ViewScope.player
+    assert (PlayerView.hand | PlayerView.score).scope == ViewScope.player
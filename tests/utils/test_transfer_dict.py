@@ -69,3 +69,35 @@ def test_trans_differ():
     assert trans_3['b']['2'] == 'y'
     assert trans_3['a']['3'] == 'p'
     assert trans_3['b']['4'] == 'q'
+
+
+def test_set_shares_unchanged():
+    trans = TransferDict({
+        'a': {
+            '1': 'x'
+        },
+        'b': {
+            '2': {
+                '3': 'y'
+            }
+        },
+    })
+    trans_2 = trans['a'].set('1', 'z')
+    assert trans_2['b'].nested_dict is trans['b'].nested_dict
+    assert trans_2['a'].nested_dict is not trans['a'].nested_dict
+    assert list(trans_2.flatten_iter()) == [(('a', '1'), 'z'), (('b', '2', '3'), 'y')]
+
+
+def test_drop_and_set_dict():
+    trans = TransferDict({
+        'a': {
+            '1': 'x',
+            '2': 'y',
+        },
+    })
+    trans_2 = trans['a'].drop('1')
+    trans_3 = trans_2.set('b', {'3': 'z'})
+    assert '1' in trans['a']
+    assert '1' not in trans_2['a'] and trans_2['a']['2'] == 'y'
+    assert trans_3['b']['3'] == 'z'
+    assert trans_3['b'].set('3', 'w')['b']['3'] == 'w'